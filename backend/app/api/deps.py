@@ -1,16 +1,21 @@
-from typing import Generator, Optional, Annotated
+from typing import Optional, Annotated
+from uuid import UUID
 import logging
 from fastapi import Depends, HTTPException, status, Cookie, Header, Request, Security
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import crud, models, schemas
+from app import crud
 from app.core import security
 from app.core.config import settings
-from app.db.database import get_db_dependency, SessionLocal
+from app.db.session import get_db
 from app.core.db import supabase
+from app.services.user_cache import UserSnapshot, user_cache
+from app.services.token_revocation import token_revocation
+from app.schemas.token import TokenPayload
+from app.middleware.session import RedisSession
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -21,18 +26,12 @@ oauth2_scheme = OAuth2PasswordBearer(
 
 # JWT token dependency
 async def get_token_from_cookie_or_header(
-    session: Optional[str] = Cookie(None),
+    access_token: Optional[str] = Cookie(None),
     authorization: Optional[str] = Header(None),
 ) -> Optional[str]:
     """Extract token from cookie or header."""
-    token = None
-    
-    # Try to get token from cookie
-    if session:
-        try:
-            token = session
-        except Exception as e:
-            logger.error(f"Error parsing session cookie: {e}")
+    # The login endpoint stores the raw token in the access_token cookie
+    token = access_token
     
     # If not in cookie, try authorization header
     if not token and authorization and authorization.startswith("Bearer "):
@@ -40,11 +39,18 @@ async def get_token_from_cookie_or_header(
     
     return token
 
+async def get_session(request: Request) -> RedisSession:
+    """Load the server-side session for handlers that need it."""
+    return await request.session.load()
+
 async def get_current_user(
     token: str = Depends(get_token_from_cookie_or_header),
-    db: Session = Depends(get_db_dependency),
-) -> models.User:
-    """Get current user based on JWT token."""
+    db: AsyncSession = Depends(get_db),
+) -> UserSnapshot:
+    """
+    Get current user based on JWT token.
+    Served from the per-process user snapshot cache when possible.
+    """
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -54,32 +60,46 @@ async def get_current_user(
     
     try:
         payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            token, settings.ACCESS_TOKEN_SECRET, algorithms=[settings.ALGORITHM]
         )
-        token_data = schemas.TokenPayload(**payload)
-    except (JWTError, ValidationError):
+        token_data = TokenPayload(**payload)
+        user_id = UUID(token_data.sub)
+    except (JWTError, ValidationError, TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = crud.user.get(db, id=token_data.sub)
+    if await token_revocation.is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    snapshot = user_cache.get(user_id)
+    if snapshot is not None:
+        return snapshot
+    
+    user = await crud.get_user_by_id(db, id=user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    snapshot = UserSnapshot.from_user(user)
+    user_cache.put(snapshot, token_exp=payload.get("exp"))
+    return snapshot
 
 async def get_current_active_user(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+    current_user: UserSnapshot = Depends(get_current_user),
+) -> UserSnapshot:
     """Get current active user."""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 async def get_current_active_superuser(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+    current_user: UserSnapshot = Depends(get_current_user),
+) -> UserSnapshot:
     """Get current active superuser."""
     if not current_user.is_superuser:
         raise HTTPException(
@@ -88,6 +108,6 @@ async def get_current_active_superuser(
     return current_user
 
 # Dependencies to export
-db_dependency = Annotated[Session, Depends(get_db_dependency)]
-current_user_dependency = Annotated[models.User, Depends(get_current_user)]
-current_active_user_dependency = Annotated[models.User, Depends(get_current_active_user)] 
\ No newline at end of file
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
+current_user_dependency = Annotated[UserSnapshot, Depends(get_current_user)]
+current_active_user_dependency = Annotated[UserSnapshot, Depends(get_current_active_user)] 
\ No newline at end of file
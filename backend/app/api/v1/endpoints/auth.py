@@ -1,13 +1,14 @@
 from datetime import timedelta, datetime
-from typing import Any
+from typing import Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Cookie, Request
 from fastapi.security import OAuth2PasswordRequestForm
+from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
 from app.api import deps
 from app.core import security
-from app.core.config import settings, Settings
+from app.core.config import settings
 from app.core.security import get_password_hash
 from app.utils import (
     generate_password_reset_token,
@@ -16,6 +17,8 @@ from app.utils import (
 from app.db.session import get_db
 from app.services.auth_service import AuthService
 from app.services.user_service import UserService
+from app.services.token_revocation import token_revocation
+from app.services.login_throttle import login_throttle
 from app.schemas.token import Token
 from app.schemas.user import UserCreate, UserResponse
 from app.utils.email import send_reset_password_email
@@ -25,13 +28,28 @@ import logging
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-settings = Settings()
+
+def _client_ip(request: Request) -> Optional[str]:
+    return request.client.host if request.client else None
+
+async def _revoke_token(token: Optional[str], secret_key: str) -> None:
+    """Add a token's jti to the revocation list until it expires."""
+    if not token:
+        return
+    try:
+        payload = jwt.decode(token, secret_key, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return
+    if payload.get("jti") and payload.get("exp"):
+        await token_revocation.revoke_token(payload["jti"], payload["exp"])
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
+    throttle_key = await login_throttle.check(form_data.username, _client_ip(request))
     auth_service = AuthService(db)
     user = await auth_service.authenticate_user(form_data.username, form_data.password)
     if not user:
@@ -40,6 +58,7 @@ async def login_for_access_token(
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    await login_throttle.reset(throttle_key)
     
     access_token = auth_service.create_access_token(
         data={"sub": str(user.id)}
@@ -63,29 +82,14 @@ async def register_user(
     Register a new user.
     """
     try:
-        # First check if user with this email or username already exists
+        # Duplicate emails/usernames surface as unique violations on the insert
         user_service = UserService(db)
-        
-        # Check email
-        existing_email = await user_service.get_user_by_email(user_data.email)
-        if existing_email:
-            logger.warning(f"Registration attempt with existing email: {user_data.email}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="A user with this email address already exists"
-            )
-            
-        # Check username
-        existing_username = await user_service.get_user_by_username(user_data.username)
-        if existing_username:
-            logger.warning(f"Registration attempt with existing username: {user_data.username}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="This username is already taken"
-            )
-        
-        # Create user if validation passes
-        user = await user_service.create_user(user_data)
+        try:
+            user = await user_service.create_user(user_data)
+        except HTTPException as e:
+            if e.status_code == status.HTTP_400_BAD_REQUEST:
+                logger.warning(f"Registration conflict for {user_data.email}: {e.detail}")
+            raise
         logger.info(f"User registered successfully: {user_data.email}")
         return user
     except HTTPException as e:
@@ -101,6 +105,7 @@ async def register_user(
 
 @router.post("/login", response_model=schemas.Token)
 async def login_access_token(
+    request: Request,
     response: Response,
     db: AsyncSession = Depends(get_db), 
     form_data: OAuth2PasswordRequestForm = Depends()
@@ -109,6 +114,7 @@ async def login_access_token(
     OAuth2 compatible token login, get an access token for future requests.
     Stores tokens in cookies for seamless authentication.
     """
+    throttle_key = await login_throttle.check(form_data.username, _client_ip(request))
     user = await crud.authenticate_user(
         db, email=form_data.username, password=form_data.password
     )
@@ -116,6 +122,7 @@ async def login_access_token(
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     elif not crud.is_active(user):
         raise HTTPException(status_code=400, detail="Inactive user")
+    await login_throttle.reset(throttle_key)
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     refresh_token_expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
@@ -177,7 +184,10 @@ async def refresh_access_token(
             detail="Refresh token is required"
         )
     
-    user_id = security.verify_refresh_token(token)
+    payload = security.get_refresh_token_payload(token)
+    user_id = payload.get("sub") if payload else None
+    if user_id and await token_revocation.is_revoked(payload):
+        user_id = None
     if not user_id:
         # Clear invalid cookies
         response.delete_cookie("access_token", domain="localhost", samesite="none", secure=True)
@@ -230,10 +240,24 @@ async def refresh_access_token(
     }
 
 @router.post("/logout")
-async def logout(response: Response) -> dict:
+async def logout(
+    request: Request,
+    response: Response,
+    access_token: Optional[str] = Cookie(None),
+    refresh_token: Optional[str] = Cookie(None),
+) -> dict:
     """
-    Logout user by clearing cookies
+    Logout user by revoking the presented tokens and clearing cookies
     """
+    authorization = request.headers.get("Authorization")
+    if authorization and authorization.startswith("Bearer "):
+        access_token = authorization.split(" ")[1]
+    try:
+        await _revoke_token(access_token, settings.ACCESS_TOKEN_SECRET)
+        await _revoke_token(refresh_token, settings.REFRESH_TOKEN_SECRET)
+    except Exception as e:
+        logger.error(f"Failed to revoke tokens on logout: {str(e)}")
+    
     response.delete_cookie(
         key="access_token",
         domain="localhost",
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 import psycopg2
@@ -6,9 +7,12 @@ import os
 from typing import Dict
 import logging
 
-from app.api.deps import get_db_dependency
+from app.api import deps
+from app.db.database import get_db_dependency
 from app.core.config import settings
 from app.db.utils import test_db_connection
+from app.db.diagnostics import run_network_diagnostics
+from app.services.user_cache import UserSnapshot
 
 router = APIRouter(tags=["connection_test"])
 logger = logging.getLogger(__name__)
@@ -97,4 +101,16 @@ async def test_connection(db: Session = Depends(get_db_dependency)):
                     "user": os.getenv("USER"),
                     "ssl_enabled": True,
                 }
-            } 
\ No newline at end of file
+            } 
+@router.get("/network-diagnostics")
+async def network_diagnostics(
+    current_user: UserSnapshot = Depends(deps.get_current_active_superuser),
+):
+    """
+    Check internet connectivity, the external IP and DNS resolution of the
+    database host. Useful when the database cannot be reached.
+
+    Superusers only: each call makes outbound connections and the answer
+    reveals the server's external IP and the database's address.
+    """
+    return await run_in_threadpool(run_network_diagnostics)
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.database import get_db
-from app.core.redis import get_redis_client
+from app.db.session import get_db
+from app.core.redis import get_async_redis_client
 
 router = APIRouter()
 
@@ -12,11 +13,10 @@ async def health_check(db: AsyncSession = Depends(get_db)):
     """
     try:
         # Check database connection
-        await db.execute("SELECT 1")
+        await db.execute(text("SELECT 1"))
         
-        # Check Redis connection
-        redis = get_redis_client()
-        redis.ping()
+        # Check Redis connection (through the shared pool, no new connection per check)
+        await get_async_redis_client().ping()
         
         return {
             "status": "healthy",
@@ -27,4 +27,4 @@ async def health_check(db: AsyncSession = Depends(get_db)):
         return {
             "status": "unhealthy",
             "error": str(e)
-        } 
\ No newline at end of file
+        }
@@ -1,29 +1,42 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import crud, models, schemas
 from app.api import deps
+from app.db.pagination import MAX_PAGE_SIZE, InvalidCursor
 from app.utils import upload_image, delete_image
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.User])
 async def read_users(
-    db: Session = Depends(deps.db_dependency),
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve users.
+    Retrieve users, oldest first.
+    
+    The cursor for the next page is returned in the X-Next-Cursor header
+    (absent on the last page). X-Total-Count holds the number of users;
+    X-Total-Count-Exact is "false" when that is an estimate.
     """
-    users = await crud.user.get_users(db, skip=skip, limit=limit)
-    return users
+    try:
+        page = await crud.user.get_users(db, cursor=cursor, limit=limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    total = await crud.user.count_users(db)
+    response.headers.update(total.headers())
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page.items
 
 @router.post("/", response_model=schemas.User)
 async def create_user(
     *,
-    db: Session = Depends(deps.db_dependency),
+    db: AsyncSession = Depends(deps.get_db),
     user_in: schemas.UserCreate,
     current_user: models.User = Depends(deps.get_current_active_superuser),
 ) -> Any:
@@ -42,20 +55,21 @@ async def create_user(
 @router.put("/me", response_model=schemas.User)
 async def update_user_me(
     *,
-    db: Session = Depends(deps.db_dependency),
+    db: AsyncSession = Depends(deps.get_db),
     user_in: schemas.UserUpdate,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Update own user.
     """
-    user = await crud.user.update_user(db, db_user=current_user, user_in=user_in)
+    db_user = await crud.user.get_user_by_id(db, id=current_user.id)
+    user = await crud.user.update_user(db, db_user=db_user, user_in=user_in)
     return user
 
 @router.post("/me/profile-image", response_model=schemas.ProfileImage)
 async def upload_profile_image(
     *,
-    db: Session = Depends(deps.db_dependency),
+    db: AsyncSession = Depends(deps.get_db),
     file: UploadFile = File(...),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
@@ -72,7 +86,8 @@ async def upload_profile_image(
             delete_image(current_user.profile_image)
         
         # Update user profile with new image URL
-        await crud.user.update_user_profile_image(db, db_user=current_user, image_url=image_url)
+        db_user = await crud.user.get_user_by_id(db, id=current_user.id)
+        await crud.user.update_user_profile_image(db, db_user=db_user, image_url=image_url)
         
         return {"image_url": image_url}
     except Exception as e:
@@ -85,7 +100,7 @@ async def upload_profile_image(
 @router.delete("/me/profile-image", response_model=schemas.User)
 async def delete_profile_image(
     *,
-    db: Session = Depends(deps.db_dependency),
+    db: AsyncSession = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
@@ -107,13 +122,14 @@ async def delete_profile_image(
         print(f"Warning: Failed to delete image from Cloudinary: {current_user.profile_image}")
     
     # Update user profile to remove image URL
-    user = await crud.user.remove_profile_image(db, db_user=current_user)
+    db_user = await crud.user.get_user_by_id(db, id=current_user.id)
+    user = await crud.user.remove_profile_image(db, db_user=db_user)
     
     return user
 
 @router.get("/me", response_model=schemas.User)
 async def read_user_me(
-    db: Session = Depends(deps.db_dependency),
+    db: AsyncSession = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
@@ -125,13 +141,13 @@ async def read_user_me(
 async def read_user_by_id(
     user_id: int,
     current_user: models.User = Depends(deps.get_current_active_user),
-    db: Session = Depends(deps.db_dependency),
+    db: AsyncSession = Depends(deps.get_db),
 ) -> Any:
     """
     Get a specific user by id.
     """
     user = await crud.user.get_user_by_id(db, id=user_id)
-    if user == current_user:
+    if user and user.id == current_user.id:
         return user
     if not crud.user.is_superuser(current_user):
         raise HTTPException(
@@ -142,7 +158,7 @@ async def read_user_by_id(
 @router.put("/{user_id}", response_model=schemas.User)
 async def update_user(
     *,
-    db: Session = Depends(deps.db_dependency),
+    db: AsyncSession = Depends(deps.get_db),
     user_id: int,
     user_in: schemas.UserUpdate,
     current_user: models.User = Depends(deps.get_current_active_superuser),
@@ -6,18 +6,22 @@ from datetime import datetime
 import shutil
 import os
 
-from app.db.database import get_db
+from app.db.session import get_db
+from app.api.deps import get_current_user
 from app.core.config import settings
 from app.schemas.user import UserCreate, UserLogin, UserUpdate, UserResponse, TokenResponse, User as UserSchema
 from app.core.security import (
     create_access_token,
     create_refresh_token,
-    get_current_user,
-    get_password_hash,
-    verify_password
+    decode_token,
+    oauth2_scheme,
+    get_password_hash_async,
+    verify_password_async
 )
 from app.models.user import User
 from app.services.user_service import UserService
+from app.services.token_revocation import token_revocation
+from app.services.user_cache import user_cache
 
 router = APIRouter()
 
@@ -40,7 +44,7 @@ async def register_user(
         )
 
     # Hash password
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     
     # Handle file uploads
     profile_image_path = None
@@ -77,7 +81,7 @@ async def login_user(
     
     # Check user credentials
     user = await user_service.get_user_by_email(user_credentials.email)
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    if not user or not await verify_password_async(user_credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -110,7 +114,7 @@ async def update_user(
     # Update user
     update_data = user_update.dict(exclude_unset=True)
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await get_password_hash_async(update_data.pop("password"))
     
     # Get user from database
     user = await user_service.get_user_by_id(current_user.id)
@@ -123,13 +127,17 @@ async def update_user(
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    await user_cache.invalidate(user.id)
     
     return user
 
 @router.post("/logout")
 async def logout_user(
+    token: str = Depends(oauth2_scheme),
     current_user: User = Depends(get_current_user)
 ):
-    # In a real implementation, you might want to invalidate the token
-    # This could involve adding it to a blacklist or similar mechanism
+    # Revoke the access token until it expires
+    payload = decode_token(token, settings.ACCESS_TOKEN_SECRET)
+    if payload.get("jti") and payload.get("exp"):
+        await token_revocation.revoke_token(payload["jti"], payload["exp"])
     return {"message": "Successfully logged out"} 
\ No newline at end of file
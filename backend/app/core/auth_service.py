@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 from jose import jwt
 
 from app.core.config import settings
-from app.core.security import verify_password
+from app.core.security import verify_password_async
 from app.models.user import User
 
 class AuthService:
@@ -15,7 +15,7 @@ class AuthService:
         user = await self.db.query(User).filter(User.email == email).first()
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
         return user
 
@@ -7,7 +7,8 @@ celery_app = Celery(
     backend=settings.REDIS_URL,
     include=[
         "app.tasks.paper_tasks",
-        "app.tasks.email_tasks"
+        "app.tasks.email_tasks",
+        "app.tasks.maintenance_tasks"
     ]
 )
 
@@ -24,4 +25,10 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,
     task_acks_late=True,
     task_reject_on_worker_lost=True,
-) 
\ No newline at end of file
+)
+
+# Daily partition maintenance (celery beat)
+celery_app.conf.beat_schedule = {
+    "maintain-partitions": {"task": "maintain_partitions", "schedule": 86400.0},
+    "cleanup-old-data": {"task": "cleanup_old_data", "schedule": 86400.0},
+}
@@ -1,12 +1,40 @@
+import logging
 import os
 import secrets
-from typing import Any, Dict, List, Optional, Union
-from pydantic import AnyHttpUrl, Field, PostgresDsn, field_validator, model_validator
+import threading
+from typing import Any, Callable, Dict, List, Optional, Union
+from pydantic import AnyHttpUrl, Field, PostgresDsn, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from functools import lru_cache
-from dotenv import load_dotenv
+from dotenv import dotenv_values
 
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+ENV_FILE = ".env"
+
+# Variables this module copied from .env into os.environ, with the value copied
+_from_env_file: Dict[str, str] = {}
+
+def load_env_file() -> None:
+    """
+    Copy .env into os.environ, like ``load_dotenv()``, but re-runnable.
+
+    Variables set by the real environment always win. Ones copied from .env
+    before are updated (or removed) to match the file, so a reload sees the
+    edited values; pydantic-settings itself prefers os.environ over the file.
+    """
+    values = {name: value for name, value in dotenv_values(ENV_FILE).items() if value is not None}
+    for name, copied in list(_from_env_file.items()):
+        if name not in values:
+            if os.environ.get(name) == copied:
+                del os.environ[name]
+            del _from_env_file[name]
+    for name, value in values.items():
+        if name in os.environ and _from_env_file.get(name) != os.environ[name]:
+            continue
+        os.environ[name] = value
+        _from_env_file[name] = value
+
+load_env_file()
 
 class Settings(BaseSettings):
     # Server Settings
@@ -39,6 +67,15 @@ class Settings(BaseSettings):
     # Cookie Settings
     COOKIE_SECURE: bool = Field(default=os.getenv("COOKIE_SECURE", "false").lower() == "true")
     
+    # Server-side sessions (Redis); the cookie only holds the session id
+    SESSION_COOKIE_NAME: str = Field(default=os.getenv("SESSION_COOKIE_NAME", "session_id"))
+    SESSION_MAX_AGE_SECONDS: int = Field(default=int(os.getenv("SESSION_MAX_AGE_SECONDS", str(14 * 24 * 60 * 60))))
+    
+    # Password hashing settings
+    # 0 workers runs bcrypt on the default thread executor instead of a process pool
+    PASSWORD_HASH_WORKERS: int = Field(default=int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))))
+    PASSWORD_HASH_MAX_CONCURRENCY: int = Field(default=int(os.getenv("PASSWORD_HASH_MAX_CONCURRENCY", "8")))
+    
     # Supabase settings
     SUPABASE_URL: str = os.getenv("SUPABASE_URL")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY")
@@ -55,7 +92,31 @@ class Settings(BaseSettings):
     # Database Connection Variables
     DB_CONNECT_TIMEOUT: int = Field(default=int(os.getenv("DB_CONNECT_TIMEOUT", "15")))
     DB_POOL_TIMEOUT: int = Field(default=int(os.getenv("DB_POOL_TIMEOUT", "30")))
-    DB_MAX_CONNECTIONS: int = Field(default=int(os.getenv("DB_MAX_CONNECTIONS", "20")))
+    DB_MAX_CONNECTIONS: int = Field(default=int(os.getenv("DB_MAX_CONNECTIONS", "20")))  # per process, all engines
+    DB_SYNC_MAX_CONNECTIONS: int = Field(default=int(os.getenv("DB_SYNC_MAX_CONNECTIONS", "2")))  # reserved for the psycopg2 engine
+    DB_POOL_MIN_IDLE: int = Field(default=int(os.getenv("DB_POOL_MIN_IDLE", "5")))  # connections opened at startup, per async pool
+    DB_POOL_VALIDATE_SECONDS: int = Field(default=int(os.getenv("DB_POOL_VALIDATE_SECONDS", "30")))
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = Field(default=int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "100")))  # per asyncpg connection; 0 behind pgbouncer
+    DB_N_PLUS_ONE_THRESHOLD: int = Field(default=int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "5")))  # same statement this often per request is flagged
+    DB_QUERY_DEBUG_HEADER: bool = Field(default=os.getenv("DB_QUERY_DEBUG_HEADER", "false").lower() == "true")  # X-DB-Queries response header
+    SLOW_QUERY_MS: float = Field(default=float(os.getenv("SLOW_QUERY_MS", "200")))
+    SLOW_QUERY_EXPLAIN: bool = Field(default=os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true")
+    SLOW_QUERY_RING_SIZE: int = Field(default=int(os.getenv("SLOW_QUERY_RING_SIZE", "500")))
+    COUNT_EXACT_THRESHOLD: int = Field(default=int(os.getenv("COUNT_EXACT_THRESHOLD", "10000")))  # larger listings report the planner's estimate
+    COUNT_CACHE_SECONDS: float = Field(default=float(os.getenv("COUNT_CACHE_SECONDS", "30")))
+    READING_HISTORY_RETENTION_DAYS: int = Field(default=int(os.getenv("READING_HISTORY_RETENTION_DAYS", "365")))  # whole months older than this are dropped
+    READING_HISTORY_PARTITIONS_AHEAD: int = Field(default=int(os.getenv("READING_HISTORY_PARTITIONS_AHEAD", "3")))  # monthly partitions created in advance
+    
+    # Read replicas (comma-separated asyncpg URLs); reads fall back to the primary
+    DATABASE_REPLICA_URLS: str = Field(default=os.getenv("DATABASE_REPLICA_URLS", ""))
+    DB_REPLICA_MAX_CONNECTIONS: int = Field(default=int(os.getenv("DB_REPLICA_MAX_CONNECTIONS", "10")))  # per replica
+    REPLICA_MAX_LAG_SECONDS: float = Field(default=float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5")))
+    REPLICA_LAG_CHECK_SECONDS: int = Field(default=int(os.getenv("REPLICA_LAG_CHECK_SECONDS", "5")))
+    
+    # User data shards (comma-separated name=asyncpg-url); empty keeps everything on the primary
+    DATABASE_SHARD_URLS: str = Field(default=os.getenv("DATABASE_SHARD_URLS", ""))
+    DATABASE_PREVIOUS_SHARDS: str = Field(default=os.getenv("DATABASE_PREVIOUS_SHARDS", ""))  # shard names before an ongoing reshard
+    DB_SHARD_MAX_CONNECTIONS: int = Field(default=int(os.getenv("DB_SHARD_MAX_CONNECTIONS", "5")))  # per shard
     
     # Alternative database connection options
     DATABASE_DIRECT_URL: Optional[str] = Field(default=os.getenv("DATABASE_DIRECT_URL", None))
@@ -143,26 +204,51 @@ class Settings(BaseSettings):
     REDIS_TIMEOUT: int = Field(default=int(os.getenv("REDIS_TIMEOUT", "5")))
     REDIS_MAX_CONNECTIONS: int = Field(default=int(os.getenv("REDIS_MAX_CONNECTIONS", "10")))
 
-    @model_validator(mode="after")
-    def set_redis_url(self) -> "Settings":
-        if not self.REDIS_URL:
-            redis_host = self.REDIS_HOST
-            redis_port = self.REDIS_PORT
-            redis_password = self.REDIS_PASSWORD
-            redis_db = self.REDIS_DB
+    @field_validator("REDIS_URL", mode="after")
+    def assemble_redis_url(cls, v: str, info: Any) -> str:
+        if v:
+            return v
             
-            if redis_password:
-                self.REDIS_URL = f"redis://:{redis_password}@{redis_host}:{redis_port}/{redis_db}"
-            else:
-                self.REDIS_URL = f"redis://{redis_host}:{redis_port}/{redis_db}"
-                
-        return self
+        values = info.data
+        redis_host = values.get("REDIS_HOST")
+        redis_port = values.get("REDIS_PORT")
+        redis_password = values.get("REDIS_PASSWORD")
+        redis_db = values.get("REDIS_DB")
+        
+        if redis_password:
+            return f"redis://:{redis_password}@{redis_host}:{redis_port}/{redis_db}"
+        return f"redis://{redis_host}:{redis_port}/{redis_db}"
 
     # Cache settings
     CACHE_TTL: int = Field(default=int(os.getenv("CACHE_TTL", "3600")))  # 1 hour default
     CACHE_PREFIX: str = Field(default=os.getenv("CACHE_PREFIX", "rescroll"))
     CACHE_ENABLED: bool = Field(default=os.getenv("CACHE_ENABLED", "true").lower() == "true")
     
+    # Authenticated user snapshot cache (per process)
+    USER_CACHE_ENABLED: bool = Field(default=os.getenv("USER_CACHE_ENABLED", "true").lower() == "true")
+    USER_CACHE_MAX_SIZE: int = Field(default=int(os.getenv("USER_CACHE_MAX_SIZE", "10000")))
+    USER_CACHE_TTL_SECONDS: int = Field(default=int(os.getenv("USER_CACHE_TTL_SECONDS", "60")))
+    
+    # Access token revocation (Redis denylist + local Bloom filter)
+    TOKEN_REVOCATION_ENABLED: bool = Field(default=os.getenv("TOKEN_REVOCATION_ENABLED", "true").lower() == "true")
+    TOKEN_REVOCATION_SYNC_SECONDS: int = Field(default=int(os.getenv("TOKEN_REVOCATION_SYNC_SECONDS", "5")))
+    TOKEN_REVOCATION_REBUILD_SECONDS: int = Field(default=int(os.getenv("TOKEN_REVOCATION_REBUILD_SECONDS", "300")))
+    TOKEN_REVOCATION_BLOOM_CAPACITY: int = Field(default=int(os.getenv("TOKEN_REVOCATION_BLOOM_CAPACITY", "100000")))
+    TOKEN_REVOCATION_BLOOM_ERROR_RATE: float = Field(default=float(os.getenv("TOKEN_REVOCATION_BLOOM_ERROR_RATE", "0.001")))
+    
+    # Login throttling (per account + client IP, shared through Redis)
+    LOGIN_THROTTLE_ENABLED: bool = Field(default=os.getenv("LOGIN_THROTTLE_ENABLED", "true").lower() == "true")
+    LOGIN_THROTTLE_MAX_ATTEMPTS: int = Field(default=int(os.getenv("LOGIN_THROTTLE_MAX_ATTEMPTS", "5")))
+    LOGIN_THROTTLE_WINDOW_SECONDS: int = Field(default=int(os.getenv("LOGIN_THROTTLE_WINDOW_SECONDS", "300")))
+    LOGIN_THROTTLE_LOCKOUT_SECONDS: int = Field(default=int(os.getenv("LOGIN_THROTTLE_LOCKOUT_SECONDS", "60")))
+    LOGIN_THROTTLE_MAX_LOCKOUT_SECONDS: int = Field(default=int(os.getenv("LOGIN_THROTTLE_MAX_LOCKOUT_SECONDS", "3600")))
+    
+    # Idempotency-Key replay for mutating requests
+    IDEMPOTENCY_ENABLED: bool = Field(default=os.getenv("IDEMPOTENCY_ENABLED", "true").lower() == "true")
+    IDEMPOTENCY_TTL_SECONDS: int = Field(default=int(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 60 * 60))))
+    IDEMPOTENCY_LOCK_SECONDS: int = Field(default=int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60")))
+    IDEMPOTENCY_WAIT_SECONDS: float = Field(default=float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10")))
+    
     # AI/ML Settings
     GEMINI_API_KEY: str = Field(default=os.getenv("GEMINI_API_KEY", ""))
     MODEL_NAME: str = Field(default=os.getenv("MODEL_NAME", "gemini-pro"))
@@ -179,12 +265,92 @@ class Settings(BaseSettings):
     # Extra settings
     model_config = SettingsConfigDict(
         case_sensitive=True,
-        env_file=".env",
+        env_file=ENV_FILE,
         extra="allow",
+        frozen=True,
     )
 
-@lru_cache()
+# Secrets that fall back to a random value when not configured
+GENERATED_SECRETS = ("SECRET_KEY", "ACCESS_TOKEN_SECRET", "REFRESH_TOKEN_SECRET")
+
+_current: Optional[Settings] = None
+_reload_lock = threading.Lock()
+_reload_callbacks: List[Callable[[Settings, Settings], None]] = []
+
+def _configured(name: str) -> bool:
+    return bool(os.getenv(name) or dotenv_values(ENV_FILE).get(name))
+
+def _build_settings(previous: Optional[Settings] = None) -> Settings:
+    overrides = {}
+    for name in GENERATED_SECRETS:
+        if _configured(name):
+            continue
+        if previous is not None:
+            # Keep the random secret so tokens issued before the reload stay valid
+            overrides[name] = getattr(previous, name)
+        else:
+            logger.warning(
+                f"{name} is not set; using a random value. Tokens will not be "
+                f"valid across restarts or workers."
+            )
+    return Settings(**overrides)
+
 def get_settings() -> Settings:
-    return Settings()
+    """Return the current immutable settings snapshot."""
+    global _current
+    if _current is None:
+        with _reload_lock:
+            if _current is None:
+                _current = _build_settings()
+    return _current
+
+def on_settings_reload(callback: Callable[[Settings, Settings], None]) -> None:
+    """Register ``callback(old, new)`` to run after each reload."""
+    _reload_callbacks.append(callback)
+
+def reload_settings() -> Settings:
+    """
+    Re-read the environment and .env and atomically swap in a new snapshot.
+
+    Objects built from the old values (engines, pools, clients) are not
+    rebuilt here; register a callback for anything that should follow.
+    """
+    global _current
+    with _reload_lock:
+        # Not get_settings(): it takes this lock when nothing was built yet
+        old = _current
+        load_env_file()
+        new = _build_settings(previous=old)
+        _current = new
+    if old is None:
+        # Nothing can have been built from settings that never existed
+        logger.info("Settings loaded")
+        return new
+    for callback in list(_reload_callbacks):
+        try:
+            callback(old, new)
+        except Exception as e:
+            logger.error(f"Settings reload callback failed: {str(e)}")
+    logger.info("Settings reloaded")
+    return new
+
+class SettingsProxy:
+    """
+    Read-only view that always resolves to the current settings snapshot.
+
+    Lets modules keep ``from app.core.config import settings`` and still see
+    reloaded values.
+    """
+
+    __slots__ = ()
+
+    def __getattribute__(self, name: str) -> Any:
+        return getattr(_current or get_settings(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise TypeError("Settings are immutable; use reload_settings() to change them")
+
+    def __repr__(self) -> str:
+        return repr(get_settings())
 
-settings = get_settings()
\ No newline at end of file
+settings = SettingsProxy()
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Password hashing context (shared by the event loop process and the pool workers)
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Number of recent samples kept for the queue/hash time metrics
+SAMPLE_SIZE = 1000
+
+
+def _timed_hash(password: str) -> Tuple[str, float]:
+    """Hash a password inside a worker and report how long bcrypt took."""
+    start = time.perf_counter()
+    hashed = pwd_context.hash(password)
+    return hashed, time.perf_counter() - start
+
+
+def _timed_verify(plain_password: str, hashed_password: str) -> Tuple[bool, float]:
+    """Verify a password inside a worker and report how long bcrypt took."""
+    start = time.perf_counter()
+    valid = pwd_context.verify(plain_password, hashed_password)
+    return valid, time.perf_counter() - start
+
+
+def _percentile(samples: deque, percentile: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(percentile * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop.
+
+    Hashing happens in a bounded process pool (or the default thread executor
+    when ``max_workers`` is 0) and at most ``max_concurrency`` operations are
+    queued per node, so a burst of logins cannot pile unbounded work onto the
+    pool. Queue time (waiting for a slot and a worker) and hash time are
+    recorded separately.
+    """
+
+    def __init__(self, max_workers: int, max_concurrency: int):
+        self.max_workers = max_workers
+        self.max_concurrency = max(1, max_concurrency)
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._operations = 0
+        self._errors = 0
+        self._queue_times: deque = deque(maxlen=SAMPLE_SIZE)
+        self._hash_times: deque = deque(maxlen=SAMPLE_SIZE)
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.max_workers > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            logger.info(f"Started password hashing pool with {self.max_workers} workers")
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _run(self, func: Callable[..., Tuple[Any, float]], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        self._in_flight += 1
+        try:
+            async with self._get_semaphore():
+                result, hash_time = await loop.run_in_executor(
+                    self._get_executor(), func, *args
+                )
+        except Exception:
+            self._errors += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+        total = time.perf_counter() - submitted
+        self._operations += 1
+        self._hash_times.append(hash_time)
+        self._queue_times.append(max(0.0, total - hash_time))
+        return result
+
+    async def hash(self, password: str) -> str:
+        """Generate a password hash without blocking the event loop."""
+        return await self._run(_timed_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against a hash without blocking the event loop."""
+        return await self._run(_timed_verify, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the hashing metrics."""
+        return {
+            "workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "operations": self._operations,
+            "errors": self._errors,
+            "queue_time_avg": sum(self._queue_times) / max(len(self._queue_times), 1),
+            "queue_time_p95": _percentile(self._queue_times, 0.95),
+            "hash_time_avg": sum(self._hash_times) / max(len(self._hash_times), 1),
+            "hash_time_p95": _percentile(self._hash_times, 0.95),
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._semaphore = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY,
+)
@@ -1,10 +1,15 @@
 from typing import Optional
 from redis import Redis
+from redis import asyncio as aioredis
 from app.core.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# The process-wide asyncio client and its connection pool, shared by the
+# request-path subsystems; created at startup (or lazily on first use)
+_async_client: Optional[aioredis.Redis] = None
+
 def get_redis_client(
     db: int = 0,
     host: Optional[str] = None,
@@ -31,4 +36,81 @@ def get_redis_client(
         return client
     except Exception as e:
         logger.error(f"Failed to connect to Redis: {str(e)}")
-        raise 
\ No newline at end of file
+        raise 
+
+def create_async_pool() -> aioredis.BlockingConnectionPool:
+    """
+    Connection pool sized by REDIS_MAX_CONNECTIONS.
+
+    When every connection is busy, callers wait up to REDIS_TIMEOUT for one
+    to be returned instead of failing straight away, and a command that gets
+    no reply within REDIS_TIMEOUT fails rather than hanging the request.
+    Pub/sub listeners block between messages, so they use
+    ``create_pubsub_client()`` instead.
+    """
+    return aioredis.BlockingConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_TIMEOUT,
+        socket_timeout=settings.REDIS_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_TIMEOUT,
+        socket_keepalive=True,
+        health_check_interval=30,
+        decode_responses=True,
+    )
+
+def get_async_redis_client() -> aioredis.Redis:
+    """
+    Get the process-wide asyncio Redis client.
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = aioredis.Redis(connection_pool=create_async_pool())
+    return _async_client
+
+def create_pubsub_client() -> aioredis.Redis:
+    """
+    A separate client for a long-lived subscription.
+
+    Its one connection has no read timeout (it waits for messages
+    indefinitely) and is not taken from the shared pool. Close it with
+    ``aclose()`` when the listener stops.
+    """
+    return aioredis.from_url(
+        settings.REDIS_URL,
+        max_connections=1,
+        socket_connect_timeout=settings.REDIS_TIMEOUT,
+        socket_keepalive=True,
+        decode_responses=True,
+    )
+
+async def init_async_redis() -> bool:
+    """
+    Create the shared client at startup and check that Redis answers.
+
+    Returns False (and logs) when it does not; the pool keeps retrying on use.
+    """
+    try:
+        await get_async_redis_client().ping()
+        return True
+    except Exception as e:
+        logger.error(f"Failed to connect to Redis: {str(e)}")
+        return False
+
+async def close_async_redis() -> None:
+    """Close the shared client's connections (at shutdown)."""
+    global _async_client
+    client, _async_client = _async_client, None
+    if client is not None:
+        await client.aclose(close_connection_pool=True)
+
+def async_redis_stats() -> dict:
+    pool = _async_client.connection_pool if _async_client is not None else None
+    if pool is None:
+        return {"max_connections": settings.REDIS_MAX_CONNECTIONS, "connections": 0, "in_use": 0}
+    in_use = len(pool._in_use_connections)
+    return {
+        "max_connections": pool.max_connections,
+        "connections": in_use + len(pool._available_connections),
+        "in_use": in_use,
+    }
\ No newline at end of file
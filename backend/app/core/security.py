@@ -1,18 +1,15 @@
 from datetime import datetime, timedelta
 from typing import Optional
+import uuid
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
 
-from app.core.config import Settings
+from app.core.config import settings
+from app.core.password_hasher import password_hasher, pwd_context
 
-settings = Settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token")
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
     return pwd_context.verify(plain_password, hashed_password)
@@ -21,10 +18,20 @@ def get_password_hash(password: str) -> str:
     """Generate a password hash."""
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash on the password hashing pool."""
+    return await password_hasher.verify(plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate a password hash on the password hashing pool."""
+    return await password_hasher.hash(password)
+
 def create_token(data: dict, secret_key: str, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
+    now = datetime.utcnow()
+    expire = now + (expires_delta or timedelta(minutes=15))
+    # jti/iat let individual tokens (or all of a user's tokens) be revoked
+    to_encode.update({"exp": expire, "iat": now, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, secret_key, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -42,15 +49,18 @@ def decode_token(token: str, secret_key: str) -> dict:
 async def get_token_data(token: str = Depends(oauth2_scheme)) -> dict:
     return decode_token(token, settings.ACCESS_TOKEN_SECRET)
 
-def verify_refresh_token(token: str) -> Optional[str]:
+def get_refresh_token_payload(token: str) -> Optional[dict]:
     try:
-        payload = jwt.decode(
+        return jwt.decode(
             token, settings.REFRESH_TOKEN_SECRET, algorithms=[settings.ALGORITHM]
         )
-        return payload.get("sub")
     except JWTError:
         return None
 
+def verify_refresh_token(token: str) -> Optional[str]:
+    payload = get_refresh_token_payload(token)
+    return payload.get("sub") if payload else None
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create an access token."""
     return create_token(data, settings.ACCESS_TOKEN_SECRET, expires_delta)
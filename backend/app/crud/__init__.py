@@ -3,6 +3,7 @@ from app.crud.user import (  # noqa: F401
     get_user_by_email,
     get_user_by_username,
     get_users,
+    count_users,
     create_user,
     update_user,
     update_user_profile_image,
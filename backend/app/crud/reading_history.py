@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.db.pagination import Page, decode_cursor, paginate
+from app.db.writes import insert_returning
+from app.models.reading_history import ReadingHistory
+from uuid import UUID
+
+# Newest first; (read_at, id) is unique and matches ix_reading_history_user_id_read_at
+HISTORY_KEYS = (ReadingHistory.read_at, ReadingHistory.id)
+
+def _window_start(since: Optional[datetime]) -> datetime:
+    # Older partitions have been dropped, so never look further back than the retention window
+    return since or datetime.utcnow() - timedelta(days=settings.READING_HISTORY_RETENTION_DAYS)
+
+async def record_read(
+    db: AsyncSession,
+    user_id: UUID,
+    paper_id: str,
+    reading_time: int = 0,
+    progress: float = 0.0,
+    completed: bool = False,
+) -> ReadingHistory:
+    entry = await insert_returning(db, ReadingHistory, {
+        "user_id": user_id,
+        "paper_id": paper_id,
+        "reading_time": reading_time,
+        "progress": progress,
+        "completed": completed,
+    })
+    await db.commit()
+    return entry
+
+async def get_reading_history(
+    db: AsyncSession,
+    user_id: UUID,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+) -> Page:
+    """
+    A user's reads, newest first, ``limit`` at a time.
+
+    Every query bounds ``read_at`` with plain comparisons so Postgres prunes
+    the partitions outside the window; the keyset condition alone is a row
+    comparison, which the planner cannot prune on.
+    """
+    stmt = select(ReadingHistory).where(
+        ReadingHistory.user_id == user_id,
+        ReadingHistory.read_at >= _window_start(since),
+    )
+    if until is not None:
+        stmt = stmt.where(ReadingHistory.read_at < until)
+    if cursor:
+        stmt = stmt.where(ReadingHistory.read_at <= decode_cursor(cursor, HISTORY_KEYS)[0])
+    return await paginate(db, stmt, HISTORY_KEYS, limit=limit, cursor=cursor, descending=True)
+
+async def get_reading_totals(db: AsyncSession, user_id: UUID, since: Optional[datetime] = None) -> dict:
+    """Papers read and seconds spent by a user since ``since`` (default: the retention window)."""
+    result = await db.execute(
+        select(
+            func.count(ReadingHistory.id),
+            func.coalesce(func.sum(ReadingHistory.reading_time), 0),
+        ).where(
+            ReadingHistory.user_id == user_id,
+            ReadingHistory.read_at >= _window_start(since),
+        )
+    )
+    papers, seconds = result.one()
+    return {"papers_read": papers, "reading_time": seconds}
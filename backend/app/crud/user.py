@@ -1,62 +1,65 @@
-from typing import Optional, List
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async, verify_password_async
+from app.db.counts import Count, count_service
+from app.db.pagination import Page, created_at_keys, paginate
+from app.db.statements import USER_BY_EMAIL, USER_BY_ID, USER_BY_USERNAME
+from app.db.writes import insert_returning, update_returning
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
+from app.services.user_cache import user_cache
 from uuid import UUID
 
 async def get_user_by_id(db: AsyncSession, id: UUID) -> Optional[User]:
-    result = await db.execute(select(User).filter(User.id == id))
+    result = await db.execute(USER_BY_ID, {"id": id})
     return result.scalar_one_or_none()
 
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
-    result = await db.execute(select(User).filter(User.email == email))
+    result = await db.execute(USER_BY_EMAIL, {"email": email})
     return result.scalar_one_or_none()
 
 async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
-    result = await db.execute(select(User).filter(User.username == username))
+    result = await db.execute(USER_BY_USERNAME, {"username": username})
     return result.scalar_one_or_none()
 
-async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[User]:
-    result = await db.execute(select(User).offset(skip).limit(limit))
-    return result.scalars().all()
+async def get_users(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100) -> Page:
+    """Users in creation order, ``limit`` at a time; pass the previous page's ``next_cursor``."""
+    return await paginate(db, select(User), created_at_keys(User), limit=limit, cursor=cursor)
+
+async def count_users(db: AsyncSession) -> Count:
+    """Total users for listings; estimated from planner statistics on big tables."""
+    return await count_service.count(db, select(User))
 
 async def create_user(db: AsyncSession, user: UserCreate) -> User:
-    hashed_password = get_password_hash(user.password)
-    db_user = User(
-        email=user.email,
-        username=user.username,
-        hashed_password=hashed_password,
-        full_name=user.full_name,
-        profile_image=user.profile_image,
-        is_active=True,
-    )
-    db.add(db_user)
+    hashed_password = await get_password_hash_async(user.password)
+    db_user = await insert_returning(db, User, {
+        "email": user.email,
+        "username": user.username,
+        "hashed_password": hashed_password,
+        "full_name": user.full_name,
+        "profile_image": user.profile_image,
+        "is_active": True,
+    })
     await db.commit()
-    await db.refresh(db_user)
     return db_user
 
 async def update_user(db: AsyncSession, db_user: User, user_in: UserUpdate) -> User:
     update_data = user_in.dict(exclude_unset=True)
     if "password" in update_data:
-        hashed_password = get_password_hash(update_data["password"])
+        hashed_password = await get_password_hash_async(update_data["password"])
         del update_data["password"]
         update_data["hashed_password"] = hashed_password
     
-    for field, value in update_data.items():
-        setattr(db_user, field, value)
-    
-    db.add(db_user)
+    db_user = await update_returning(db, db_user, update_data)
     await db.commit()
-    await db.refresh(db_user)
+    await user_cache.invalidate(db_user.id)
     return db_user
 
 async def update_user_profile_image(db: AsyncSession, db_user: User, image_url: str) -> User:
-    db_user.profile_image = image_url
-    db.add(db_user)
+    db_user = await update_returning(db, db_user, {"profile_image": image_url})
     await db.commit()
-    await db.refresh(db_user)
+    await user_cache.invalidate(db_user.id)
     return db_user
 
 async def remove_profile_image(db: AsyncSession, db_user: User) -> User:
@@ -70,17 +73,16 @@ async def remove_profile_image(db: AsyncSession, db_user: User) -> User:
     Returns:
         Updated User object
     """
-    db_user.profile_image = None
-    db.add(db_user)
+    db_user = await update_returning(db, db_user, {"profile_image": None})
     await db.commit()
-    await db.refresh(db_user)
+    await user_cache.invalidate(db_user.id)
     return db_user
 
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     user = await get_user_by_email(db, email=email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return None
     return user
 
@@ -0,0 +1,122 @@
+"""
+Row counts for paginated listings.
+
+``COUNT(*)`` has to visit every matching row, so a total over a big table
+costs a full scan per request. ``count_service.count(db, stmt)`` asks the
+planner first (``EXPLAIN (FORMAT JSON)``, which reads only table
+statistics): when it expects at least ``COUNT_EXACT_THRESHOLD`` rows that
+estimate is the answer, otherwise the rows are counted exactly. Results are
+cached per statement and parameters for ``COUNT_CACHE_SECONDS``.
+"""
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import Executable, ClauseElement
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class Count:
+    """A row count; ``exact`` is False when it is the planner's estimate."""
+
+    value: int
+    exact: bool
+
+    def headers(self) -> Dict[str, str]:
+        return {"X-Total-Count": str(self.value), "X-Total-Count-Exact": "true" if self.exact else "false"}
+
+
+class Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON) <stmt>``, keeping the statement's bound parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, stmt: Select):
+        self.stmt = stmt
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler: Any, **kw: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.stmt, **kw)
+
+
+def planned_rows(plan: Any) -> int:
+    """Rows the top node of an ``EXPLAIN (FORMAT JSON)`` result is expected to return."""
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class CountService:
+    """Estimated or exact counts, cached in-process with a short TTL."""
+
+    def __init__(self, threshold: int, ttl: float, max_entries: int = 1024):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, Count]]" = OrderedDict()
+        self._hits = 0
+        self._estimated = 0
+        self._exact = 0
+
+    def _key(self, stmt: Select) -> Tuple[str, str]:
+        compiled = stmt.compile()
+        return str(compiled), repr(sorted(compiled.params.items()))
+
+    async def _estimate(self, db: AsyncSession, stmt: Select) -> int:
+        result = await db.execute(Explain(stmt))
+        return planned_rows(result.scalar())
+
+    async def _exact_count(self, db: AsyncSession, stmt: Select) -> int:
+        subquery = stmt.order_by(None).limit(None).offset(None).subquery()
+        return int(await db.scalar(select(func.count()).select_from(subquery)))
+
+    async def count(self, db: AsyncSession, stmt: Select) -> Count:
+        """Rows ``stmt`` would return, estimated when that is at least ``threshold``."""
+        key = self._key(stmt)
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            self._hits += 1
+            self._cache.move_to_end(key)
+            return cached[1]
+
+        count = None
+        dialect = db.get_bind().dialect
+        # Only Postgres is asked for an estimate (other databases are counted exactly)
+        if dialect.name == "postgresql":
+            estimate = await self._estimate(db, stmt)
+            if estimate >= self.threshold:
+                count = Count(value=estimate, exact=False)
+                self._estimated += 1
+        if count is None:
+            count = Count(value=await self._exact_count(db, stmt), exact=True)
+            self._exact += 1
+
+        self._cache[key] = (time.monotonic(), count)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return count
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threshold": self.threshold,
+            "cached": len(self._cache),
+            "hits": self._hits,
+            "estimated": self._estimated,
+            "exact": self._exact,
+        }
+
+
+count_service = CountService(threshold=settings.COUNT_EXACT_THRESHOLD, ttl=settings.COUNT_CACHE_SECONDS)
@@ -1,46 +1,27 @@
-from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.orm import sessionmaker
 import logging
-import os
 from contextlib import contextmanager
 
-from app.core.config import settings
+from fastapi import Request
 
-logger = logging.getLogger(__name__)
-
-# Fetch variables
-USER = "postgres.ovssikmitelxawvjhhgg"
-PASSWORD = settings.DATABASE_PASSWORD
-HOST = settings.DATABASE_HOST
-PORT = settings.DATABASE_PORT
-DBNAME = settings.DATABASE_NAME
+from app.db.engines import engines
+from app.db.session import is_read_only
 
-# Build the DATABASE_URL from environment variables
-DATABASE_URL = f"postgresql+psycopg2://{USER}:{PASSWORD}@{HOST}:{PORT}/{DBNAME}"
-if settings.DATABASE_SSL:
-    DATABASE_URL += "?sslmode=require"
-    
-print(f"DATABASE_URL (sync): {DATABASE_URL}")
+logger = logging.getLogger(__name__)
 
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-    connect_args={
-        "application_name": "rescroll_app",
-        "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", 15))
-    }
-)
+def get_sync_engine() -> Engine:
+    """
+    The psycopg2 engine, created on first use.
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Only sync code (scripts, the connection test endpoint) should need it;
+    request handlers use the async engine in app.db.session.
+    """
+    return engines.get_sync_engine()
 
-# Create a scoped session
-db_session = scoped_session(SessionLocal)
+# Create session factory (bound to the sync engine per session)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 # Create Base class for models
 Base = declarative_base()
@@ -48,7 +29,7 @@ Base = declarative_base()
 @contextmanager
 def get_db():
     """Context manager for database sessions."""
-    db = SessionLocal()
+    db = SessionLocal(bind=get_sync_engine())
     try:
         yield db
         db.commit()
@@ -60,9 +41,21 @@ def get_db():
         db.close()
 
 # Dependency for FastAPI
-def get_db_dependency():
-    """Dependency for FastAPI endpoints."""
-    db = SessionLocal()
+def get_db_dependency(request: Request):
+    """
+    Dependency for FastAPI endpoints.
+
+    Read-only requests (see app.db.session.is_read_only) run in autocommit
+    mode and skip the final COMMIT.
+    """
+    if is_read_only(request):
+        db = SessionLocal(bind=engines.get_sync_autocommit_engine())
+        try:
+            yield db
+        finally:
+            db.close()
+        return
+    db = SessionLocal(bind=get_sync_engine())
     try:
         yield db
         db.commit()
@@ -71,4 +64,4 @@ def get_db_dependency():
         db.rollback()
         raise
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
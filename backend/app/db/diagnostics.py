@@ -0,0 +1,50 @@
+import socket
+import urllib.request
+from typing import Any, Dict
+
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Function to check internet connectivity
+def check_internet_connection(host="8.8.8.8", port=53, timeout=3):
+    """Check if there is an internet connection by connecting to Google's DNS"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+# Function to get current IP for debugging
+def get_external_ip(timeout=5):
+    """Get external IP address for debugging network issues"""
+    try:
+        return urllib.request.urlopen('https://api.ipify.org', timeout=timeout).read().decode('utf8')
+    except Exception:
+        return "Unable to get IP"
+
+def resolve_database_host() -> Dict[str, Any]:
+    """Resolve the configured database host."""
+    try:
+        host_ip = socket.gethostbyname(settings.DATABASE_HOST)
+        logger.info(f"Resolved database host {settings.DATABASE_HOST} to IP: {host_ip}")
+        return {"host": settings.DATABASE_HOST, "ip": host_ip}
+    except socket.gaierror as e:
+        logger.error(f"Failed to resolve database host {settings.DATABASE_HOST}: {str(e)}")
+        return {"host": settings.DATABASE_HOST, "error": str(e)}
+
+def run_network_diagnostics() -> Dict[str, Any]:
+    """
+    Network checks for diagnosing database connection problems.
+
+    Blocking; these used to run on every import of app.db.session and are
+    now only run on demand (see /system/network-diagnostics).
+    """
+    internet_available = check_internet_connection()
+    logger.info(f"Internet connection available: {internet_available}")
+    return {
+        "internet_available": internet_available,
+        "external_ip": get_external_ip() if internet_available else None,
+        "database_host": resolve_database_host(),
+    }
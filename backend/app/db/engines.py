@@ -0,0 +1,365 @@
+import logging
+import math
+import ssl
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Type
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.db.instrumentation import instrument_engine
+
+logger = logging.getLogger(__name__)
+
+
+# Set by the pool maintainer so its own checkouts stay out of the warm/cold counts
+maintenance_checkout: ContextVar[bool] = ContextVar("maintenance_checkout", default=False)
+
+
+class PoolTelemetry:
+    """Checkout wait times and overflow/timeout/warm/cold counts for one pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.warm_checkouts = 0
+        self.cold_checkouts = 0
+        self.disconnects = 0
+        self.wait_times: deque = deque(maxlen=1000)
+
+    def attach(self, engine: Engine) -> None:
+        """Count new connections, warm/cold checkouts and disconnect errors on ``engine``."""
+
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+            self.connects += 1
+            connection_record.info["fresh"] = True
+
+        @event.listens_for(engine, "checkout")
+        def on_checkout(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+            # A checkout is cold when it had to open a connection first
+            fresh = connection_record.info.pop("fresh", False)
+            if maintenance_checkout.get():
+                return
+            if fresh:
+                self.cold_checkouts += 1
+            else:
+                self.warm_checkouts += 1
+
+        @event.listens_for(engine, "handle_error")
+        def on_error(context: Any) -> None:
+            if context.is_disconnect:
+                # SQLAlchemy invalidates the pool; the maintainer refills it
+                self.disconnects += 1
+
+    def record_checkout(self, wait: float, overflowed: bool) -> None:
+        self.checkouts += 1
+        self.wait_times.append(wait)
+        if overflowed:
+            self.overflow_events += 1
+
+    def stats(self, pool: Any) -> Dict[str, Any]:
+        waits = sorted(self.wait_times)
+        return {
+            "size": pool.size(),
+            "in_use": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "checkouts": self.checkouts,
+            "overflow_events": self.overflow_events,
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "warm_checkouts": self.warm_checkouts,
+            "cold_checkouts": self.cold_checkouts,
+            "disconnects": self.disconnects,
+            "checkout_wait_avg_ms": sum(waits) / max(len(waits), 1) * 1000,
+            "checkout_wait_p99_ms": waits[int(0.99 * (len(waits) - 1))] * 1000 if waits else 0.0,
+            "checkout_wait_max_ms": waits[-1] * 1000 if waits else 0.0,
+        }
+
+
+class InstrumentedPoolMixin:
+    """Times each checkout from the pool and notes when it had to overflow."""
+
+    telemetry: PoolTelemetry
+
+    def _do_get(self):
+        overflow_before = self._overflow
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.telemetry.timeouts += 1
+            raise
+        overflowed = self._overflow > overflow_before and self._overflow > 0
+        self.telemetry.record_checkout(time.perf_counter() - start, overflowed)
+        return connection
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_class(base: Type, telemetry: PoolTelemetry) -> Type:
+    # Pool.recreate() (e.g. on dispose) instantiates self.__class__, so the
+    # telemetry has to live on a per-engine subclass rather than the instance
+    return type(base.__name__, (base,), {"telemetry": telemetry})
+
+def create_ssl_context() -> ssl.SSLContext:
+    """SSL context for asyncpg: no certificate or hostname verification (Supabase pooler)."""
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+def asyncpg_connect_args() -> Dict[str, Any]:
+    """
+    asyncpg connect arguments: SSL, and the prepared statement caches.
+
+    Each connection keeps up to ``DB_PREPARED_STATEMENT_CACHE_SIZE`` prepared
+    statements, so repeated statements skip the parse/plan round trip. Set it
+    to 0 behind a transaction-mode pooler (pgbouncer, Supabase port 6543),
+    where a connection's prepared statements vanish between transactions.
+    """
+    cache_size = settings.DB_PREPARED_STATEMENT_CACHE_SIZE
+    connect_args: Dict[str, Any] = {"prepared_statement_cache_size": cache_size}
+    if cache_size == 0:
+        connect_args["statement_cache_size"] = 0
+    if settings.DATABASE_SSL:
+        # For asyncpg, SSL is passed differently than psycopg2
+        connect_args["ssl"] = create_ssl_context()
+        connect_args["server_settings"] = {"application_name": "rescroll_async_app"}
+    return connect_args
+
+def async_database_url() -> str:
+    # Parse out any SSL mode in the connection string since asyncpg handles it differently
+    return str(settings.SQLALCHEMY_DATABASE_URI).split("?sslmode=")[0]
+
+def replica_database_urls() -> List[str]:
+    return [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
+def shard_database_urls() -> Dict[str, str]:
+    """
+    ``DATABASE_SHARD_URLS`` as ``{name: url}``.
+
+    Entries are ``name=url`` or a bare URL (named ``shard<position>``). Name
+    shards explicitly if they may ever be removed: the hash ring places users
+    by shard name, so names must stay stable.
+    """
+    shards = {}
+    for index, entry in enumerate(url.strip() for url in settings.DATABASE_SHARD_URLS.split(",")):
+        if not entry:
+            continue
+        name, _, url = entry.partition("=")
+        if "://" in name or not url:
+            name, url = f"shard{index}", entry
+        shards[name.strip()] = url.strip()
+    return shards
+
+def sync_database_url() -> str:
+    url = (
+        f"postgresql+psycopg2://postgres.ovssikmitelxawvjhhgg:{settings.DATABASE_PASSWORD}"
+        f"@{settings.DATABASE_HOST}:{settings.DATABASE_PORT}/{settings.DATABASE_NAME}"
+    )
+    if settings.DATABASE_SSL:
+        url += "?sslmode=require"
+    return url
+
+
+class EngineRegistry:
+    """
+    The process's database engines, sized from one connection budget.
+
+    ``DB_MAX_CONNECTIONS`` is the most connections a process may hold.
+    ``DB_SYNC_MAX_CONNECTIONS`` of them are reserved for the psycopg2 engine,
+    which is only created when sync code asks for it; the asyncpg engine gets
+    the rest, half as a steady pool and half as overflow. Both wait at most
+    ``DB_POOL_TIMEOUT`` seconds for a connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._async_engine: Optional[AsyncEngine] = None
+        self._autocommit_engine: Optional[AsyncEngine] = None
+        self._sync_engine: Optional[Engine] = None
+        self._sync_autocommit_engine: Optional[Engine] = None
+        self._replica_engines: Optional[List[AsyncEngine]] = None
+        self._shard_engines: Optional[Dict[str, AsyncEngine]] = None
+        self._telemetry: Dict[str, PoolTelemetry] = {}
+
+    def _pool_args(self, limit: int) -> Dict[str, Any]:
+        limit = max(1, limit)
+        pool_size = int(math.ceil(limit / 2))
+        return {
+            "pool_size": pool_size,
+            "max_overflow": limit - pool_size,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": 300,
+            # Idle connections are validated in the background (app.db.pool_maintenance)
+            # instead of with a SELECT 1 on every checkout
+            "pool_pre_ping": False,
+        }
+
+    def get_async_engine(self) -> AsyncEngine:
+        if self._async_engine is None:
+            with self._lock:
+                if self._async_engine is None:
+                    telemetry = self._telemetry.setdefault("async", PoolTelemetry("async"))
+                    args = self._pool_args(settings.DB_MAX_CONNECTIONS - settings.DB_SYNC_MAX_CONNECTIONS)
+                    args["connect_args"] = asyncpg_connect_args()
+                    self._async_engine = create_async_engine(
+                        async_database_url(),
+                        echo=settings.DEBUG,
+                        poolclass=_pool_class(InstrumentedAsyncQueuePool, telemetry),
+                        **args,
+                    )
+                    telemetry.attach(self._async_engine.sync_engine)
+                    instrument_engine(self._async_engine.sync_engine)
+                    logger.info(
+                        f"Created async database engine (pool {args['pool_size']} + {args['max_overflow']} overflow)"
+                    )
+        return self._async_engine
+
+    def get_autocommit_engine(self) -> AsyncEngine:
+        """The async engine in AUTOCOMMIT mode; it shares the engine's pool."""
+        if self._autocommit_engine is None:
+            self._autocommit_engine = self.get_async_engine().execution_options(isolation_level="AUTOCOMMIT")
+        return self._autocommit_engine
+
+    def get_sync_engine(self) -> Engine:
+        if self._sync_engine is None:
+            with self._lock:
+                if self._sync_engine is None:
+                    telemetry = self._telemetry.setdefault("sync", PoolTelemetry("sync"))
+                    limit = max(1, settings.DB_SYNC_MAX_CONNECTIONS)
+                    args = self._pool_args(limit)
+                    args.update(pool_size=limit, max_overflow=0)
+                    self._sync_engine = create_engine(
+                        sync_database_url(),
+                        echo=settings.DEBUG,
+                        poolclass=_pool_class(InstrumentedQueuePool, telemetry),
+                        connect_args={
+                            "application_name": "rescroll_app",
+                            "connect_timeout": settings.DB_CONNECT_TIMEOUT,
+                        },
+                        **args,
+                    )
+                    telemetry.attach(self._sync_engine)
+                    instrument_engine(self._sync_engine)
+                    logger.info(f"Created sync database engine (pool {limit})")
+        return self._sync_engine
+
+    def get_sync_autocommit_engine(self) -> Engine:
+        """The sync engine in AUTOCOMMIT mode; it shares the engine's pool."""
+        if self._sync_autocommit_engine is None:
+            self._sync_autocommit_engine = self.get_sync_engine().execution_options(isolation_level="AUTOCOMMIT")
+        return self._sync_autocommit_engine
+
+    def get_replica_engines(self) -> List[AsyncEngine]:
+        """
+        Async engines for the read replicas in ``DATABASE_REPLICA_URLS``.
+
+        Replicas are separate servers, so each gets its own
+        ``DB_REPLICA_MAX_CONNECTIONS`` budget.
+        """
+        if self._replica_engines is None:
+            with self._lock:
+                if self._replica_engines is None:
+                    replica_engines = []
+                    for index, url in enumerate(replica_database_urls()):
+                        name = f"replica{index}"
+                        telemetry = self._telemetry.setdefault(name, PoolTelemetry(name))
+                        args = self._pool_args(settings.DB_REPLICA_MAX_CONNECTIONS)
+                        args["connect_args"] = asyncpg_connect_args()
+                        replica_engine = create_async_engine(
+                            url.split("?sslmode=")[0],
+                            echo=settings.DEBUG,
+                            poolclass=_pool_class(InstrumentedAsyncQueuePool, telemetry),
+                            **args,
+                        )
+                        telemetry.attach(replica_engine.sync_engine)
+                        instrument_engine(replica_engine.sync_engine)
+                        replica_engines.append(replica_engine)
+                    if replica_engines:
+                        logger.info(f"Created {len(replica_engines)} read replica engine(s)")
+                    self._replica_engines = replica_engines
+        return self._replica_engines
+
+    def get_shard_engines(self) -> Dict[str, AsyncEngine]:
+        """
+        Async engines for the user data shards in ``DATABASE_SHARD_URLS``.
+
+        Each shard is a separate database with its own
+        ``DB_SHARD_MAX_CONNECTIONS`` budget; see app.db.sharding.
+        """
+        if self._shard_engines is None:
+            with self._lock:
+                if self._shard_engines is None:
+                    shard_engines = {}
+                    for name, url in shard_database_urls().items():
+                        telemetry_name = f"shard:{name}"
+                        telemetry = self._telemetry.setdefault(telemetry_name, PoolTelemetry(telemetry_name))
+                        args = self._pool_args(settings.DB_SHARD_MAX_CONNECTIONS)
+                        args["connect_args"] = asyncpg_connect_args()
+                        shard_engine = create_async_engine(
+                            url.split("?sslmode=")[0],
+                            echo=settings.DEBUG,
+                            poolclass=_pool_class(InstrumentedAsyncQueuePool, telemetry),
+                            **args,
+                        )
+                        telemetry.attach(shard_engine.sync_engine)
+                        instrument_engine(shard_engine.sync_engine)
+                        shard_engines[name] = shard_engine
+                    if shard_engines:
+                        logger.info(f"Created {len(shard_engines)} shard engine(s)")
+                    self._shard_engines = shard_engines
+        return self._shard_engines
+
+    def async_engines(self) -> List[AsyncEngine]:
+        """The async engines created so far (primary first, then replicas and shards)."""
+        created = [self._async_engine] if self._async_engine is not None else []
+        return created + list(self._replica_engines or []) + list((self._shard_engines or {}).values())
+
+    async def dispose(self) -> None:
+        """Close every pooled connection and forget the engines."""
+        async_engine, self._async_engine = self._async_engine, None
+        self._autocommit_engine = None
+        self._sync_autocommit_engine = None
+        sync_engine, self._sync_engine = self._sync_engine, None
+        replica_engines, self._replica_engines = self._replica_engines or [], None
+        shard_engines, self._shard_engines = self._shard_engines or {}, None
+        if async_engine is not None:
+            await async_engine.dispose()
+        for replica_engine in replica_engines + list(shard_engines.values()):
+            await replica_engine.dispose()
+        if sync_engine is not None:
+            sync_engine.dispose()
+
+    def stats(self) -> Dict[str, Any]:
+        pools = {}
+        named = [("async", self._async_engine), ("sync", self._sync_engine)]
+        named += [(f"replica{index}", engine) for index, engine in enumerate(self._replica_engines or [])]
+        named += [(f"shard:{name}", engine) for name, engine in (self._shard_engines or {}).items()]
+        for name, engine in named:
+            if engine is not None:
+                pools[name] = self._telemetry[name].stats(engine.pool)
+        return {
+            "max_connections": settings.DB_MAX_CONNECTIONS,
+            "pools": pools,
+        }
+
+
+engines = EngineRegistry()
@@ -0,0 +1,133 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Statement text is trimmed to this many characters in reports
+MAX_STATEMENT_LENGTH = 300
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    The statement with whitespace collapsed.
+
+    SQLAlchemy sends bound parameters separately, so statements that differ
+    only in their values already have the same text; ``IN`` lists expanded
+    to different lengths are folded together as well.
+    """
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    return re.sub(r"\((?:\$\d+|%\(\w+\)s|\?)(?:, (?:\$\d+|%\(\w+\)s|\?))*\)", "(...)", shape)
+
+
+class QueryStats:
+    """Statements run while a collector is active (one request, one test block)."""
+
+    def __init__(self, n_plus_one_threshold: int = 5, top_n: int = 5):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.top_n = top_n
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes: Counter = Counter()
+        self._slowest: List[Tuple[float, str]] = []
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        shape = statement_shape(statement)
+        self.shapes[shape] += 1
+        if len(self._slowest) < self.top_n or duration > self._slowest[-1][0]:
+            self._slowest.append((duration, shape[:MAX_STATEMENT_LENGTH]))
+            self._slowest.sort(key=lambda item: item[0], reverse=True)
+            del self._slowest[self.top_n:]
+
+    @property
+    def repeated(self) -> Dict[str, int]:
+        """Statement shapes run at least ``n_plus_one_threshold`` times: likely N+1 loops."""
+        return {
+            shape[:MAX_STATEMENT_LENGTH]: count
+            for shape, count in self.shapes.items()
+            if count >= self.n_plus_one_threshold
+        }
+
+    @property
+    def slowest(self) -> List[Dict[str, Any]]:
+        return [{"statement": shape, "ms": duration * 1000} for duration, shape in self._slowest]
+
+    def header_value(self) -> str:
+        value = f"count={self.count}; time_ms={self.total_time * 1000:.1f}"
+        if self.repeated:
+            value += f"; repeated={max(self.repeated.values())}"
+        return value
+
+
+# Collectors that statements on the current task are recorded into (nested ones included)
+_collectors: ContextVar[Tuple[QueryStats, ...]] = ContextVar("db_query_collectors", default=())
+
+# Statement listeners installed by other modules (e.g. the slow query log)
+_listeners: List[Any] = []
+
+
+def add_statement_listener(listener: Any) -> None:
+    """Call ``listener(statement, parameters, duration, connection)`` after every instrumented statement."""
+    _listeners.append(listener)
+
+
+@contextmanager
+def collect_queries(stats: Optional[QueryStats] = None) -> Iterator[QueryStats]:
+    """Record the statements run inside the block (on this task and its greenlets) into ``stats``."""
+    stats = stats or QueryStats()
+    token = _collectors.set(_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[QueryStats]:
+    """
+    Fail if the block runs more than ``max_queries`` statements.
+
+    For tests::
+
+        with query_budget(2):
+            response = await client.get("/api/v1/users/me")
+    """
+    with collect_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        shapes = "\n".join(f"  {count}x {shape}" for shape, count in stats.shapes.most_common())
+        raise AssertionError(f"Expected at most {max_queries} queries, ran {stats.count}:\n{shapes}")
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement on ``engine`` and record it into the active collectors."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        for stats in _collectors.get():
+            stats.record(statement, duration)
+        for listener in _listeners:
+            listener(statement, parameters, duration, conn)
+
+    @event.listens_for(engine, "handle_error")
+    def on_error(context: Any) -> None:
+        # The failed statement never reaches after_cursor_execute
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
@@ -0,0 +1,97 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+T = TypeVar("T")
+
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    """The cursor was not produced by this listing (or was tampered with)."""
+
+
+@dataclass(frozen=True)
+class Page(Generic[T]):
+    """One page of a keyset-paginated listing; ``next_cursor`` is None on the last page."""
+
+    items: List[T]
+    next_cursor: Optional[str]
+
+
+def created_at_keys(model: Any) -> Tuple[Any, Any]:
+    """The default sort key: creation time, with the primary key breaking ties."""
+    return (model.created_at, model.id)
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (int, float, str)) or value is None:
+        return value
+    return str(value)
+
+
+def _load(value: Any, column: Any) -> Any:
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque token for the sort key of the last row on a page."""
+    raw = json.dumps([_dump(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[Any]) -> Tuple[Any, ...]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError("wrong number of values")
+        return tuple(_load(value, key) for value, key in zip(values, keys))
+    except (TypeError, ValueError) as e:
+        raise InvalidCursor(f"Invalid cursor: {str(e)}") from e
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    keys: Sequence[Any],
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+) -> Page:
+    """
+    Run ``stmt`` one page at a time, ordered by ``keys``.
+
+    Instead of ``OFFSET``, each page starts after the sort key of the
+    previous page's last row (``WHERE (created_at, id) > (:a, :b)``), so
+    with an index on ``keys`` a deep page costs the same as the first one
+    and rows inserted meanwhile do not shift later pages. ``keys`` must be
+    unique together and non-null; ``stmt`` must select one entity whose
+    attributes include them.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor:
+        after = decode_cursor(cursor, keys)
+        row_key = tuple_(*keys)
+        stmt = stmt.where(row_key < tuple_(*after) if descending else row_key > tuple_(*after))
+    order = [key.desc() for key in keys] if descending else list(keys)
+    # One extra row tells us whether there is a next page
+    result = await db.execute(stmt.order_by(*order).limit(limit + 1))
+    items = list(result.scalars().all())
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, key.key) for key in keys])
+    return Page(items=items, next_cursor=next_cursor)
@@ -0,0 +1,137 @@
+"""
+Monthly range partitions.
+
+Tables declared with ``postgresql_partition_by="RANGE (<column>)"`` get one
+partition per calendar month, named ``<table>_y2026m10``. There is no
+default partition: ``create()`` keeps the current month and the next
+``READING_HISTORY_PARTITIONS_AHEAD`` months in place (at startup and from
+the daily maintenance task), and an insert outside them fails loudly rather
+than landing in a catch-all that would later have to be split.
+
+Retention detaches and drops whole partitions, which is instant and leaves
+no dead tuples behind, instead of deleting rows.
+"""
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+@dataclass(frozen=True)
+class MonthlyPartitions:
+    """Partition maintenance for one table range-partitioned by month on ``column``."""
+
+    table: str
+    column: str
+
+    def name_for(self, month: date) -> str:
+        return f"{self.table}_y{month.year}m{month.month:02d}"
+
+    def month_of(self, name: str) -> date:
+        match = re.fullmatch(rf"{re.escape(self.table)}_y(\d{{4}})m(\d{{2}})", name)
+        if match is None:
+            raise ValueError(f"{name} is not a monthly partition of {self.table}")
+        return date(int(match.group(1)), int(match.group(2)), 1)
+
+    def create_sql(self, month: date) -> str:
+        return (
+            f"CREATE TABLE IF NOT EXISTS {self.name_for(month)} PARTITION OF {self.table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        )
+
+    def expired(self, names: List[str], cutoff: datetime) -> List[str]:
+        """Partitions holding only rows older than ``cutoff``."""
+        months = []
+        for name in names:
+            try:
+                months.append((self.month_of(name), name))
+            except ValueError:
+                continue
+        return [name for month, name in sorted(months) if add_months(month, 1) <= cutoff.date()]
+
+    async def partitions(self, engine: AsyncEngine) -> List[str]:
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                text(
+                    "SELECT child.relname FROM pg_inherits "
+                    "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                    "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                    "WHERE parent.relname = :table ORDER BY child.relname"
+                ),
+                {"table": self.table},
+            )
+            return list(result.scalars())
+
+    async def create(self, engine: AsyncEngine, ahead: int, today: Optional[date] = None) -> List[str]:
+        """Make sure this month's and the next ``ahead`` months' partitions exist."""
+        first = month_start(today or datetime.utcnow().date())
+        months = [add_months(first, offset) for offset in range(ahead + 1)]
+        existing = set(await self.partitions(engine))
+        missing = [month for month in months if self.name_for(month) not in existing]
+        if missing:
+            async with engine.begin() as conn:
+                # Workers starting together would otherwise race on the same partitions
+                await conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:table))"), {"table": self.table})
+                for month in missing:
+                    await conn.execute(text(self.create_sql(month)))
+            logger.info(f"Created partitions {', '.join(self.name_for(month) for month in missing)}")
+        return [self.name_for(month) for month in missing]
+
+    async def drop_before(self, engine: AsyncEngine, cutoff: datetime, keep_detached: bool = False) -> List[str]:
+        """
+        Detach and drop the partitions entirely older than ``cutoff``.
+
+        ``DETACH ... CONCURRENTLY`` does not block reads or writes on the
+        parent, but it cannot run inside a transaction, hence AUTOCOMMIT.
+        With ``keep_detached`` the tables are left in place (e.g. for
+        archiving) instead of dropped.
+        """
+        dropped = []
+        for name in self.expired(await self.partitions(engine), cutoff):
+            async with engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await conn.execute(text(f"ALTER TABLE {self.table} DETACH PARTITION {name} CONCURRENTLY"))
+                if not keep_detached:
+                    await conn.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+            logger.info(f"{'Detached' if keep_detached else 'Dropped'} partition {name}")
+        return dropped
+
+
+reading_history_partitions = MonthlyPartitions("reading_history", "read_at")
+
+PARTITIONED_TABLES: List[MonthlyPartitions] = [reading_history_partitions]
+
+
+async def create_partitions(engine: AsyncEngine, ahead: Optional[int] = None) -> List[str]:
+    ahead = settings.READING_HISTORY_PARTITIONS_AHEAD if ahead is None else ahead
+    created = []
+    for partitions in PARTITIONED_TABLES:
+        created += await partitions.create(engine, ahead)
+    return created
+
+
+async def drop_expired_partitions(engine: AsyncEngine, retention_days: Optional[int] = None) -> List[Tuple[str, str]]:
+    retention_days = settings.READING_HISTORY_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    dropped = []
+    for partitions in PARTITIONED_TABLES:
+        dropped += [(partitions.table, name) for name in await partitions.drop_before(engine, cutoff)]
+    return dropped
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.config import settings
+from app.db.engines import EngineRegistry, engines, maintenance_checkout
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMaintainer:
+    """
+    Keeps the async pools warm and healthy off the request path.
+
+    With ``pool_pre_ping`` off, a checkout costs no round trip, so dead
+    connections have to be found some other way. At startup each pool is
+    filled to ``min_idle`` connections; then every ``interval`` seconds the
+    idle connections are checked out ``batch_size`` at a time, sent
+    ``SELECT 1``, and invalidated if that fails, and the pool is topped back
+    up to ``min_idle``. Small batches leave the rest of the pool free for
+    requests meanwhile.
+    """
+
+    def __init__(self, registry: EngineRegistry, min_idle: int, interval: int, batch_size: int = 1):
+        self.registry = registry
+        self.min_idle = min_idle
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self._task: Optional[asyncio.Task] = None
+        self._prefilled = 0
+        self._validated = 0
+        self._invalidated = 0
+        self._runs = 0
+        self._errors = 0
+
+    async def _checkout(self, engine: AsyncEngine, count: int) -> List[AsyncConnection]:
+        connections = []
+        try:
+            for _ in range(count):
+                connections.append(await engine.connect())
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Pool maintenance checkout failed: {str(e)}")
+        return connections
+
+    async def fill(self, engine: AsyncEngine) -> int:
+        """Open connections until the pool holds ``min_idle`` of them."""
+        pool = engine.pool
+        missing = min(self.min_idle, pool.size()) - (pool.checkedin() + pool.checkedout())
+        if missing <= 0:
+            return 0
+        token = maintenance_checkout.set(True)
+        try:
+            connections = await asyncio.gather(
+                *[engine.connect().start() for _ in range(missing)],
+                return_exceptions=True,
+            )
+        finally:
+            maintenance_checkout.reset(token)
+        opened = 0
+        for connection in connections:
+            if isinstance(connection, Exception):
+                self._errors += 1
+                logger.warning(f"Pool prefill failed: {str(connection)}")
+                continue
+            opened += 1
+            await connection.close()
+        self._prefilled += opened
+        return opened
+
+    async def _ping(self, connections: List[AsyncConnection]) -> int:
+        invalidated = 0
+        for connection in connections:
+            try:
+                await connection.exec_driver_sql("SELECT 1")
+            except Exception as e:
+                invalidated += 1
+                logger.info(f"Discarding dead pooled connection: {str(e)}")
+                try:
+                    await connection.invalidate()
+                except Exception:
+                    pass
+            finally:
+                await connection.close()
+        return invalidated
+
+    async def validate(self, engine: AsyncEngine) -> int:
+        """Ping each idle connection once, ``batch_size`` at a time, invalidating the ones that fail."""
+        remaining = engine.pool.checkedin()
+        invalidated = 0
+        while remaining > 0:
+            # The pool is FIFO: a returned connection goes behind the ones not yet checked
+            token = maintenance_checkout.set(True)
+            try:
+                connections = await self._checkout(engine, min(self.batch_size, remaining))
+            finally:
+                maintenance_checkout.reset(token)
+            if not connections:
+                break
+            remaining -= len(connections)
+            invalidated += await self._ping(connections)
+            self._validated += len(connections)
+            # Let waiting requests have the connections back between batches
+            await asyncio.sleep(0)
+        self._invalidated += invalidated
+        return invalidated
+
+    async def run_once(self) -> None:
+        for engine in self.registry.async_engines():
+            await self.validate(engine)
+            await self.fill(engine)
+        self._runs += 1
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._errors += 1
+                logger.warning(f"Pool maintenance failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def start(self, prefill: bool = True) -> None:
+        """Prefill the pools (unless ``prefill`` is False), then keep validating them in the background."""
+        if self._task is not None:
+            return
+        if prefill:
+            for engine in self.registry.async_engines():
+                opened = await self.fill(engine)
+                logger.info(f"Prefilled database pool with {opened} connection(s)")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self._runs,
+            "prefilled": self._prefilled,
+            "validated": self._validated,
+            "invalidated": self._invalidated,
+            "errors": self._errors,
+        }
+
+
+pool_maintainer = PoolMaintainer(
+    engines,
+    min_idle=settings.DB_POOL_MIN_IDLE,
+    interval=settings.DB_POOL_VALIDATE_SECONDS,
+)
@@ -1,15 +1,6 @@
-from redis import Redis
-from app.core.config import settings
+from redis import asyncio as aioredis
+from app.core.redis import get_async_redis_client
 
-redis_client = Redis(
-    host=settings.REDIS_HOST,
-    port=settings.REDIS_PORT,
-    db=settings.REDIS_DB,
-    decode_responses=True
-)
-
-def get_redis():
-    try:
-        yield redis_client
-    finally:
-        redis_client.close() 
\ No newline at end of file
+def get_redis() -> aioredis.Redis:
+    """Dependency returning the process-wide asyncio client; its pool outlives the request."""
+    return get_async_redis_client()
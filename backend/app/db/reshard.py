@@ -0,0 +1,113 @@
+"""
+Move user data to the shards the hash ring now assigns it to.
+
+After adding a shard to ``DATABASE_SHARD_URLS``, deploy with
+``DATABASE_PREVIOUS_SHARDS`` set to the old shard names (so lookups fall
+back to a user's previous shard while the move is in progress), then run:
+
+    python -m app.db.reshard
+    python -m app.db.reshard --dry-run      # only count the users to move
+
+Each shard is walked in batches of user ids. For users now owned by
+another shard, the rows of every table in SHARDED_TABLES are locked on the
+source (``FOR UPDATE``), copied to the owner (``ON CONFLICT DO NOTHING``, so
+a rerun is harmless) and committed there, then deleted from the source.
+Request handlers still write through the primary session; routing their
+writes through ``shard_router`` (and retrying them against the new owner
+when a move deletes the row) is still to do. Once the move finishes, clear
+``DATABASE_PREVIOUS_SHARDS``.
+"""
+import argparse
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+from sqlalchemy import Table, delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.sharding import SHARDED_TABLES, ShardRouter, shard_router
+from app.models.base import Base
+import app.models  # noqa: F401  (registers the sharded tables)
+
+logger = logging.getLogger(__name__)
+
+
+def _table(name: str) -> Table:
+    return Base.metadata.tables[name]
+
+
+async def move_users(source: AsyncEngine, target: AsyncEngine, user_ids: List[Any]) -> None:
+    """Copy the users' rows from ``source`` to ``target``, then delete them from ``source``."""
+    async with source.connect() as source_conn:
+        async with source_conn.begin():
+            rows: Dict[str, List[Dict[str, Any]]] = {}
+            for table_name, key in SHARDED_TABLES:
+                table = _table(table_name)
+                result = await source_conn.execute(
+                    select(table).where(table.c[key].in_(user_ids)).with_for_update()
+                )
+                rows[table_name] = [dict(row._mapping) for row in result]
+
+            async with target.begin() as target_conn:
+                for table_name, _ in SHARDED_TABLES:
+                    if rows[table_name]:
+                        await target_conn.execute(
+                            pg_insert(_table(table_name)).values(rows[table_name]).on_conflict_do_nothing()
+                        )
+
+            for table_name, key in reversed(SHARDED_TABLES):
+                table = _table(table_name)
+                await source_conn.execute(delete(table).where(table.c[key].in_(user_ids)))
+
+
+async def reshard(router: ShardRouter, batch_size: int = 500, dry_run: bool = False) -> Dict[str, int]:
+    users = _table("users")
+    moved: Dict[str, int] = {}
+    for name, engine in router.shards.items():
+        moved[name] = 0
+        after = None
+        while True:
+            stmt = select(users.c.id).order_by(users.c.id).limit(batch_size)
+            if after is not None:
+                stmt = stmt.where(users.c.id > after)
+            async with engine.connect() as conn:
+                user_ids = list((await conn.execute(stmt)).scalars())
+            if not user_ids:
+                break
+            after = user_ids[-1]
+
+            by_owner: Dict[str, List[Any]] = {}
+            for user_id in user_ids:
+                owner = router.shard_for(user_id)
+                if owner != name:
+                    by_owner.setdefault(owner, []).append(user_id)
+            for owner, owned in by_owner.items():
+                if not dry_run:
+                    await move_users(engine, router.shards[owner], owned)
+                moved[name] += len(owned)
+        logger.info(f"{name}: {'would move' if dry_run else 'moved'} {moved[name]} users")
+    return moved
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move user data to its hash ring owner")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    async def run() -> None:
+        from app.db.session import dispose_engine
+
+        try:
+            moved = await reshard(shard_router, args.batch_size, args.dry_run)
+        finally:
+            await dispose_engine()
+        print(f"{'Would move' if args.dry_run else 'Moved'} {sum(moved.values())} users: {moved}")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import asyncio
+import itertools
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Replay lag in seconds; 0 when the replica has replayed everything it received
+REPLICA_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+class ReplicaMonitor:
+    """
+    Tracks which read replicas are fresh enough to serve reads.
+
+    A background task measures each replica's replay lag every
+    ``check_interval`` seconds. Replicas that lag more than ``max_lag`` or
+    fail the check are skipped until a later check passes; replicas start out
+    unchecked and unused.
+    """
+
+    def __init__(self, max_lag: float, check_interval: int):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._engines: List[AsyncEngine] = []
+        self._healthy: List[Engine] = []
+        self._autocommit: Dict[Engine, Engine] = {}
+        self._lag: Dict[int, Optional[float]] = {}
+        self._round_robin = itertools.cycle([None])
+        self._checker: Optional[asyncio.Task] = None
+        self._replica_reads = 0
+        self._primary_reads = 0
+        self._check_errors = 0
+
+    def set_engines(self, engines: List[AsyncEngine]) -> None:
+        self._engines = list(engines)
+        self._lag = {index: None for index in range(len(self._engines))}
+        self._set_healthy([])
+
+    def _set_healthy(self, healthy: List[Engine]) -> None:
+        self._healthy = healthy
+        for engine in healthy:
+            if engine not in self._autocommit:
+                self._autocommit[engine] = engine.execution_options(isolation_level="AUTOCOMMIT")
+        self._round_robin = itertools.cycle(healthy or [None])
+
+    def choose(self, autocommit: bool = False) -> Optional[Engine]:
+        """A healthy replica's sync engine (round robin), or None for the primary."""
+        replica = next(self._round_robin)
+        if replica is None:
+            self._primary_reads += 1
+            return None
+        self._replica_reads += 1
+        return self._autocommit[replica] if autocommit else replica
+
+    async def check(self) -> None:
+        healthy = []
+        for index, engine in enumerate(self._engines):
+            try:
+                async with engine.connect() as connection:
+                    lag = float((await connection.execute(REPLICA_LAG_SQL)).scalar() or 0)
+            except Exception as e:
+                self._check_errors += 1
+                logger.warning(f"Replica {index} lag check failed: {str(e)}")
+                self._lag[index] = None
+                continue
+            self._lag[index] = lag
+            if lag <= self.max_lag:
+                healthy.append(engine.sync_engine)
+            else:
+                logger.warning(f"Replica {index} is {lag:.1f}s behind; routing reads to the primary")
+        self._set_healthy(healthy)
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_interval)
+
+    def start(self) -> None:
+        """Start checking replica lag (no-op without replicas)."""
+        if self._engines and self._checker is None:
+            self._checker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._checker is not None:
+            self._checker.cancel()
+            try:
+                await self._checker
+            except asyncio.CancelledError:
+                pass
+            self._checker = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": len(self._engines),
+            "healthy": len(self._healthy),
+            "lag_seconds": {f"replica{index}": lag for index, lag in self._lag.items()},
+            "replica_reads": self._replica_reads,
+            "primary_reads": self._primary_reads,
+            "check_errors": self._check_errors,
+        }
+
+
+class RoutingSession(Session):
+    """
+    Session that sends plain SELECTs to a read replica.
+
+    Everything else goes to the session's bind (the primary): writes,
+    ``SELECT ... FOR UPDATE``, flushes, and, for read-your-writes, every
+    statement after the session has written (sessions live for one request,
+    so reads after a commit in the same request see the write). Set
+    ``session.info["use_primary"] = True`` to pin a session to the primary.
+
+    Sessions with ``info["read_only"]`` set (see app.db.session) refuse
+    writes and read replicas in autocommit mode.
+    """
+
+    monitor: Optional[ReplicaMonitor] = None
+
+    def get_bind(self, mapper=None, clause=None, **kw: Any):
+        primary = super().get_bind(mapper=mapper, clause=clause, **kw)
+        read_only = self.info.get("read_only", False)
+        if read_only and getattr(clause, "is_dml", False):
+            raise ReadOnlySessionError("Cannot write through a read-only session")
+        if self.monitor is None or self._flushing or self.info.get("use_primary"):
+            return primary
+        if getattr(clause, "is_dml", False):
+            self.info["use_primary"] = True
+            return primary
+        if not isinstance(clause, Select) or clause._for_update_arg is not None:
+            return primary
+        return self.monitor.choose(autocommit=read_only) or primary
+
+
+class ReadOnlySessionError(InvalidRequestError):
+    """A read-only session was asked to write."""
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _refuse_read_only_flush(session: Session, flush_context: Any, instances: Any) -> None:
+    if session.info.get("read_only") and (session.new or session.dirty or session.deleted):
+        raise ReadOnlySessionError("Cannot flush changes through a read-only session")
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _stick_to_primary_after_flush(session: Session, flush_context: Any) -> None:
+    session.info["use_primary"] = True
+
+def use_primary(session: Any) -> None:
+    """Route the rest of this session's queries to the primary."""
+    session.info["use_primary"] = True
+
+
+replica_monitor = ReplicaMonitor(
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_SECONDS,
+)
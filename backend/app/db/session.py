@@ -1,117 +1,120 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from typing import Any
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from app.core.config import settings
 import logging
-import ssl
-import socket
-import json
-import urllib.request
-import urllib.parse
+
+from app.db.engines import engines
+from app.db.routing import RoutingSession, replica_monitor
 
 logger = logging.getLogger(__name__)
 
-# Parse out any SSL mode in the connection string since asyncpg handles it differently
-connection_string = str(settings.SQLALCHEMY_DATABASE_URI)
-if "?sslmode=" in connection_string:
-    connection_string = connection_string.split("?sslmode=")[0]
-
-logger.info(f"Base database URI (without SSL params): {connection_string}")
-
-# Print out the database connection string
-print(f"DATABASE_URL (async base): {connection_string}")
-
-# Function to check internet connectivity
-def check_internet_connection(host="8.8.8.8", port=53, timeout=3):
-    """Check if there is an internet connection by connecting to Google's DNS"""
-    try:
-        socket.setdefaulttimeout(timeout)
-        socket.socket(socket.AF_INET, socket.SOCK_STREAM).connect((host, port))
-        return True
-    except socket.error:
-        return False
-
-# Function to get current IP for debugging
-def get_external_ip():
-    """Get external IP address for debugging network issues"""
-    try:
-        return urllib.request.urlopen('https://api.ipify.org').read().decode('utf8')
-    except Exception:
-        return "Unable to get IP"
-
-# Debug network information
-internet_available = check_internet_connection()
-logger.info(f"Internet connection available: {internet_available}")
-if internet_available:
-    try:
-        ip = get_external_ip()
-        logger.info(f"Current external IP: {ip}")
-    except Exception as e:
-        logger.error(f"Error getting external IP: {str(e)}")
-
-# Try to resolve the Supabase hostname
-try:
-    host_ip = socket.gethostbyname(settings.DATABASE_HOST)
-    logger.info(f"Resolved database host {settings.DATABASE_HOST} to IP: {host_ip}")
-except socket.gaierror as e:
-    logger.error(f"Failed to resolve database host {settings.DATABASE_HOST}: {str(e)}")
-
-# Create different SSL context options to try
-ssl_contexts = []
-
-# Option 1: No SSL verification (least secure, but most permissive)
-context_no_verify = ssl.create_default_context()
-context_no_verify.check_hostname = False
-context_no_verify.verify_mode = ssl.CERT_NONE
-ssl_contexts.append({"name": "no_verify", "context": context_no_verify})
-
-# Option 2: Default SSL context with hostname verification disabled
-context_default = ssl.create_default_context()
-context_default.check_hostname = False
-ssl_contexts.append({"name": "default_no_hostname", "context": context_default})
-
-# Option 3: Default SSL context (most secure)
-context_secure = ssl.create_default_context()
-ssl_contexts.append({"name": "default_secure", "context": context_secure})
-
-# Use the first SSL context for now (will be updated if connection is successful)
-current_ssl_context = context_no_verify if settings.DATABASE_SSL else None
-
-# Define engine with flexible connect args
-engine_args = {
-    "pool_pre_ping": True,
-    "echo": settings.DEBUG,
-    "pool_size": 10,
-    "max_overflow": 20,
-    "pool_timeout": 30,
-    "pool_recycle": 300,
-}
-
-# Add connect_args with the current SSL context if SSL is enabled
-if settings.DATABASE_SSL and current_ssl_context:
-    # For asyncpg, SSL is passed differently than psycopg2
-    engine_args["connect_args"] = {
-        "ssl": current_ssl_context,
-        # Add SSL mode handling here directly for asyncpg
-        "server_settings": {
-            "application_name": "rescroll_async_app"
-        }
-    }
-    logger.info("Added SSL context to asyncpg connection")
-
-try:
-    # Configure engine with current settings
-    engine = create_async_engine(connection_string, **engine_args)
-    logger.info("Successfully created async database engine")
-except Exception as e:
-    logger.error(f"Error creating async database engine: {str(e)}")
-    raise
-
-# Create async session factory
-AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-async def get_db():
-    async with AsyncSessionLocal() as session:
+def init_engine() -> AsyncEngine:
+    """
+    Create the async engine if it does not exist yet.
+
+    Called from the app's startup hook; creating the engine opens no
+    connections, the pool connects on first checkout.
+    """
+    engine = engines.get_async_engine()
+    replicas = engines.get_replica_engines()
+    if replicas and RoutingSession.monitor is None:
+        replica_monitor.set_engines(replicas)
+        RoutingSession.monitor = replica_monitor
+    return engine
+
+def get_engine() -> AsyncEngine:
+    """Return the primary async engine, creating it on first use."""
+    return engines.get_async_engine()
+
+async def dispose_engine() -> None:
+    """Close all pooled connections and drop the engines."""
+    RoutingSession.monitor = None
+    await engines.dispose()
+
+# Create async session factory (bound to the primary per session; plain
+# SELECTs are routed to a read replica when any are configured and fresh)
+AsyncSessionLocal = sessionmaker(
+    class_=AsyncSession, sync_session_class=RoutingSession, expire_on_commit=False
+)
+
+# Requests with these methods get a read-only session unless the route says otherwise
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+class ReadOnlyAsyncSession(AsyncSession):
+    """
+    Session for handlers that only read.
+
+    Bound to the AUTOCOMMIT engine, so no BEGIN, COMMIT or ROLLBACK is sent,
+    and the connection goes back to the pool as soon as each statement's
+    rows are fetched rather than when the request ends. Loaded objects stay
+    usable (expire_on_commit is off); writes raise ReadOnlySessionError.
+    """
+
+    async def _release(self, failed: bool) -> None:
+        # Ends the (driver-side no-op) transaction and returns the connection
+        if failed:
+            await self.rollback()
+        else:
+            await self.commit()
+
+    async def execute(self, *args: Any, **kw: Any) -> Any:
+        failed = True
+        try:
+            result = await super().execute(*args, **kw)
+            failed = False
+            return result
+        finally:
+            await self._release(failed)
+
+    async def scalar(self, *args: Any, **kw: Any) -> Any:
+        failed = True
+        try:
+            result = await super().scalar(*args, **kw)
+            failed = False
+            return result
+        finally:
+            await self._release(failed)
+
+    async def get(self, *args: Any, **kw: Any) -> Any:
+        failed = True
+        try:
+            result = await super().get(*args, **kw)
+            failed = False
+            return result
+        finally:
+            await self._release(failed)
+
+ReadOnlySessionLocal = sessionmaker(
+    class_=ReadOnlyAsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
+    autoflush=False,
+    info={"read_only": True},
+)
+
+def read_only(request: Request) -> None:
+    """Route dependency: give this route read-only sessions whatever its method."""
+    request.state.db_read_only = True
+
+def read_write(request: Request) -> None:
+    """Route dependency: give this route a normal session even for GET."""
+    request.state.db_read_only = False
+
+def is_read_only(request: Request) -> bool:
+    return getattr(request.state, "db_read_only", request.method in READ_ONLY_METHODS)
+
+async def get_db(request: Request):
+    """
+    Session for the request: read-only for GET/HEAD/OPTIONS (or routes with
+    ``dependencies=[Depends(read_only)]``), a normal one otherwise.
+    """
+    if is_read_only(request):
+        session = ReadOnlySessionLocal(bind=engines.get_autocommit_engine())
+    else:
+        session = AsyncSessionLocal(bind=get_engine())
+    async with session:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
@@ -0,0 +1,192 @@
+"""
+User data sharding.
+
+User-scoped rows live on one of several databases, chosen by hashing the
+user's UUID onto a consistent-hash ring of shard names. Adding a shard only
+moves the users whose ring segment it takes over (about 1/N of them), which
+app.db.reshard copies across while the app keeps running.
+
+Without ``DATABASE_SHARD_URLS`` there is a single shard, the primary.
+"""
+import asyncio
+import bisect
+import hashlib
+import heapq
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar, Union
+from uuid import UUID
+
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.db.engines import EngineRegistry, engines
+from app.db.pagination import MAX_PAGE_SIZE, Page, decode_cursor, encode_cursor
+
+T = TypeVar("T")
+
+PRIMARY_SHARD = "primary"
+
+# Tables holding user-scoped rows and the column with the owning user's id.
+# The resharding tool moves them in this order (and deletes in reverse), so
+# list parents before their children.
+SHARDED_TABLES: List[Tuple[str, str]] = [
+    ("users", "id"),
+    ("reading_history", "user_id"),
+]
+
+
+# Shard sessions use a plain Session: the read replicas RoutingSession would
+# send SELECTs to are copies of the primary, not of the shard
+ShardSessionLocal = sessionmaker(class_=AsyncSession, expire_on_commit=False)
+
+
+def _point(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent-hash ring with ``vnodes`` points per node to even out the load."""
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = 128):
+        self.vnodes = vnodes
+        self._points: List[int] = []
+        self._owners: Dict[int, str] = {}
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        return sorted(set(self._owners.values()))
+
+    def add(self, node: str) -> None:
+        for replica in range(self.vnodes):
+            point = _point(f"{node}#{replica}")
+            if point not in self._owners:
+                bisect.insort(self._points, point)
+                self._owners[point] = node
+
+    def remove(self, node: str) -> None:
+        self._points = [point for point in self._points if self._owners[point] != node]
+        self._owners = {point: owner for point, owner in self._owners.items() if owner != node}
+
+    def node_for(self, key: Union[UUID, str]) -> str:
+        if not self._points:
+            raise LookupError("The hash ring has no nodes")
+        index = bisect.bisect(self._points, _point(str(key))) % len(self._points)
+        return self._owners[self._points[index]]
+
+
+class ShardRouter:
+    """
+    Maps users to shard engines and runs queries across all shards.
+
+    While a reshard is in progress (``DATABASE_PREVIOUS_SHARDS`` lists the
+    shards from before it), a user's rows may still be on their previous
+    owner, so ``candidates()`` returns both and lookups try the new owner
+    first.
+    """
+
+    def __init__(self, registry: EngineRegistry, vnodes: int = 128):
+        self.registry = registry
+        self.vnodes = vnodes
+        self._engines: Optional[Dict[str, AsyncEngine]] = None
+        self._ring: Optional[HashRing] = None
+        self._previous_ring: Optional[HashRing] = None
+
+    def configure(self, shard_engines: Dict[str, AsyncEngine], previous: Sequence[str] = ()) -> None:
+        self._engines = dict(shard_engines)
+        self._ring = HashRing(self._engines, self.vnodes)
+        previous = [name for name in previous if name in self._engines]
+        self._previous_ring = HashRing(previous, self.vnodes) if previous else None
+
+    def _ensure_configured(self) -> None:
+        if self._engines is None:
+            shard_engines = self.registry.get_shard_engines() or {PRIMARY_SHARD: self.registry.get_async_engine()}
+            previous = [name.strip() for name in settings.DATABASE_PREVIOUS_SHARDS.split(",") if name.strip()]
+            self.configure(shard_engines, previous)
+
+    @property
+    def shards(self) -> Dict[str, AsyncEngine]:
+        self._ensure_configured()
+        return self._engines
+
+    def shard_for(self, user_id: Union[UUID, str]) -> str:
+        self._ensure_configured()
+        return self._ring.node_for(user_id)
+
+    def candidates(self, user_id: Union[UUID, str]) -> List[str]:
+        """Shards that may hold the user's rows, current owner first."""
+        owner = self.shard_for(user_id)
+        if self._previous_ring is None:
+            return [owner]
+        previous = self._previous_ring.node_for(user_id)
+        return [owner] if previous == owner else [owner, previous]
+
+    def engine_for(self, user_id: Union[UUID, str]) -> AsyncEngine:
+        return self.shards[self.shard_for(user_id)]
+
+    def session_for(self, user_id: Union[UUID, str]) -> AsyncSession:
+        """A session on the user's shard (the caller closes it)."""
+        return ShardSessionLocal(bind=self.engine_for(user_id))
+
+    async def find(
+        self, user_id: Union[UUID, str], query: Callable[[AsyncSession], Awaitable[Optional[T]]]
+    ) -> Optional[T]:
+        """Run ``query`` on each candidate shard until one returns a result."""
+        for shard in self.candidates(user_id):
+            async with ShardSessionLocal(bind=self.shards[shard]) as session:
+                result = await query(session)
+            if result is not None:
+                return result
+        return None
+
+    async def fan_out(self, query: Callable[[AsyncSession], Awaitable[T]]) -> Dict[str, T]:
+        """Run ``query`` on every shard concurrently, each with its own session."""
+        async def run(engine: AsyncEngine) -> T:
+            async with ShardSessionLocal(bind=engine) as session:
+                return await query(session)
+
+        names = list(self.shards)
+        results = await asyncio.gather(*[run(self.shards[name]) for name in names])
+        return dict(zip(names, results))
+
+    async def paginate(
+        self, stmt: Select, keys: Sequence[Any], limit: int = 100, cursor: Optional[str] = None
+    ) -> Page:
+        """
+        One keyset page (see app.db.pagination) across all shards.
+
+        Every shard returns its next ``limit`` rows after the cursor and the
+        pages are merged by the sort key, so cursors work exactly as on a
+        single database. Meant for admin listings: it costs a query per shard.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        if cursor:
+            stmt = stmt.where(tuple_(*keys) > tuple_(*decode_cursor(cursor, keys)))
+        stmt = stmt.order_by(*keys).limit(limit + 1)
+
+        async def page(session: AsyncSession) -> List[Any]:
+            return list((await session.execute(stmt)).scalars().all())
+
+        def sort_key(item: Any) -> tuple:
+            return tuple(getattr(item, key.key) for key in keys)
+
+        merged = []
+        for item in heapq.merge(*(await self.fan_out(page)).values(), key=sort_key):
+            # Mid-reshard a row can briefly exist on two shards
+            if not merged or sort_key(merged[-1]) != sort_key(item):
+                merged.append(item)
+        items = merged[:limit]
+        next_cursor = encode_cursor(sort_key(items[-1])) if len(merged) > limit else None
+        return Page(items=items, next_cursor=next_cursor)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "shards": list(self._engines or []),
+            "resharding_from": self._previous_ring.nodes if self._previous_ring else None,
+        }
+
+
+shard_router = ShardRouter(engines)
@@ -0,0 +1,238 @@
+"""
+Slow query log.
+
+Statements slower than ``SLOW_QUERY_MS`` are recorded with their shape,
+bound parameter types (never the values) and duration into an in-memory
+ring, and their ``EXPLAIN`` plan is fetched by a background task so the
+request that ran them does not wait for it. Each entry is also appended as
+a JSON line to ``logs/slow_queries.log`` (rotated).
+
+Report the slowest shapes from the log file with:
+    python -m app.db.slow_queries logs/slow_queries.log --top 20
+"""
+import argparse
+import asyncio
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.db.instrumentation import MAX_STATEMENT_LENGTH, add_statement_listener, statement_shape
+
+logger = logging.getLogger(__name__)
+
+# Only these can be EXPLAINed without running them
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+# Plans are reused for this long before a shape is explained again
+PLAN_TTL_SECONDS = 600
+
+
+def first_row(parameters: Any) -> Any:
+    """The parameters of one execution; for executemany, the first row is representative."""
+    if isinstance(parameters, list):
+        return parameters[0] if parameters else ()
+    return parameters
+
+
+def parameter_types(parameters: Any) -> Any:
+    parameters = first_row(parameters)
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    return [type(value).__name__ for value in parameters or ()]
+
+
+def summarize(entries: Iterable[Dict[str, Any]], top: int = 20) -> List[Dict[str, Any]]:
+    """Group entries by shape, slowest total time first."""
+    shapes: Dict[str, Dict[str, Any]] = {}
+    for entry in entries:
+        summary = shapes.setdefault(entry["shape"], {
+            "shape": entry["shape"], "count": 0, "total_ms": 0.0, "max_ms": 0.0, "plan": None,
+        })
+        summary["count"] += 1
+        summary["total_ms"] += entry["duration_ms"]
+        summary["max_ms"] = max(summary["max_ms"], entry["duration_ms"])
+        summary["plan"] = entry.get("plan") or summary["plan"]
+    ranked = sorted(shapes.values(), key=lambda summary: summary["total_ms"], reverse=True)
+    for summary in ranked:
+        summary["avg_ms"] = summary["total_ms"] / summary["count"]
+    return ranked[:top]
+
+
+def _file_logger(path: str) -> logging.Logger:
+    file_logger = logging.getLogger("slow_queries")
+    file_logger.propagate = False
+    file_logger.setLevel(logging.INFO)
+    if not file_logger.handlers:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=10485760, backupCount=5)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        file_logger.addHandler(handler)
+    return file_logger
+
+
+class SlowQueryLog:
+    """Keeps the slowest recent statements and their plans."""
+
+    def __init__(self, threshold_ms: float, ring_size: int, explain: bool, log_path: Optional[str]):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.log_path = log_path
+        self.entries: deque = deque(maxlen=ring_size)
+        self._plans: "OrderedDict[str, tuple]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._file_logger: Optional[logging.Logger] = None
+        self._lock = threading.Lock()
+        self._listening = False
+        self._slow = 0
+        self._explained = 0
+        self._dropped = 0
+
+    def on_statement(self, statement: str, parameters: Any, duration: float, connection: Any) -> None:
+        if duration < self.threshold or statement.lstrip()[:7].upper().startswith("EXPLAIN"):
+            return
+        shape = statement_shape(statement)
+        entry = {
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "shape": shape[:MAX_STATEMENT_LENGTH * 4],
+            "parameter_types": parameter_types(parameters),
+            "duration_ms": round(duration * 1000, 2),
+            "plan": None,
+        }
+        with self._lock:
+            self._slow += 1
+            self.entries.append(entry)
+        with self._lock:
+            cached = self._plans.get(shape)
+        if cached is not None and time.monotonic() - cached[0] < PLAN_TTL_SECONDS:
+            entry["plan"] = cached[1]
+            self._write(entry)
+            return
+        explainable = statement.lstrip().upper().startswith(EXPLAINABLE)
+        if not (self.explain and explainable and self._queue is not None and self._loop is not None):
+            self._write(entry)
+            return
+        # EXPLAIN one row: an executemany parameter list would run EXPLAIN once per row
+        job = (entry, shape, statement, first_row(parameters), connection.engine)
+        try:
+            # Sync engines run in worker threads, so hand the job to the loop thread-safely
+            self._loop.call_soon_threadsafe(self._enqueue, job)
+        except RuntimeError:
+            self._write(entry)
+
+    def _enqueue(self, job: tuple) -> None:
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._dropped += 1
+            self._write(job[0])
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        if self._file_logger is not None:
+            self._file_logger.info(json.dumps(entry))
+
+    def _explain_sync(self, engine: Any, statement: str, parameters: Any) -> str:
+        with engine.connect() as conn:
+            rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).fetchall()
+        return "\n".join(str(row[0]) for row in rows)
+
+    async def _explain(self, engine: Any, statement: str, parameters: Any) -> str:
+        from sqlalchemy.ext.asyncio import AsyncEngine
+
+        if engine.dialect.is_async:
+            async with AsyncEngine(engine).connect() as conn:
+                rows = (await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)).fetchall()
+            return "\n".join(str(row[0]) for row in rows)
+        return await asyncio.to_thread(self._explain_sync, engine, statement, parameters)
+
+    async def _run(self) -> None:
+        while True:
+            entry, shape, statement, parameters, engine = await self._queue.get()
+            try:
+                entry["plan"] = await self._explain(engine, statement, parameters)
+                self._explained += 1
+                with self._lock:
+                    self._plans[shape] = (time.monotonic(), entry["plan"])
+                    self._plans.move_to_end(shape)
+                    while len(self._plans) > 256:
+                        self._plans.popitem(last=False)
+            except Exception as e:
+                entry["plan"] = f"EXPLAIN failed: {str(e)}"
+            self._write(entry)
+
+    def start(self) -> None:
+        """Start listening for slow statements and explaining them."""
+        if not self._listening:
+            add_statement_listener(self.on_statement)
+            self._listening = True
+        if self.log_path and self._file_logger is None:
+            self._file_logger = _file_logger(self.log_path)
+        if self.explain and self._worker is None:
+            self._loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue(maxsize=100)
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+            self._queue = None
+            self._loop = None
+
+    def report(self, top: int = 10) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = list(self.entries)
+        return summarize(entries, top)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "slow_statements": self._slow,
+            "explained": self._explained,
+            "dropped": self._dropped,
+            "slowest_shapes": [
+                {key: summary[key] for key in ("shape", "count", "avg_ms", "max_ms")}
+                for summary in self.report(5)
+            ],
+        }
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_MS,
+    ring_size=settings.SLOW_QUERY_RING_SIZE,
+    explain=settings.SLOW_QUERY_EXPLAIN,
+    log_path=os.path.join("logs", "slow_queries.log"),
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Slowest statement shapes in a slow query log")
+    parser.add_argument("path", nargs="?", default=os.path.join("logs", "slow_queries.log"))
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--plans", action="store_true", help="Print the captured plans")
+    args = parser.parse_args()
+
+    with open(args.path) as log_file:
+        entries = [json.loads(line) for line in log_file if line.strip()]
+    for summary in summarize(entries, args.top):
+        print(
+            f"{summary['total_ms']:>10.0f} ms total  {summary['count']:>6}x  "
+            f"avg {summary['avg_ms']:>8.1f} ms  max {summary['max_ms']:>8.1f} ms  {summary['shape'][:160]}"
+        )
+        if args.plans and summary["plan"]:
+            print("    " + summary["plan"].replace("\n", "\n    "))
+
+
+if __name__ == "__main__":
+    main()
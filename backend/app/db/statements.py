@@ -0,0 +1,22 @@
+"""
+Prebuilt statements for the hottest lookups.
+
+Building ``select(User).where(User.email == email)`` on every call costs
+Python CPU for the construction and for computing the statement's cache
+key before SQLAlchemy's compiled cache can even be consulted. These are
+built once with bind parameters, and their cache keys are memoized on the
+statement objects, so a lookup goes straight to the cached compiled SQL
+(and, on asyncpg, to the connection's prepared statement; see
+``DB_PREPARED_STATEMENT_CACHE_SIZE``).
+
+Execute them with the parameter named in the bindparam::
+
+    result = await db.execute(USER_BY_EMAIL, {"email": email})
+"""
+from sqlalchemy import bindparam, select
+
+from app.models.user import User
+
+USER_BY_ID = select(User).where(User.id == bindparam("id"))
+USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
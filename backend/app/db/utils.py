@@ -1,5 +1,6 @@
 from sqlalchemy import text
-from app.db.database import engine, get_db
+from app.db.database import get_sync_engine, get_db
+from app.db.session import get_engine
 import logging
 import os
 
@@ -8,7 +9,7 @@ logger = logging.getLogger(__name__)
 def test_db_connection():
     """Test database connection with SQLAlchemy."""
     try:
-        with engine.connect() as connection:
+        with get_sync_engine().connect() as connection:
             result = connection.execute(text("SELECT 1"))
             value = result.fetchone()
             logger.info(f"Database connection successful: {value}")
@@ -17,6 +18,18 @@ def test_db_connection():
         logger.error(f"Database connection error: {e}")
         return False, f"Database error: {e}"
 
+async def test_async_db_connection():
+    """Test the async engine's database connection."""
+    try:
+        async with get_engine().connect() as connection:
+            result = await connection.execute(text("SELECT 1"))
+            value = result.fetchone()
+            logger.info(f"Database connection successful: {value}")
+            return True, "Connection successful"
+    except Exception as e:
+        logger.error(f"Database connection error: {e}")
+        return False, f"Database error: {e}"
+
 def build_database_url():
     """Build database URL from environment variables."""
     user = os.getenv("USER", "postgres.ovssikmitelxawvjhhgg")
@@ -0,0 +1,39 @@
+from typing import Any, Dict, Type, TypeVar
+
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+ModelT = TypeVar("ModelT")
+
+
+async def insert_returning(db: AsyncSession, model: Type[ModelT], values: Dict[str, Any]) -> ModelT:
+    """
+    ``INSERT ... RETURNING *`` a row and return it as a persistent ORM object.
+
+    Column defaults (id, timestamps) are filled in by the statement, so the
+    object needs no refresh after the commit.
+    """
+    result = await db.execute(insert(model).values(**values).returning(model))
+    return result.scalar_one()
+
+
+async def update_returning(db: AsyncSession, obj: ModelT, values: Dict[str, Any]) -> ModelT:
+    """
+    ``UPDATE ... RETURNING *`` one object's row and reload it from the result.
+
+    ``obj`` is updated in place (it is the same identity in the session), so
+    callers can keep using it after the commit without a refresh; ``onupdate``
+    columns such as ``updated_at`` come back with the row.
+    """
+    if not values:
+        return obj
+    model = type(obj)
+    stmt = (
+        update(model)
+        .where(model.id == obj.id)
+        .values(**values)
+        .returning(model)
+        .execution_options(populate_existing=True)
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one()
@@ -5,21 +5,37 @@ from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
-from starlette.middleware.sessions import SessionMiddleware
 import time
 import os
+import asyncio
+import signal
 
-from app.core.config import Settings
+from app.core.config import settings, reload_settings
 from app.core.logging_config import LOGGING_CONFIG
 from app.api.v1.api import api_router
 from app.api.v1.endpoints import health
 from app.utils.api_error import ApiError
 from app.utils.api_response import ApiResponse
-from app.middleware.metrics import add_metrics_middleware
+from app.middleware.metrics import add_metrics_middleware, register_metrics_source
+from app.middleware.session import RedisSessionMiddleware
+from app.middleware.idempotency import IdempotencyMiddleware, get_idempotency_metrics
+from app.middleware.db_queries import DBQueryMiddleware, get_db_query_metrics
+from app.core.password_hasher import password_hasher
+from app.core.redis import async_redis_stats, close_async_redis, init_async_redis
+from app.services.user_cache import user_cache
+from app.services.token_revocation import token_revocation
+from app.services.login_throttle import login_throttle
 from app.core.logging import setup_logging
 from app.core.db import supabase
-from app.db.utils import test_db_connection
-from app.db.database import engine
+from app.db.utils import test_async_db_connection
+from app.db.engines import engines
+from app.db.pool_maintenance import pool_maintainer
+from app.db.slow_queries import slow_query_log
+from app.db.sharding import shard_router
+from app.db.partitions import create_partitions
+from app.db.counts import count_service
+from app.db.routing import replica_monitor
+from app.db.session import dispose_engine, init_engine
 
 # Configure logging
 logging.config.dictConfig(LOGGING_CONFIG)
@@ -29,9 +45,6 @@ logger = logging.getLogger("app")
 static_dir = Path("static")
 static_dir.mkdir(exist_ok=True)
 
-# Initialize settings
-settings = Settings()
-
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
@@ -69,19 +82,52 @@ app.add_middleware(
     max_age=3600,
 )
 
-# Add session middleware
+# Add session middleware (session data lives in Redis, loaded on demand)
 app.add_middleware(
-    SessionMiddleware,
-    secret_key=settings.SECRET_KEY,
+    RedisSessionMiddleware,
+    cookie_name=settings.SESSION_COOKIE_NAME,
+    key_prefix=f"{settings.CACHE_PREFIX}:session:",
+    max_age=settings.SESSION_MAX_AGE_SECONDS,
     same_site="none",
     https_only=settings.COOKIE_SECURE,
 )
 
+# Replay stored responses for retried requests carrying an Idempotency-Key
+app.add_middleware(
+    IdempotencyMiddleware,
+    key_prefix=f"{settings.CACHE_PREFIX}:idempotency:",
+    ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+    lock_timeout=settings.IDEMPOTENCY_LOCK_SECONDS,
+    wait_timeout=settings.IDEMPOTENCY_WAIT_SECONDS,
+    session_cookie=settings.SESSION_COOKIE_NAME,
+    enabled=settings.IDEMPOTENCY_ENABLED,
+)
+
+# Count/time each request's SQL statements and flag N+1 patterns
+app.add_middleware(
+    DBQueryMiddleware,
+    n_plus_one_threshold=settings.DB_N_PLUS_ONE_THRESHOLD,
+    debug_header=settings.DB_QUERY_DEBUG_HEADER,
+)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Add metrics middleware
 add_metrics_middleware(app)
+register_metrics_source("password_hashing", password_hasher.stats)
+register_metrics_source("user_cache", user_cache.stats)
+register_metrics_source("token_revocation", token_revocation.stats)
+register_metrics_source("login_throttle", login_throttle.stats)
+register_metrics_source("idempotency", get_idempotency_metrics)
+register_metrics_source("database_pools", engines.stats)
+register_metrics_source("read_replicas", replica_monitor.stats)
+register_metrics_source("pool_maintenance", pool_maintainer.stats)
+register_metrics_source("database_queries", get_db_query_metrics)
+register_metrics_source("slow_queries", slow_query_log.stats)
+register_metrics_source("shards", shard_router.stats)
+register_metrics_source("counts", count_service.stats)
+register_metrics_source("redis_pool", async_redis_stats)
 
 # Error handlers
 @app.exception_handler(ApiError)
@@ -143,15 +189,60 @@ async def startup_event():
     logger.info(f"Starting {settings.PROJECT_NAME} v{settings.VERSION}")
     logger.info(f"Debug mode: {settings.DEBUG}")
     
+    # Create the async engine (connections are opened on first use)
+    init_engine()
+    
+    # Log statements slower than SLOW_QUERY_MS and EXPLAIN them in the background
+    slow_query_log.start()
+    
+    # Keep checking read replica lag (no-op without DATABASE_REPLICA_URLS)
+    replica_monitor.start()
+    
     # Test database connection
     logger.info("Testing database connection...")
-    success, message = test_db_connection()
+    success, message = await test_async_db_connection()
     if success:
         logger.info(f"✅ {message}")
     else:
         logger.error(f"❌ {message}")
+    
+    # Open DB_POOL_MIN_IDLE connections now and validate idle ones in the background
+    # (skip the prefill when the database is unreachable; the background loop retries)
+    await pool_maintainer.start(prefill=success)
+    
+    # Make sure this month's and the upcoming partitions exist (also done daily by celery)
+    if success:
+        for name, engine in shard_router.shards.items():
+            try:
+                await create_partitions(engine)
+            except Exception as e:
+                logger.error(f"Could not create partitions on {name}: {str(e)}")
+    
+    # One Redis connection pool (REDIS_MAX_CONNECTIONS) for caches, throttles and health checks
+    if await init_async_redis():
+        logger.info("✅ Redis connection successful")
+    
+    # Listen for user cache invalidations from other workers
+    user_cache.start()
+    
+    # Keep the local token revocation Bloom filter in sync with Redis
+    token_revocation.start()
+    
+    # Reload settings on SIGHUP (not available on Windows)
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload_settings)
+    except (AttributeError, NotImplementedError, RuntimeError):
+        logger.info("SIGHUP settings reload is not supported on this platform")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info(f"Shutting down {settings.PROJECT_NAME}")
+    password_hasher.shutdown()
+    await user_cache.stop()
+    await token_revocation.stop()
+    await replica_monitor.stop()
+    await pool_maintainer.stop()
+    await slow_query_log.stop()
+    await close_async_redis()
+    await dispose_engine()
 
@@ -0,0 +1,87 @@
+import logging
+from collections import deque
+from typing import Any, Dict
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.instrumentation import QueryStats, collect_queries
+
+logger = logging.getLogger(__name__)
+
+# Totals across requests, reported by the metrics endpoint
+db_query_metrics = {
+    "requests": 0,
+    "statements": 0,
+    "db_time": 0.0,
+    "max_statements": 0,
+    "n_plus_one_requests": 0,
+}
+
+# The most recent requests flagged for repeated statements
+recent_n_plus_one: deque = deque(maxlen=20)
+
+def get_db_query_metrics() -> Dict[str, Any]:
+    requests = max(db_query_metrics["requests"], 1)
+    return {
+        "requests": db_query_metrics["requests"],
+        "statements": db_query_metrics["statements"],
+        "statements_per_request": db_query_metrics["statements"] / requests,
+        "max_statements": db_query_metrics["max_statements"],
+        "db_time_per_request_ms": db_query_metrics["db_time"] / requests * 1000,
+        "n_plus_one_requests": db_query_metrics["n_plus_one_requests"],
+        "recent_n_plus_one": list(recent_n_plus_one),
+    }
+
+
+class DBQueryMiddleware:
+    """
+    Counts and times the SQL statements each request runs.
+
+    Statements are recorded through the engine hooks in
+    app.db.instrumentation. Requests that repeat one statement shape
+    ``n_plus_one_threshold`` times or more are logged as likely N+1 loops.
+    With ``debug_header`` on, responses carry an ``X-DB-Queries`` header such
+    as ``count=3; time_ms=4.2``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        n_plus_one_threshold: int = 5,
+        debug_header: bool = False,
+    ):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.debug_header = debug_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(n_plus_one_threshold=self.n_plus_one_threshold)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.debug_header:
+                MutableHeaders(scope=message).append("X-DB-Queries", stats.header_value())
+            await send(message)
+
+        with collect_queries(stats):
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                self._record(scope, stats)
+
+    def _record(self, scope: Scope, stats: QueryStats) -> None:
+        db_query_metrics["requests"] += 1
+        db_query_metrics["statements"] += stats.count
+        db_query_metrics["db_time"] += stats.total_time
+        db_query_metrics["max_statements"] = max(db_query_metrics["max_statements"], stats.count)
+        repeated = stats.repeated
+        if repeated:
+            db_query_metrics["n_plus_one_requests"] += 1
+            endpoint = f"{scope['method']} {scope['path']}"
+            recent_n_plus_one.append({"endpoint": endpoint, "statements": stats.count, "repeated": repeated})
+            for shape, count in repeated.items():
+                logger.warning(f"Possible N+1 on {endpoint}: ran {count}x {shape}")
@@ -0,0 +1,301 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from jose import JWTError, jwt
+from starlette.datastructures import Headers
+from starlette.requests import cookie_parser
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.redis import get_async_redis_client
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Answers that say "not now" rather than "done": like 5xx they release the
+# key, so a retry (e.g. after Retry-After or logging in again) runs for real
+RETRYABLE_STATUSES = {401, 403, 409, 429}
+
+# Counters shared by every middleware instance, reported by the metrics endpoint
+idempotency_metrics = {
+    "stored": 0,
+    "replayed": 0,
+    "waited": 0,
+    "conflicts": 0,
+    "errors": 0,
+}
+
+def get_idempotency_metrics() -> Dict[str, Any]:
+    return dict(idempotency_metrics)
+
+
+class IdempotencyMiddleware:
+    """
+    Replays the first response for a repeated ``Idempotency-Key``.
+
+    The first request with a key claims it in Redis and runs normally; its
+    response is stored for ``ttl`` seconds. Duplicates that arrive while it
+    is still running wait for it (up to ``wait_timeout``), and later ones get
+    the stored response back with an ``Idempotent-Replayed: true`` header,
+    so bcrypt, uploads and emails are not redone.
+
+    Keys are scoped to the method, path and caller (the user of a valid
+    access token, read from the cookie or bearer header like
+    app.api.deps does, else the session cookie); requests with no caller,
+    or with a body over ``max_body_size``, are passed through untouched. Reusing a key with a different body is
+    rejected with 422. 5xx, 401, 403, 409 and 429 responses are not stored
+    so the client can retry them.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        key_prefix: str = "idempotency:",
+        ttl: int = 24 * 60 * 60,
+        lock_timeout: int = 60,
+        wait_timeout: float = 10.0,
+        poll_interval: float = 0.05,
+        max_body_size: int = 1024 * 1024,
+        session_cookie: str = "session_id",
+        token_cookie: str = "access_token",
+        enabled: bool = True,
+    ):
+        self.app = app
+        self.key_prefix = key_prefix
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.max_body_size = max_body_size
+        self.session_cookie = session_cookie
+        self.token_cookie = token_cookie
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get("idempotency-key")
+        principal = self._principal(headers)
+        if not idempotency_key or principal is None:
+            # Without a caller to scope the key to, a stored response could go to anyone
+            await self.app(scope, receive, send)
+            return
+
+        messages, complete = await self._read_body(receive)
+        if not complete:
+            # Too large to buffer (and to fingerprint); run it without idempotency
+            await self.app(scope, self._replay_messages(messages, receive), send)
+            return
+        body = b"".join(message.get("body", b"") for message in messages)
+        key = self._redis_key(scope, principal, idempotency_key)
+        fingerprint = hashlib.sha256(body).hexdigest()
+
+        while True:
+            try:
+                claimed = await get_async_redis_client().set(
+                    key,
+                    json.dumps({"state": "in_flight", "fingerprint": fingerprint}),
+                    nx=True,
+                    ex=self.lock_timeout,
+                )
+            except Exception as e:
+                idempotency_metrics["errors"] += 1
+                logger.warning(f"Idempotency store unavailable: {str(e)}")
+                await self.app(scope, self._replay_body(body, receive), send)
+                return
+
+            if claimed:
+                await self._run_and_store(scope, body, receive, send, key, fingerprint)
+                return
+            if await self._respond_to_duplicate(scope, receive, send, key, fingerprint):
+                return
+            # The original released the key without storing a response; claim it
+
+    async def _read_body(self, receive: Receive) -> Tuple[List[Message], bool]:
+        """
+        Buffer the request's messages; True if the whole body arrived within ``max_body_size``.
+
+        Stops reading as soon as the limit is passed (or the client disconnects).
+        """
+        messages: List[Message] = []
+        size = 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                return messages, False
+            size += len(message.get("body", b""))
+            if size > self.max_body_size:
+                return messages, False
+            if not message.get("more_body", False):
+                return messages, True
+
+    def _replay_messages(self, messages: List[Message], receive: Receive) -> Receive:
+        """Hand the app the messages already read, then the rest of the request."""
+        pending = list(messages)
+
+        async def replay() -> Message:
+            if pending:
+                return pending.pop(0)
+            return await receive()
+
+        return replay
+
+    def _replay_body(self, body: bytes, receive: Receive) -> Receive:
+        sent = False
+
+        async def replay() -> Message:
+            nonlocal sent
+            if sent:
+                # Body already delivered; pass through http.disconnect
+                return await receive()
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        return replay
+
+    def _principal(self, headers: Headers) -> Optional[str]:
+        """Who is calling, stable across token refreshes and unrelated cookie changes; None if unknown."""
+        cookies = cookie_parser(headers.get("cookie", ""))
+        # Same precedence as app.api.deps.get_token_from_cookie_or_header
+        token = cookies.get(self.token_cookie)
+        if not token:
+            scheme, _, bearer = headers.get("authorization", "").partition(" ")
+            token = bearer if scheme.lower() == "bearer" else None
+        if token:
+            try:
+                payload = jwt.decode(token, settings.ACCESS_TOKEN_SECRET, algorithms=[settings.ALGORITHM])
+                if payload.get("sub"):
+                    return f"user:{payload['sub']}"
+            except JWTError:
+                pass
+            # Invalid token: the request fails auth (and releases the key) anyway
+            return f"token:{token}"
+        session_id = cookies.get(self.session_cookie)
+        return f"session:{session_id}" if session_id else None
+
+    def _redis_key(self, scope: Scope, principal: str, idempotency_key: str) -> str:
+        # Scope keys to the caller so one user cannot replay another's response
+        scope_hash = hashlib.sha256(
+            "\n".join([scope["method"], scope["path"], principal, idempotency_key]).encode()
+        ).hexdigest()
+        return f"{self.key_prefix}{scope_hash}"
+
+    async def _run_and_store(
+        self, scope: Scope, body: bytes, receive: Receive, send: Send, key: str, fingerprint: str
+    ) -> None:
+        status_code = 500
+        response_headers: List[List[str]] = []
+        chunks: List[bytes] = []
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers.extend(
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                )
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size <= self.max_body_size:
+                    chunks.append(chunk)
+            await send(message)
+
+        try:
+            await self.app(scope, self._replay_body(body, receive), send_wrapper)
+        finally:
+            await self._finish(key, fingerprint, status_code, response_headers, chunks, size)
+
+    async def _finish(
+        self,
+        key: str,
+        fingerprint: str,
+        status_code: int,
+        headers: List[List[str]],
+        chunks: List[bytes],
+        size: int,
+    ) -> None:
+        redis = get_async_redis_client()
+        try:
+            if status_code >= 500 or status_code in RETRYABLE_STATUSES or size > self.max_body_size:
+                # Release the key so the client can retry
+                await redis.delete(key)
+                return
+            record = {
+                "state": "done",
+                "fingerprint": fingerprint,
+                "status": status_code,
+                "headers": headers,
+                "body": base64.b64encode(b"".join(chunks)).decode(),
+            }
+            await redis.set(key, json.dumps(record), ex=self.ttl)
+            idempotency_metrics["stored"] += 1
+        except Exception as e:
+            idempotency_metrics["errors"] += 1
+            logger.warning(f"Failed to store idempotent response: {str(e)}")
+
+    async def _respond_to_duplicate(
+        self, scope: Scope, receive: Receive, send: Send, key: str, fingerprint: str
+    ) -> bool:
+        """Answer a request whose key is already claimed; False if the key was released."""
+        deadline = time.monotonic() + self.wait_timeout
+        waited = False
+        while True:
+            record = await self._load(key)
+            if record is None:
+                return False
+            if record["fingerprint"] != fingerprint:
+                idempotency_metrics["conflicts"] += 1
+                response = JSONResponse(
+                    {"detail": "Idempotency-Key was already used with a different request"},
+                    status_code=422,
+                )
+                break
+            if record["state"] == "done":
+                idempotency_metrics["replayed"] += 1
+                await self._replay(record, send)
+                return True
+            if time.monotonic() >= deadline:
+                response = JSONResponse(
+                    {"detail": "A request with this Idempotency-Key is still in progress"},
+                    status_code=409,
+                    headers={"Retry-After": "1"},
+                )
+                break
+            if not waited:
+                waited = True
+                idempotency_metrics["waited"] += 1
+            await asyncio.sleep(self.poll_interval)
+
+        await response(scope, receive, send)
+        return True
+
+    async def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = await get_async_redis_client().get(key)
+        except Exception as e:
+            idempotency_metrics["errors"] += 1
+            logger.warning(f"Failed to load idempotent response: {str(e)}")
+            return None
+        return json.loads(data) if data else None
+
+    async def _replay(self, record: Dict[str, Any], send: Send) -> None:
+        headers = [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in record["headers"]
+        ]
+        headers.append((b"idempotent-replayed", b"true"))
+        await send({"type": "http.response.start", "status": record["status"], "headers": headers})
+        await send({"type": "http.response.body", "body": base64.b64decode(record["body"])})
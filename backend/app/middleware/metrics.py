@@ -1,4 +1,5 @@
 from fastapi import FastAPI, Request
+from typing import Any, Callable, Dict
 import time
 import logging
 
@@ -11,6 +12,13 @@ metrics = {
     "response_times": [],
 }
 
+# Extra metric providers (name -> callable returning a dict), reported by the metrics endpoint
+metrics_sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+def register_metrics_source(name: str, source: Callable[[], Dict[str, Any]]) -> None:
+    """Expose a subsystem's metrics under ``name`` on the metrics endpoint."""
+    metrics_sources[name] = source
+
 def add_metrics_middleware(app: FastAPI):
     """Add metrics middleware to the FastAPI application."""
     @app.middleware("http")
@@ -51,6 +59,7 @@ def add_metrics_middleware(app: FastAPI):
             "errors": metrics["errors"],
             "avg_response_time": avg_response_time,
             "error_rate": metrics["errors"] / max(metrics["requests"], 1),
+            **{name: source() for name, source in metrics_sources.items()},
         }
     
     logger.info("Metrics middleware added to application")
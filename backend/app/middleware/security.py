@@ -1,45 +1,71 @@
-from fastapi import Request, HTTPException
+from fastapi import Request
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 from datetime import datetime, timedelta
 from collections import defaultdict
 import time
 import logging
+from app.core.redis import get_async_redis_client
 
 logger = logging.getLogger(__name__)
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
+    """
+    Per-IP request limit shared by all workers.
+
+    Requests are counted per client IP and minute in Redis (one pipelined
+    INCR + EXPIRE over the shared pool). If Redis is unreachable, each
+    process falls back to counting on its own.
+    """
+
     def __init__(
         self,
         app: ASGIApp,
         requests_per_minute: int = 60,
-        burst_size: int = 10
+        burst_size: int = 10,
+        key_prefix: str = "ratelimit:"
     ):
         super().__init__(app)
         self.requests_per_minute = requests_per_minute
         self.burst_size = burst_size
+        self.key_prefix = key_prefix
         self.requests = defaultdict(list)
     
-    async def dispatch(self, request: Request, call_next):
-        client_ip = request.client.host
-        current_time = time.time()
-        
+    def _count_locally(self, client_ip: str, current_time: float) -> int:
         # Clean old requests
         self.requests[client_ip] = [
             req_time for req_time in self.requests[client_ip]
             if current_time - req_time < 60
         ]
+        self.requests[client_ip].append(current_time)
+        return len(self.requests[client_ip])
+    
+    async def _count(self, client_ip: str, current_time: float) -> int:
+        window = int(current_time // 60)
+        key = f"{self.key_prefix}{client_ip}:{window}"
+        try:
+            async with get_async_redis_client().pipeline(transaction=False) as pipe:
+                pipe.incr(key)
+                pipe.expire(key, 60)
+                count, _ = await pipe.execute()
+            return int(count)
+        except Exception as e:
+            logger.warning(f"Rate limit counter unavailable, counting locally: {str(e)}")
+            return self._count_locally(client_ip, current_time)
+    
+    async def dispatch(self, request: Request, call_next):
+        client_ip = request.client.host if request.client else "unknown"
+        current_time = time.time()
         
         # Check rate limit
-        if len(self.requests[client_ip]) >= self.requests_per_minute:
-            raise HTTPException(
+        if await self._count(client_ip, current_time) > self.requests_per_minute:
+            return JSONResponse(
                 status_code=429,
-                detail="Too many requests. Please try again later."
+                content={"detail": "Too many requests. Please try again later."},
+                headers={"Retry-After": str(60 - int(current_time % 60))}
             )
         
-        # Add current request
-        self.requests[client_ip].append(current_time)
-        
         # Add security headers
         response = await call_next(request)
         response.headers["X-Content-Type-Options"] = "nosniff"
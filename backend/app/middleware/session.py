@@ -0,0 +1,195 @@
+import json
+import logging
+import secrets
+from typing import Any, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.redis import get_async_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class RedisSession(dict):
+    """
+    Session data stored in Redis under an opaque id.
+
+    Nothing is read from Redis until ``load()`` is awaited, so requests that
+    never touch the session cost no round trip. Reading or changing it
+    before then raises RuntimeError rather than looking empty. Mutations are
+    tracked so the middleware only writes the session back when it actually
+    changed.
+    """
+
+    def __init__(self, session_id: Optional[str], key_prefix: str):
+        super().__init__()
+        self.session_id = session_id
+        self.key_prefix = key_prefix
+        # A brand new session has nothing to load
+        self.loaded = session_id is None
+        self.modified = False
+
+    @property
+    def key(self) -> str:
+        return f"{self.key_prefix}{self.session_id}"
+
+    async def load(self) -> "RedisSession":
+        """Fetch the session data from Redis (once per request)."""
+        if not self.loaded:
+            self.loaded = True
+            try:
+                data = await get_async_redis_client().get(self.key)
+            except Exception as e:
+                logger.warning(f"Failed to load session: {str(e)}")
+                data = None
+            if data:
+                super().update(json.loads(data))
+            else:
+                # Expired or unknown id: start over with a fresh one
+                self.session_id = None
+        return self
+
+    def _reading(self) -> None:
+        if not self.loaded:
+            raise RuntimeError("Session must be loaded with 'await session.load()' before it is read")
+
+    def _mutating(self) -> None:
+        if not self.loaded:
+            raise RuntimeError("Session must be loaded with 'await session.load()' before it is modified")
+        self.modified = True
+
+    def __getitem__(self, key: str) -> Any:
+        self._reading()
+        return super().__getitem__(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        self._reading()
+        return super().get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        self._reading()
+        return super().__contains__(key)
+
+    def __iter__(self) -> Any:
+        self._reading()
+        return super().__iter__()
+
+    def __len__(self) -> int:
+        self._reading()
+        return super().__len__()
+
+    def keys(self) -> Any:
+        self._reading()
+        return super().keys()
+
+    def values(self) -> Any:
+        self._reading()
+        return super().values()
+
+    def items(self) -> Any:
+        self._reading()
+        return super().items()
+
+    def copy(self) -> dict:
+        self._reading()
+        return dict(super().items())
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._mutating()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self._mutating()
+        super().__delitem__(key)
+
+    def clear(self) -> None:
+        self._mutating()
+        super().clear()
+
+    def pop(self, key: str, *args: Any) -> Any:
+        self._mutating()
+        return super().pop(key, *args)
+
+    def popitem(self) -> Any:
+        self._mutating()
+        return super().popitem()
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        self._mutating()
+        return super().setdefault(key, default)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        self._mutating()
+        super().update(*args, **kwargs)
+
+
+class RedisSessionMiddleware:
+    """
+    Server-side sessions: the cookie only carries an opaque session id.
+
+    Drop-in replacement for Starlette's SessionMiddleware; ``request.session``
+    is a :class:`RedisSession` that handlers load on demand.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        cookie_name: str = "session_id",
+        key_prefix: str = "session:",
+        max_age: int = 14 * 24 * 60 * 60,
+        path: str = "/",
+        same_site: str = "lax",
+        https_only: bool = False,
+    ):
+        self.app = app
+        self.cookie_name = cookie_name
+        self.key_prefix = key_prefix
+        self.max_age = max_age
+        self.path = path
+        self.security_flags = "httponly; samesite=" + same_site
+        if https_only:
+            self.security_flags += "; secure"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        connection = HTTPConnection(scope)
+        session_id = connection.cookies.get(self.cookie_name) or None
+        session = RedisSession(session_id, self.key_prefix)
+        scope["session"] = session
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and session.modified:
+                await self._save(session, message)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _save(self, session: RedisSession, message: Message) -> None:
+        headers = MutableHeaders(scope=message)
+        if not session:
+            # Emptied session: drop it and expire the cookie
+            if session.session_id:
+                try:
+                    await get_async_redis_client().delete(session.key)
+                except Exception as e:
+                    logger.warning(f"Failed to delete session: {str(e)}")
+                headers.append("Set-Cookie", self._cookie("null", max_age=0))
+            return
+
+        if session.session_id is None:
+            session.session_id = secrets.token_urlsafe(32)
+        try:
+            await get_async_redis_client().set(session.key, json.dumps(dict(session)), ex=self.max_age)
+        except Exception as e:
+            logger.warning(f"Failed to save session: {str(e)}")
+            return
+        # The Redis TTL was just renewed, so renew the cookie's lifetime with it
+        headers.append("Set-Cookie", self._cookie(session.session_id, max_age=self.max_age))
+
+    def _cookie(self, value: str, max_age: int) -> str:
+        return f"{self.cookie_name}={value}; path={self.path}; Max-Age={max_age}; {self.security_flags}"
@@ -1,8 +1,10 @@
 from .base import Base, BaseModel
 from .user import User
+from .reading_history import ReadingHistory
 
 __all__ = [
     "Base",
     "BaseModel",
-    "User"
+    "User",
+    "ReadingHistory"
 ]
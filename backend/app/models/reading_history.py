@@ -0,0 +1,28 @@
+from datetime import datetime
+import uuid
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from .base import Base
+
+class ReadingHistory(Base):
+    """
+    One paper read by one user.
+
+    Range-partitioned by month on ``read_at`` (see app.db.partitions), so
+    the primary key has to include it. Queries should always bound
+    ``read_at`` so Postgres only scans the matching partitions.
+    """
+    __tablename__ = "reading_history"
+    __table_args__ = (
+        # Per-user history, newest first (also the keyset pagination order)
+        Index("ix_reading_history_user_id_read_at", "user_id", "read_at", "id"),
+        {"postgresql_partition_by": "RANGE (read_at)"},
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    read_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    paper_id = Column(String, nullable=False)
+    reading_time = Column(Integer, default=0)  # Seconds spent on the paper
+    progress = Column(Float, default=0.0)  # Fraction of the paper read, 0 to 1
+    completed = Column(Boolean, default=False)
@@ -6,6 +6,9 @@ from ..models.user import User
 from ..schemas.user import UserCreate, UserUpdate
 from uuid import UUID
 from fastapi import HTTPException, status
+from ..core.password_hasher import password_hasher
+from ..db.statements import USER_BY_EMAIL, USER_BY_ID, USER_BY_USERNAME
+from ..db.writes import insert_returning, update_returning
 
 class UserRepository:
     def __init__(self, db: AsyncSession):
@@ -20,17 +23,12 @@ class UserRepository:
             if "password" in user_dict:
                 user_dict.pop("password")
                 
-            db_user = User(**user_dict)
-            
             # Set hashed password if provided
             if hasattr(user_data, "password") and user_data.password:
-                from passlib.context import CryptContext
-                pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-                db_user.hashed_password = pwd_context.hash(user_data.password)
+                user_dict["hashed_password"] = await password_hasher.hash(user_data.password)
                 
-            self.db.add(db_user)
+            db_user = await insert_returning(self.db, User, user_dict)
             await self.db.commit()
-            await self.db.refresh(db_user)
             return db_user
         except Exception as e:
             await self.db.rollback()
@@ -41,8 +39,7 @@ class UserRepository:
 
     async def get_by_id(self, user_id: UUID) -> Optional[User]:
         try:
-            query = select(User).where(User.id == user_id)
-            result = await self.db.execute(query)
+            result = await self.db.execute(USER_BY_ID, {"id": user_id})
             return result.scalar_one_or_none()
         except Exception as e:
             raise HTTPException(
@@ -52,8 +49,7 @@ class UserRepository:
 
     async def get_by_email(self, email: str) -> Optional[User]:
         try:
-            query = select(User).where(User.email == email)
-            result = await self.db.execute(query)
+            result = await self.db.execute(USER_BY_EMAIL, {"email": email})
             return result.scalar_one_or_none()
         except Exception as e:
             raise HTTPException(
@@ -63,8 +59,7 @@ class UserRepository:
             
     async def get_by_username(self, username: str) -> Optional[User]:
         try:
-            query = select(User).where(User.username == username)
-            result = await self.db.execute(query)
+            result = await self.db.execute(USER_BY_USERNAME, {"username": username})
             return result.scalar_one_or_none()
         except Exception as e:
             raise HTTPException(
@@ -93,15 +88,10 @@ class UserRepository:
             
             # Handle password separately for hashing
             if "password" in update_data:
-                from passlib.context import CryptContext
-                pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-                user.hashed_password = pwd_context.hash(update_data.pop("password"))
-
-            for field, value in update_data.items():
-                setattr(user, field, value)
+                update_data["hashed_password"] = await password_hasher.hash(update_data.pop("password"))
 
+            user = await update_returning(self.db, user, update_data)
             await self.db.commit()
-            await self.db.refresh(user)
             return user
         except Exception as e:
             await self.db.rollback()
@@ -1,15 +1,13 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from jose import jwt
 import os
 
-from app.core.config import Settings
+from app.core.config import settings
+from app.core.security import create_token
 from app.services.user_service import UserService
 from app.models.user import User
 
-settings = Settings()
-
 class AuthService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -19,20 +17,20 @@ class AuthService:
         user = await self.user_service.get_user_by_email(email)
         if not user:
             return None
-        if not self.user_service.verify_password(password, user.hashed_password):
+        if not await self.user_service.verify_password(password, user.hashed_password):
             return None
         return user
 
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
-        to_encode = data.copy()
-        expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-        to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, settings.ACCESS_TOKEN_SECRET, algorithm=settings.ALGORITHM)
-        return encoded_jwt
+        return create_token(
+            data,
+            settings.ACCESS_TOKEN_SECRET,
+            expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        )
 
     def create_refresh_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
-        to_encode = data.copy()
-        expire = datetime.utcnow() + (expires_delta or timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
-        to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, settings.REFRESH_TOKEN_SECRET, algorithm=settings.ALGORITHM)
-        return encoded_jwt 
\ No newline at end of file
+        return create_token(
+            data,
+            settings.REFRESH_TOKEN_SECRET,
+            expires_delta or timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        ) 
\ No newline at end of file
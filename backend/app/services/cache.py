@@ -1,11 +1,14 @@
 from typing import Any, Optional, Union
 import json
 from datetime import datetime, timedelta
-from app.db.redis import redis_client
+from redis import asyncio as aioredis
+from app.core.redis import get_async_redis_client
 
 class CacheService:
-    def __init__(self):
-        self.redis = redis_client
+    @property
+    def redis(self) -> aioredis.Redis:
+        """The process-wide asyncio client (see app.core.redis)"""
+        return get_async_redis_client()
 
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
@@ -45,10 +48,13 @@ class CacheService:
     async def set_many(self, mapping: dict, expire: Optional[int] = None) -> bool:
         """Set multiple key-value pairs in cache"""
         try:
-            await self.redis.mset({k: json.dumps(v) for k, v in mapping.items()})
-            if expire:
-                for key in mapping:
-                    await self.redis.expire(key, expire)
+            # One round trip for the values and their expirations
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.mset({k: json.dumps(v) for k, v in mapping.items()})
+                if expire:
+                    for key in mapping:
+                        pipe.expire(key, expire)
+                await pipe.execute()
             return True
         except Exception:
             return False
@@ -0,0 +1,174 @@
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.redis import get_async_redis_client
+
+logger = logging.getLogger(__name__)
+
+# KEYS: attempts zset, lock key, lockout level key
+# ARGV: now (ms), window (ms), max attempts, base lockout (ms), max lockout (ms), member
+# Returns the remaining lockout in ms, or 0 if the attempt may proceed.
+SLIDING_WINDOW_SCRIPT = """
+local locked = redis.call('PTTL', KEYS[2])
+if locked > 0 then
+    return locked
+end
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+redis.call('ZADD', KEYS[1], now, ARGV[6])
+redis.call('PEXPIRE', KEYS[1], window)
+if redis.call('ZCARD', KEYS[1]) <= tonumber(ARGV[3]) then
+    return 0
+end
+local max_lockout = tonumber(ARGV[5])
+local level = redis.call('INCR', KEYS[3])
+redis.call('PEXPIRE', KEYS[3], max_lockout * 2)
+local lockout = math.floor(math.min(tonumber(ARGV[4]) * 2 ^ (level - 1), max_lockout))
+redis.call('SET', KEYS[2], level, 'PX', lockout)
+redis.call('DEL', KEYS[1])
+return lockout
+"""
+
+
+class LoginThrottle:
+    """
+    Sliding-window limiter for password logins, shared through Redis.
+
+    Attempts are counted per account identifier and client IP by a single Lua
+    script. Going over ``max_attempts`` within ``window`` seconds locks the key
+    for ``lockout`` seconds, doubling on each repeat up to ``max_lockout``.
+    Locked keys are also remembered locally so repeated attempts are rejected
+    without a Redis round trip, let alone a bcrypt verify.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        max_attempts: int,
+        window: int,
+        lockout: int,
+        max_lockout: int,
+        local_cache_size: int = 10000,
+        enabled: bool = True,
+    ):
+        self.prefix = prefix
+        self.max_attempts = max_attempts
+        self.window = window
+        self.lockout = lockout
+        self.max_lockout = max_lockout
+        self.local_cache_size = local_cache_size
+        self.enabled = enabled
+        self._locked: "OrderedDict[str, float]" = OrderedDict()
+        self._script = None
+        self._checks = 0
+        self._rejected_local = 0
+        self._rejected_redis = 0
+        self._errors = 0
+
+    def key(self, identifier: str, client_ip: Optional[str]) -> str:
+        return f"{self.prefix}:login:{identifier.strip().lower()}:{client_ip or 'unknown'}"
+
+    def _locked_until(self, key: str) -> Optional[float]:
+        locked_until = self._locked.get(key)
+        if locked_until is None:
+            return None
+        if locked_until <= time.time():
+            del self._locked[key]
+            return None
+        return locked_until
+
+    def _lock_locally(self, key: str, locked_until: float) -> None:
+        self._locked[key] = locked_until
+        self._locked.move_to_end(key)
+        while len(self._locked) > self.local_cache_size:
+            self._locked.popitem(last=False)
+
+    def _reject(self, retry_after: float) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts. Please try again later.",
+            headers={"Retry-After": str(max(1, int(math.ceil(retry_after))))},
+        )
+
+    async def check(self, identifier: str, client_ip: Optional[str]) -> str:
+        """
+        Record a login attempt, raising 429 if the key is locked out.
+
+        Call before any user lookup or password verification. Returns the
+        throttle key to pass to ``reset`` after a successful login.
+        """
+        key = self.key(identifier, client_ip)
+        if not self.enabled:
+            return key
+        self._checks += 1
+
+        locked_until = self._locked_until(key)
+        if locked_until is not None:
+            self._rejected_local += 1
+            raise self._reject(locked_until - time.time())
+
+        try:
+            redis = get_async_redis_client()
+            # Re-register when the shared client was recreated (e.g. after a restart of the app)
+            if self._script is None or self._script.registered_client is not redis:
+                self._script = redis.register_script(SLIDING_WINDOW_SCRIPT)
+            locked_ms = int(await self._script(
+                keys=[f"{key}:attempts", f"{key}:lock", f"{key}:level"],
+                args=[
+                    int(time.time() * 1000),
+                    self.window * 1000,
+                    self.max_attempts,
+                    self.lockout * 1000,
+                    self.max_lockout * 1000,
+                    uuid.uuid4().hex,
+                ],
+            ))
+        except Exception as e:
+            # Fail open: RateLimitMiddleware still limits per IP
+            self._errors += 1
+            logger.warning(f"Login throttle unavailable: {str(e)}")
+            return key
+
+        if locked_ms > 0:
+            self._rejected_redis += 1
+            self._lock_locally(key, time.time() + locked_ms / 1000)
+            raise self._reject(locked_ms / 1000)
+        return key
+
+    async def reset(self, key: str) -> None:
+        """Clear the attempt window after a successful login."""
+        if not self.enabled:
+            return
+        try:
+            await get_async_redis_client().delete(f"{key}:attempts", f"{key}:level")
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Failed to reset login throttle: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "locked_keys": len(self._locked),
+            "checks": self._checks,
+            "rejected_local": self._rejected_local,
+            "rejected_redis": self._rejected_redis,
+            "errors": self._errors,
+        }
+
+
+login_throttle = LoginThrottle(
+    prefix=settings.CACHE_PREFIX,
+    max_attempts=settings.LOGIN_THROTTLE_MAX_ATTEMPTS,
+    window=settings.LOGIN_THROTTLE_WINDOW_SECONDS,
+    lockout=settings.LOGIN_THROTTLE_LOCKOUT_SECONDS,
+    max_lockout=settings.LOGIN_THROTTLE_MAX_LOCKOUT_SECONDS,
+    enabled=settings.LOGIN_THROTTLE_ENABLED,
+)
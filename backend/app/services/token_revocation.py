@@ -0,0 +1,249 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.redis import get_async_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Sized for ``capacity`` items at ``error_rate`` false positives; uses
+    double hashing of a single blake2b digest to derive the bit positions.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / self.capacity * math.log(2))))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def estimated_false_positive_rate(self) -> float:
+        """Theoretical false-positive rate at the current fill level."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class TokenRevocationService:
+    """
+    Revoked access/refresh tokens, shared through Redis.
+
+    Revoking a token stores its ``jti`` in Redis (a key that expires with the
+    token plus a sorted set scored by revocation time) and revoking a user
+    stores a "revoked before" timestamp, in a sorted set pruned once no
+    token issued before it can still be valid. Each worker mirrors the jtis into a
+    local Bloom filter and the user timestamps into a dict, synced every
+    ``TOKEN_REVOCATION_SYNC_SECONDS``, so the common not-revoked check needs
+    no network hop. Only Bloom filter hits are confirmed against Redis.
+
+    Revocation times come from each writer's clock, so an incremental sync
+    re-reads the last ``sync_overlap`` seconds and skips jtis it already has.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        capacity: int,
+        error_rate: float,
+        sync_interval: int,
+        rebuild_interval: int,
+        max_token_lifetime: int,
+        enabled: bool = True,
+        sync_overlap: float = 30.0,
+    ):
+        self.prefix = prefix
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self.max_token_lifetime = max_token_lifetime
+        self.enabled = enabled
+        self.sync_overlap = sync_overlap
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._known_jtis: set = set()
+        self._users_revoked_before: Dict[str, float] = {}
+        self._last_score = 0.0
+        self._last_rebuild = 0.0
+        self._syncer: Optional[asyncio.Task] = None
+        self._checks = 0
+        self._bloom_hits = 0
+        self._false_positives = 0
+        self._revoked = 0
+        self._sync_errors = 0
+        self._propagation_delays: deque = deque(maxlen=1000)
+
+    def _jti_key(self, jti: str) -> str:
+        return f"{self.prefix}:revoked:jti:{jti}"
+
+    @property
+    def _jti_index_key(self) -> str:
+        return f"{self.prefix}:revoked:jtis"
+
+    @property
+    def _users_key(self) -> str:
+        return f"{self.prefix}:revoked:users:before"
+
+    def _remember(self, jti: str) -> None:
+        if jti not in self._known_jtis:
+            self._known_jtis.add(jti)
+            self._bloom.add(jti)
+
+    async def revoke_token(self, jti: str, expires_at: float) -> None:
+        """Revoke a single token until it would have expired anyway."""
+        now = time.time()
+        if expires_at <= now:
+            return
+        redis = get_async_redis_client()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._jti_key(jti), now, exat=int(math.ceil(expires_at)))
+            pipe.zadd(self._jti_index_key, {jti: now})
+            await pipe.execute()
+        self._remember(jti)
+
+    async def revoke_user(self, user_id: Any, before: Optional[float] = None) -> None:
+        """Revoke every token issued to a user before ``before`` (default: now)."""
+        revoked_before = before or time.time()
+        await get_async_redis_client().zadd(self._users_key, {str(user_id): revoked_before})
+        self._users_revoked_before[str(user_id)] = revoked_before
+
+    async def is_revoked(self, payload: Dict[str, Any]) -> bool:
+        """Check a decoded token payload against the denylist."""
+        if not self.enabled:
+            return False
+        self._checks += 1
+
+        revoked_before = self._users_revoked_before.get(str(payload.get("sub")))
+        if revoked_before is not None:
+            issued_at = payload.get("iat")
+            if issued_at is None or float(issued_at) <= revoked_before:
+                return True
+
+        jti = payload.get("jti")
+        if not jti or jti not in self._bloom:
+            return False
+
+        self._bloom_hits += 1
+        try:
+            revoked = bool(await get_async_redis_client().exists(self._jti_key(jti)))
+        except Exception as e:
+            # A Bloom hit is almost always a real revocation; fail closed
+            logger.warning(f"Could not confirm token revocation: {str(e)}")
+            return True
+        if not revoked:
+            self._false_positives += 1
+        return revoked
+
+    async def sync(self) -> None:
+        """Pull revocations made by other workers into the local structures."""
+        redis = get_async_redis_client()
+        now = time.time()
+
+        if now - self._last_rebuild >= self.rebuild_interval:
+            # Bloom filters cannot forget, so periodically rebuild from the live set
+            await redis.zremrangebyscore(self._jti_index_key, "-inf", now - self.max_token_lifetime)
+            entries = await redis.zrange(self._jti_index_key, 0, -1, withscores=True)
+            bloom = BloomFilter(max(self.capacity, len(entries) * 2), self.error_rate)
+            for jti, _ in entries:
+                bloom.add(jti)
+            self._bloom = bloom
+            self._known_jtis = {jti for jti, _ in entries}
+            self._last_score = max((score for _, score in entries), default=self._last_score)
+            self._last_rebuild = now
+        else:
+            # Inclusive and overlapping: a jti scored by a lagging clock, or added
+            # after a later score was already seen, is still picked up
+            entries = await redis.zrangebyscore(
+                self._jti_index_key, self._last_score - self.sync_overlap, "+inf", withscores=True
+            )
+            for jti, score in entries:
+                if jti not in self._known_jtis:
+                    self._propagation_delays.append(max(0.0, now - score))
+                self._remember(jti)
+                self._last_score = max(self._last_score, score)
+
+        # Tokens issued before an older revocation have all expired
+        await redis.zremrangebyscore(self._users_key, "-inf", now - self.max_token_lifetime)
+        users = await redis.zrange(self._users_key, 0, -1, withscores=True)
+        self._users_revoked_before = {user_id: revoked_before for user_id, revoked_before in users}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._sync_errors += 1
+                logger.warning(f"Token revocation sync failed: {str(e)}")
+            await asyncio.sleep(self.sync_interval)
+
+    def start(self) -> None:
+        """Start the periodic Redis sync."""
+        if self.enabled and self._syncer is None:
+            self._syncer = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._syncer is not None:
+            self._syncer.cancel()
+            try:
+                await self._syncer
+            except asyncio.CancelledError:
+                pass
+            self._syncer = None
+
+    def stats(self) -> Dict[str, Any]:
+        delays = self._propagation_delays
+        return {
+            "enabled": self.enabled,
+            "revoked_tokens": len(self._known_jtis),
+            "revoked_users": len(self._users_revoked_before),
+            "checks": self._checks,
+            "bloom_hits": self._bloom_hits,
+            "false_positives": self._false_positives,
+            "observed_false_positive_rate": self._false_positives / max(self._checks, 1),
+            "estimated_false_positive_rate": self._bloom.estimated_false_positive_rate(),
+            "propagation_delay_avg": sum(delays) / max(len(delays), 1),
+            "propagation_delay_max": max(delays, default=0.0),
+            "sync_errors": self._sync_errors,
+        }
+
+
+token_revocation = TokenRevocationService(
+    prefix=settings.CACHE_PREFIX,
+    capacity=settings.TOKEN_REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.TOKEN_REVOCATION_BLOOM_ERROR_RATE,
+    sync_interval=settings.TOKEN_REVOCATION_SYNC_SECONDS,
+    rebuild_interval=settings.TOKEN_REVOCATION_REBUILD_SECONDS,
+    max_token_lifetime=max(
+        settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
+        settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
+    ),
+    enabled=settings.TOKEN_REVOCATION_ENABLED,
+)
@@ -0,0 +1,299 @@
+"""
+Bulk user import/export through Postgres COPY.
+
+Import reads CSV (with a header row) or NDJSON. Each record needs ``email``
+and ``username`` plus either ``password`` (hashed here) or
+``hashed_password`` (taken as is, e.g. from an export); ``full_name``,
+``is_active``, ``is_admin`` and ``created_at`` are optional; records
+without the required fields (or NDJSON lines that are not a JSON object)
+are logged with their position and skipped. Records are handled in batches: passwords are hashed in a process pool, the batch is
+COPYed into a temporary table and moved into ``users`` with
+``ON CONFLICT DO NOTHING``, so existing emails/usernames are skipped rather
+than aborting the load. After every committed batch the position in the
+input is written to ``<input>.checkpoint``; an interrupted import picks up
+from there when re-run (re-running a finished batch is harmless).
+
+Export streams ``users`` out with ``COPY ... TO STDOUT`` in the same
+formats, including password hashes, so an export can be imported elsewhere.
+
+Both connect to the configured database (the one the app's async engine
+uses) unless ``--database-url`` points them somewhere else.
+
+Usage:
+    python -m app.services.user_bulk import users.csv --workers 8
+    python -m app.services.user_bulk export users.ndjson
+    python -m app.services.user_bulk import users.csv --database-url postgresql://localhost/rescroll
+"""
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app.core.password_hasher import pwd_context
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = ["id", "email", "username", "full_name", "hashed_password", "is_active", "is_admin", "created_at"]
+
+# Columns COPYed into the staging table, in order
+IMPORT_COLUMNS = [
+    "id", "email", "username", "full_name", "hashed_password", "is_active", "is_admin",
+    "created_at", "updated_at", "reading_time", "articles_read", "reading_streak",
+]
+
+TRUE_VALUES = {"1", "true", "t", "yes", "y"}
+
+REQUIRED_FIELDS = ["email", "username"]
+
+# Fields used as text; NDJSON may carry any JSON type in them
+STRING_FIELDS = REQUIRED_FIELDS + ["password", "hashed_password"]
+
+
+def _hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def detect_format(path: Path, format: Optional[str] = None) -> str:
+    if format:
+        return format
+    return "ndjson" if path.suffix.lower() in (".ndjson", ".jsonl", ".json") else "csv"
+
+
+def read_records(stream: Iterable[str], format: str) -> Iterator[Dict[str, Any]]:
+    if format == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Still yielded so record positions (and checkpoints) stay aligned with the input
+                yield None
+
+
+def invalid_reason(record: Any) -> Optional[str]:
+    """Why ``record`` cannot be imported, or None if it can."""
+    if not isinstance(record, dict):
+        return "not a JSON object"
+    not_strings = [
+        field for field in STRING_FIELDS
+        if record.get(field) is not None and not isinstance(record[field], str)
+    ]
+    if not_strings:
+        return f"{', '.join(not_strings)} must be text"
+    missing = [field for field in REQUIRED_FIELDS if not record.get(field)]
+    if not record.get("password") and not record.get("hashed_password"):
+        missing.append("password or hashed_password")
+    return f"missing {', '.join(missing)}" if missing else None
+
+
+def valid_records(records: List[Any], first: int = 1) -> List[Dict[str, Any]]:
+    """The importable records of a batch, logging the others by position (``first`` is the batch's first)."""
+    valid = []
+    for position, record in enumerate(records, first):
+        reason = invalid_reason(record)
+        if reason is None:
+            valid.append(record)
+        else:
+            logger.warning(f"Skipping record {position}: {reason}")
+    return valid
+
+
+def _flag(value: Any, default: bool) -> bool:
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def prepare_batch(records: List[Dict[str, Any]], executor: Optional[ProcessPoolExecutor] = None) -> bytes:
+    """Hash the batch's plaintext passwords (in ``executor`` if given) and render it as COPY CSV."""
+    plaintext = [index for index, record in enumerate(records) if not record.get("hashed_password")]
+    passwords = [records[index]["password"] for index in plaintext]
+    if executor is not None:
+        hashes = list(executor.map(_hash_password, passwords, chunksize=max(1, len(passwords) // 32)))
+    else:
+        hashes = [_hash_password(password) for password in passwords]
+    hashed = dict(zip(plaintext, hashes))
+
+    now = datetime.utcnow().isoformat()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for index, record in enumerate(records):
+        writer.writerow([
+            record.get("id") or uuid.uuid4(),
+            # Stored as given, like accounts created through the API: email lookups are exact
+            record["email"].strip(),
+            record["username"],
+            record.get("full_name") or None,
+            hashed.get(index) or record["hashed_password"],
+            _flag(record.get("is_active"), True),
+            _flag(record.get("is_admin"), False),
+            record.get("created_at") or now,
+            now,
+            0,
+            0,
+            0,
+        ])
+    return buffer.getvalue().encode()
+
+
+class Checkpoint:
+    """Number of input records already committed, kept next to the input file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def load(self) -> Dict[str, int]:
+        if not self.path.exists():
+            return {"records": 0, "inserted": 0, "rejected": 0}
+        return json.loads(self.path.read_text())
+
+    def save(self, state: Dict[str, int]) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        if self.path.exists():
+            self.path.unlink()
+
+
+def database_url(url: Optional[str] = None) -> str:
+    """The psycopg2 URL for ``url``, or for the configured database when not given."""
+    from sqlalchemy.engine import make_url
+
+    from app.core.config import settings
+    from app.db.engines import async_database_url
+
+    target = make_url(url or async_database_url()).set(drivername="postgresql+psycopg2")
+    if url is None and settings.DATABASE_SSL and "sslmode" not in target.query:
+        target = target.update_query_dict({"sslmode": "require"})
+    return target.render_as_string(hide_password=False)
+
+
+def connect(url: Optional[str] = None) -> Any:
+    """A raw psycopg2 connection (see ``database_url``), closed for real by ``close()``."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import NullPool
+
+    return create_engine(database_url(url), poolclass=NullPool).raw_connection()
+
+
+def import_users(
+    path: Path,
+    format: Optional[str] = None,
+    batch_size: int = 5000,
+    workers: int = 0,
+    url: Optional[str] = None,
+) -> Dict[str, int]:
+    format = detect_format(path, format)
+    checkpoint = Checkpoint(path.with_name(path.name + ".checkpoint"))
+    state = checkpoint.load()
+    state.setdefault("rejected", 0)
+    if state["records"]:
+        logger.info(f"Resuming {path} after {state['records']} records")
+
+    columns = ", ".join(IMPORT_COLUMNS)
+    executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count()) if workers >= 0 else None
+    connection = connect(url)
+    start = time.perf_counter()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            "CREATE TEMP TABLE user_import (LIKE users INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+        with path.open(newline="") as stream:
+            records = islice(read_records(stream, format), state["records"], None)
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+                valid = valid_records(batch, state["records"] + 1)
+                if valid:
+                    data = prepare_batch(valid, executor)
+                    cursor.copy_expert(f"COPY user_import ({columns}) FROM STDIN WITH (FORMAT csv)", io.BytesIO(data))
+                    cursor.execute(
+                        f"INSERT INTO users ({columns}) SELECT {columns} FROM user_import ON CONFLICT DO NOTHING"
+                    )
+                    state["inserted"] += cursor.rowcount
+                state["rejected"] += len(batch) - len(valid)
+                state["records"] += len(batch)
+                connection.commit()
+                checkpoint.save(state)
+                rate = state["records"] / max(time.perf_counter() - start, 1e-9)
+                logger.info(f"Imported {state['records']} records ({state['inserted']} new, {rate:.0f}/s)")
+        cursor.close()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+        if executor is not None:
+            executor.shutdown()
+    checkpoint.clear()
+    state["skipped"] = state["records"] - state["inserted"] - state["rejected"]
+    return state
+
+
+def export_users(path: Path, format: Optional[str] = None, url: Optional[str] = None) -> None:
+    format = detect_format(path, format)
+    columns = ", ".join(EXPORT_COLUMNS)
+    if format == "csv":
+        sql = f"COPY (SELECT {columns} FROM users ORDER BY created_at, id) TO STDOUT WITH (FORMAT csv, HEADER)"
+    else:
+        # One JSON document per row; the control-character quote/delimiter keep COPY from escaping it
+        sql = (
+            f"COPY (SELECT json_build_object({', '.join(f'{repr(c)}, {c}' for c in EXPORT_COLUMNS)}) "
+            "FROM users ORDER BY created_at, id) "
+            "TO STDOUT WITH (FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')"
+        )
+    connection = connect(url)
+    try:
+        cursor = connection.cursor()
+        with path.open("wb") as output:
+            cursor.copy_expert(sql, output)
+        cursor.close()
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk user import/export through Postgres COPY")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument(
+        "--workers", type=int, default=0,
+        help="Hashing processes (0: one per CPU, -1: hash in this process)",
+    )
+    parser.add_argument("--database-url", help="Database to use instead of the configured one")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    if args.command == "import":
+        result = import_users(args.path, args.format, args.batch_size, args.workers, args.database_url)
+        print(
+            f"{result['records']} records: {result['inserted']} imported, "
+            f"{result['skipped']} already existed, {result['rejected']} invalid"
+        )
+    else:
+        export_users(args.path, args.format, args.database_url)
+        print(f"Exported users to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
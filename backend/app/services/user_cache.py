@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.redis import create_pubsub_client, get_async_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Immutable copy of the user columns needed by authenticated requests."""
+
+    id: UUID
+    email: str
+    username: str
+    full_name: Optional[str]
+    profile_image: Optional[str]
+    is_active: bool
+    is_admin: bool
+    reading_time: int
+    articles_read: int
+    reading_streak: int
+    last_read_date: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @property
+    def is_superuser(self) -> bool:
+        return self.is_admin
+
+    @classmethod
+    def from_user(cls, user: Any) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            full_name=user.full_name,
+            profile_image=user.profile_image,
+            is_active=bool(user.is_active),
+            is_admin=bool(user.is_admin),
+            reading_time=user.reading_time or 0,
+            articles_read=user.articles_read or 0,
+            reading_streak=user.reading_streak or 0,
+            last_read_date=user.last_read_date,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+class UserSnapshotCache:
+    """
+    Per-process LRU of user snapshots keyed by user id.
+
+    Entries never outlive the token that loaded them. Writes call
+    ``invalidate`` which drops the local entry and publishes the id on a Redis
+    channel so the other workers drop theirs too.
+    """
+
+    def __init__(self, max_size: int, ttl: int, channel: str, enabled: bool = True):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.channel = channel
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, Tuple[UserSnapshot, float]]" = OrderedDict()
+        self._listener: Optional[asyncio.Task] = None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, user_id: Any) -> Optional[UserSnapshot]:
+        """Return a cached snapshot, or None if missing or expired."""
+        if not self.enabled:
+            return None
+        key = str(user_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        snapshot, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return snapshot
+
+    def put(self, snapshot: UserSnapshot, token_exp: Optional[float] = None) -> None:
+        """Cache a snapshot until the TTL or the token's ``exp``, whichever is first."""
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        key = str(snapshot.id)
+        self._entries[key] = (snapshot, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def discard(self, user_id: Any) -> None:
+        """Drop a user from this process only."""
+        self._entries.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def invalidate(self, user_id: Any) -> None:
+        """Drop a user from every worker's cache."""
+        self.discard(user_id)
+        self._invalidations += 1
+        if not self.enabled:
+            return
+        try:
+            await get_async_redis_client().publish(self.channel, str(user_id))
+        except Exception as e:
+            logger.warning(f"Failed to publish user cache invalidation: {str(e)}")
+
+    async def _listen(self) -> None:
+        while True:
+            # A dedicated connection: the shared pool's read timeout would cut off an idle subscription
+            client = create_pubsub_client()
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.discard(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Invalidations may have been missed while disconnected
+                logger.warning(f"User cache invalidation listener error: {str(e)}")
+                self.clear()
+                await asyncio.sleep(5)
+            finally:
+                await pubsub.close()
+                await client.aclose()
+
+    def start(self) -> None:
+        """Start listening for invalidations from other workers."""
+        if self.enabled and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / max(self._hits + self._misses, 1),
+            "evictions": self._evictions,
+            "invalidations": self._invalidations,
+        }
+
+
+user_cache = UserSnapshotCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+    channel=f"{settings.CACHE_PREFIX}:user-cache:invalidate",
+    enabled=settings.USER_CACHE_ENABLED,
+)
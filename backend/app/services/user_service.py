@@ -1,24 +1,60 @@
+import re
 from typing import Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.future import select
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from passlib.context import CryptContext
+from app.core.password_hasher import password_hasher
+from app.db.statements import USER_BY_EMAIL, USER_BY_ID, USER_BY_USERNAME
+from app.db.writes import insert_returning, update_returning
+from app.services.token_revocation import token_revocation
+from app.services.user_cache import user_cache
 from fastapi import HTTPException, status
 from uuid import UUID
 
-# Password context for hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Unique indexes on users and the message each violation maps to
+UNIQUE_VIOLATION_DETAILS = {
+    "email": "A user with this email address already exists",
+    "username": "This username is already taken",
+}
+
+# Names Postgres may report: the indexes from ``unique=True, index=True`` and default constraint names
+UNIQUE_CONSTRAINT_COLUMNS = {
+    **{f"ix_users_{column}": column for column in UNIQUE_VIOLATION_DETAILS},
+    **{f"users_{column}_key": column for column in UNIQUE_VIOLATION_DETAILS},
+}
+
+def unique_violation_detail(error: IntegrityError) -> Optional[str]:
+    """
+    Map a unique-constraint violation on users.email/users.username to its 400 message.
+
+    Only the constraint name or the ``Key (column)=`` part of the error is
+    used: the rest of the message contains the duplicate value itself.
+    """
+    orig = error.orig
+    # asyncpg exposes the violated constraint on the wrapped exception
+    constraint = getattr(orig, "constraint_name", None) or getattr(
+        getattr(orig, "__cause__", None), "constraint_name", None
+    )
+    if not constraint:
+        match = re.search(r'unique constraint "([^"]+)"', str(orig))
+        constraint = match.group(1) if match else None
+    column = UNIQUE_CONSTRAINT_COLUMNS.get(constraint)
+    if column is None:
+        match = re.search(r"Key \((\w+)\)=", str(orig))
+        column = match.group(1) if match else None
+    return UNIQUE_VIOLATION_DETAILS.get(column)
 
 class UserService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await password_hasher.verify(plain_password, hashed_password)
 
-    def get_password_hash(self, password: str) -> str:
-        return pwd_context.hash(password)
+    async def get_password_hash(self, password: str) -> str:
+        return await password_hasher.hash(password)
 
     async def check_user_exists(self, email: str, username: str) -> Tuple[bool, bool]:
         """
@@ -39,36 +75,34 @@ class UserService:
         return False, False
 
     async def create_user(self, user_data: UserCreate) -> User:
-        # Check if user exists - first check email and username individually
-        # for clearer error messages
-        existing_email = await self.get_user_by_email(user_data.email)
-        if existing_email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-        
-        existing_username = await self.get_user_by_username(user_data.username)
-        if existing_username:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
-            )
-        
+        """
+        Insert a user in a single INSERT ... RETURNING statement.
+
+        Duplicate emails/usernames are detected by the unique indexes on
+        ``users`` rather than by looking them up first.
+        """
+        hashed_password = await self.get_password_hash(user_data.password)
+        values = {
+            "email": user_data.email,
+            "username": user_data.username,
+            "full_name": user_data.full_name,
+            "profile_image": user_data.profile_image,
+            "hashed_password": hashed_password,
+            "is_active": True,
+        }
         try:
-            # Create the user
-            hashed_password = self.get_password_hash(user_data.password)
-            db_user = User(
-                email=user_data.email,
-                username=user_data.username,
-                full_name=user_data.full_name,
-                hashed_password=hashed_password,
-                is_active=True
-            )
-            self.db.add(db_user)
+            db_user = await insert_returning(self.db, User, values)
             await self.db.commit()
-            await self.db.refresh(db_user)
             return db_user
+        except IntegrityError as e:
+            await self.db.rollback()
+            detail = unique_violation_detail(e)
+            if detail is None:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Database error: {str(e.orig)}"
+                )
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
         except Exception as e:
             await self.db.rollback()
             raise HTTPException(
@@ -77,18 +111,15 @@ class UserService:
             )
 
     async def get_user_by_email(self, email: str) -> Optional[User]:
-        query = select(User).where(User.email == email)
-        result = await self.db.execute(query)
+        result = await self.db.execute(USER_BY_EMAIL, {"email": email})
         return result.scalars().first()
 
     async def get_user_by_username(self, username: str) -> Optional[User]:
-        query = select(User).where(User.username == username)
-        result = await self.db.execute(query)
+        result = await self.db.execute(USER_BY_USERNAME, {"username": username})
         return result.scalars().first()
 
     async def get_user_by_id(self, user_id: UUID) -> Optional[User]:
-        query = select(User).where(User.id == user_id)
-        result = await self.db.execute(query)
+        result = await self.db.execute(USER_BY_ID, {"id": user_id})
         return result.scalars().first()
 
     async def update_user(self, user_id: UUID, user_data: UserUpdate) -> Optional[User]:
@@ -117,13 +148,15 @@ class UserService:
                 )
         
         if "password" in update_data:
-            update_data["hashed_password"] = self.get_password_hash(update_data.pop("password"))
-        
-        for field, value in update_data.items():
-            setattr(user, field, value)
+            update_data["hashed_password"] = await self.get_password_hash(update_data.pop("password"))
         
+        was_active = user.is_active
+        user = await update_returning(self.db, user, update_data)
         await self.db.commit()
-        await self.db.refresh(user)
+        await user_cache.invalidate(user.id)
+        if was_active and not user.is_active:
+            # Tokens issued before deactivation must stop working
+            await token_revocation.revoke_user(user.id)
         return user
 
     async def delete_user(self, user_id: UUID) -> bool:
@@ -133,4 +166,6 @@ class UserService:
         
         await self.db.delete(user)
         await self.db.commit()
+        await user_cache.invalidate(user_id)
+        await token_revocation.revoke_user(user_id)
         return True
\ No newline at end of file
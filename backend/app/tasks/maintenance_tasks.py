@@ -0,0 +1,37 @@
+import asyncio
+from typing import Dict, List, Optional
+from app.core.celery_app import celery_app
+from app.db.partitions import create_partitions, drop_expired_partitions
+from app.db.session import dispose_engine
+from app.db.sharding import shard_router
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def _on_every_shard(operation) -> Dict[str, List]:
+    # Each task runs in a fresh event loop, so its pooled connections must not outlive it
+    try:
+        return {name: await operation(engine) for name, engine in shard_router.shards.items()}
+    finally:
+        await dispose_engine()
+
+@celery_app.task(name="maintain_partitions")
+def maintain_partitions(ahead: Optional[int] = None) -> Dict[str, List[str]]:
+    """
+    Create the upcoming monthly partitions on every shard.
+    """
+    created = asyncio.run(_on_every_shard(lambda engine: create_partitions(engine, ahead)))
+    logger.info(f"Created partitions: {created}")
+    return created
+
+@celery_app.task(name="cleanup_old_data")
+def cleanup_old_data(days: Optional[int] = None) -> Dict[str, List]:
+    """
+    Drop the partitions older than the retention window (READING_HISTORY_RETENTION_DAYS by default).
+
+    Old reading history goes a month at a time with DETACH + DROP rather
+    than a DELETE of millions of rows.
+    """
+    dropped = asyncio.run(_on_every_shard(lambda engine: drop_expired_partitions(engine, days)))
+    logger.info(f"Dropped partitions: {dropped}")
+    return dropped
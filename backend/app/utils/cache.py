@@ -1,24 +1,38 @@
 import json
 from typing import Any, Optional, Union, List
-from redis import Redis
+from redis import asyncio as aioredis
 from app.core.config import settings
-from app.core.redis import get_redis_client
+from app.core.redis import get_async_redis_client
 import logging
 from datetime import timedelta
 
 logger = logging.getLogger(__name__)
 
 class RedisCache:
-    def __init__(self, db: int = 0):
-        self.redis = get_redis_client(db=db)
+    """
+    JSON cache over the shared asyncio Redis pool.
+
+    Each instance keeps its keys under its own ``namespace`` (all on one
+    Redis database, so they share a single connection pool).
+    """
+
+    def __init__(self, namespace: str):
+        self.prefix = f"{settings.CACHE_PREFIX}:{namespace}:"
         self.default_ttl = 3600  # 1 hour default
 
+    @property
+    def redis(self) -> aioredis.Redis:
+        return get_async_redis_client()
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
     async def get(self, key: str) -> Optional[Any]:
         """
         Get value from cache.
         """
         try:
-            value = self.redis.get(key)
+            value = await self.redis.get(self._key(key))
             return json.loads(value) if value else None
         except Exception as e:
             logger.error(f"Error getting from cache: {str(e)}")
@@ -38,8 +52,8 @@ class RedisCache:
                 expire = int(expire.total_seconds())
             expire = expire or self.default_ttl
             
-            return self.redis.setex(
-                key,
+            return await self.redis.setex(
+                self._key(key),
                 expire,
                 json.dumps(value)
             )
@@ -52,7 +66,7 @@ class RedisCache:
         Delete value from cache.
         """
         try:
-            return bool(self.redis.delete(key))
+            return bool(await self.redis.delete(self._key(key)))
         except Exception as e:
             logger.error(f"Error deleting from cache: {str(e)}")
             return False
@@ -62,9 +76,15 @@ class RedisCache:
         Clear all keys matching pattern.
         """
         try:
-            keys = self.redis.keys(pattern)
-            if keys:
-                return bool(self.redis.delete(*keys))
+            # SCAN in batches rather than KEYS, which blocks Redis on a big keyspace
+            batch = []
+            async for key in self.redis.scan_iter(match=self._key(pattern), count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    await self.redis.delete(*batch)
+                    batch = []
+            if batch:
+                await self.redis.delete(*batch)
             return True
         except Exception as e:
             logger.error(f"Error clearing cache pattern: {str(e)}")
@@ -75,7 +95,7 @@ class RedisCache:
         Check if key exists in cache.
         """
         try:
-            return bool(self.redis.exists(key))
+            return bool(await self.redis.exists(self._key(key)))
         except Exception as e:
             logger.error(f"Error checking cache existence: {str(e)}")
             return False
@@ -85,7 +105,7 @@ class RedisCache:
         Get time to live for key.
         """
         try:
-            return self.redis.ttl(key)
+            return await self.redis.ttl(self._key(key))
         except Exception as e:
             logger.error(f"Error getting TTL: {str(e)}")
             return None
@@ -95,7 +115,7 @@ class RedisCache:
         Increment value in cache.
         """
         try:
-            return self.redis.incr(key, amount)
+            return await self.redis.incr(self._key(key), amount)
         except Exception as e:
             logger.error(f"Error incrementing cache: {str(e)}")
             return None
@@ -105,7 +125,7 @@ class RedisCache:
         Decrement value in cache.
         """
         try:
-            return self.redis.decr(key, amount)
+            return await self.redis.decr(self._key(key), amount)
         except Exception as e:
             logger.error(f"Error decrementing cache: {str(e)}")
             return None
@@ -115,7 +135,7 @@ class RedisCache:
         Get multiple values from cache.
         """
         try:
-            values = self.redis.mget(keys)
+            values = await self.redis.mget([self._key(key) for key in keys])
             return {
                 key: json.loads(value) if value else None
                 for key, value in zip(keys, values)
@@ -137,14 +157,14 @@ class RedisCache:
                 expire = int(expire.total_seconds())
             expire = expire or self.default_ttl
 
-            pipeline = self.redis.pipeline()
-            for key, value in mapping.items():
-                pipeline.setex(
-                    key,
-                    expire,
-                    json.dumps(value)
-                )
-            return all(pipeline.execute())
+            async with self.redis.pipeline(transaction=False) as pipeline:
+                for key, value in mapping.items():
+                    pipeline.setex(
+                        self._key(key),
+                        expire,
+                        json.dumps(value)
+                    )
+                return all(await pipeline.execute())
         except Exception as e:
             logger.error(f"Error setting multiple in cache: {str(e)}")
             return False
@@ -154,13 +174,13 @@ class RedisCache:
         Delete multiple values from cache.
         """
         try:
-            return bool(self.redis.delete(*keys))
+            return bool(await self.redis.delete(*[self._key(key) for key in keys]))
         except Exception as e:
             logger.error(f"Error deleting multiple from cache: {str(e)}")
             return False
 
 # Create cache instances for different purposes
-paper_cache = RedisCache(db=0)  # For paper data
-user_cache = RedisCache(db=1)   # For user data
-session_cache = RedisCache(db=2)  # For session data
-rate_limit_cache = RedisCache(db=3)  # For rate limiting 
\ No newline at end of file
+paper_cache = RedisCache("paper")  # For paper data
+user_cache = RedisCache("user")   # For user data
+session_cache = RedisCache("session")  # For session data
+rate_limit_cache = RedisCache("rate_limit")  # For rate limiting 
\ No newline at end of file
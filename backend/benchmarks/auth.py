@@ -0,0 +1,158 @@
+"""
+Authentication hot path benchmarks.
+
+Scenarios:
+    token_issue            security.create_access_token
+    token_issue_service    AuthService.create_access_token
+    get_current_user       deps.get_current_user with a cached user (JWT decode + revocation check)
+    bcrypt_verify          password_hasher.verify at the configured bcrypt cost
+    http_auth_token        POST /api/v1/auth/token through the full app
+    http_users_me          GET /api/v1/users/me through the full app
+
+Results are compared with benchmarks/baselines/auth.json when it exists;
+pass --save-baseline to record a new one. Exits non-zero on regression.
+
+Usage:
+    python -m benchmarks.auth
+    python -m benchmarks.auth --scenario bcrypt_verify --scenario http_users_me
+    python -m benchmarks.auth --save-baseline
+"""
+from benchmarks.common import configure_environment
+
+configure_environment()
+
+import argparse
+import asyncio
+import sys
+from typing import Any, Awaitable, Callable, Dict
+
+import httpx
+
+from app.api import deps
+from app.core.config import settings
+from app.core.password_hasher import password_hasher, pwd_context
+from app.core.security import create_access_token, get_password_hash
+from app.db.session import dispose_engine, get_engine
+from app.main import app
+from app.services.auth_service import AuthService
+from app.services.login_throttle import login_throttle
+from app.services.user_cache import UserSnapshot, user_cache
+from benchmarks.common import (
+    BENCH_EMAIL,
+    BENCH_PASSWORD,
+    DEFAULT_TOLERANCE,
+    compare_to_baseline,
+    ensure_bench_user,
+    load_baseline,
+    print_report,
+    run_load,
+    save_baseline,
+)
+
+BASELINE_NAME = "auth"
+
+# (requests, concurrency) per scenario; bcrypt-bound scenarios get fewer requests
+SCENARIOS = {
+    "token_issue": (20000, 1),
+    "token_issue_service": (20000, 1),
+    "get_current_user": (20000, 1),
+    "bcrypt_verify": (200, 8),
+    "http_auth_token": (200, 16),
+    "http_users_me": (5000, 50),
+}
+
+def run_context() -> Dict[str, Any]:
+    """Settings that move these numbers; stored alongside the baseline."""
+    return {
+        "bcrypt_rounds": pwd_context.handler("bcrypt").default_rounds,
+        "password_hash_workers": settings.PASSWORD_HASH_WORKERS,
+        "password_hash_max_concurrency": settings.PASSWORD_HASH_MAX_CONCURRENCY,
+        "user_cache_enabled": settings.USER_CACHE_ENABLED,
+        "token_revocation_enabled": settings.TOKEN_REVOCATION_ENABLED,
+        "db_pool_size": getattr(get_engine().pool, "size", lambda: None)(),
+    }
+
+async def build_requests(client: httpx.AsyncClient) -> Dict[str, Callable[[], Awaitable[Any]]]:
+    user = await ensure_bench_user()
+    token = create_access_token(data={"sub": str(user.id)})
+    hashed = get_password_hash(BENCH_PASSWORD)
+    auth_service = AuthService(db=None)
+    user_cache.put(UserSnapshot.from_user(user))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def token_issue() -> None:
+        create_access_token(data={"sub": str(user.id)})
+
+    async def token_issue_service() -> None:
+        auth_service.create_access_token(data={"sub": str(user.id)})
+
+    async def get_current_user() -> None:
+        await deps.get_current_user(token=token, db=None)
+
+    async def bcrypt_verify() -> None:
+        if not await password_hasher.verify(BENCH_PASSWORD, hashed):
+            raise AssertionError("password did not verify")
+
+    async def http_auth_token() -> None:
+        response = await client.post(
+            f"{settings.API_V1_STR}/auth/token",
+            data={"username": BENCH_EMAIL, "password": BENCH_PASSWORD},
+        )
+        response.raise_for_status()
+
+    async def http_users_me() -> None:
+        response = await client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+        response.raise_for_status()
+
+    return {
+        "token_issue": token_issue,
+        "token_issue_service": token_issue_service,
+        "get_current_user": get_current_user,
+        "bcrypt_verify": bcrypt_verify,
+        "http_auth_token": http_auth_token,
+        "http_users_me": http_users_me,
+    }
+
+async def main(args: argparse.Namespace) -> int:
+    # Every attempt comes from one account and IP; do not let the throttle lock it out
+    login_throttle.enabled = False
+    selected = args.scenario or list(SCENARIOS)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        requests = await build_requests(client)
+        for name in selected:
+            total, concurrency = SCENARIOS[name]
+            total = int(total * args.scale)
+            await run_load(requests[name], max(1, total // 10), concurrency)  # warm up
+            results[name] = await run_load(requests[name], total, concurrency)
+            print_report(name, results[name])
+
+    context = run_context()
+    password_hasher.shutdown()
+    await dispose_engine()
+
+    if args.save_baseline:
+        path = save_baseline(BASELINE_NAME, results, context)
+        print(f"Baseline saved to {path}")
+        return 0
+
+    baseline = load_baseline(BASELINE_NAME)
+    if baseline is None:
+        print("No baseline recorded yet; run with --save-baseline to create one.")
+        return 0
+    if baseline["context"] != context:
+        print(f"Note: baseline was recorded with different settings: {baseline['context']}")
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS))
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply the request count of every scenario")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true")
+    sys.exit(asyncio.run(main(parser.parse_args())))
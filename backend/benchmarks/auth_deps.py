@@ -0,0 +1,89 @@
+"""
+Authenticated request concurrency: blocking sync session vs AsyncSession.
+
+Compares GET /users/me resolved the old way (decode the JWT, then load the
+user over the psycopg2 SessionLocal on the event loop) with the async
+dependency chain in app.api.deps. The user snapshot cache is disabled so
+every request goes to Postgres.
+
+Usage:
+    python -m benchmarks.auth_deps --requests 2000 --concurrency 50
+"""
+from benchmarks.common import configure_environment
+
+configure_environment()
+
+import argparse
+import asyncio
+import os
+from uuid import UUID
+
+import httpx
+from fastapi import FastAPI, Header, HTTPException
+from jose import jwt
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.endpoints import users
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.session import dispose_engine
+from app.models.user import User
+from app.services.user_cache import user_cache
+from benchmarks.common import ensure_bench_user, print_report, run_load, sync_database_url
+
+def build_app(pool_size: int) -> FastAPI:
+    app = FastAPI()
+    app.include_router(users.router, prefix="/async/users")
+
+    sync_engine = create_engine(
+        sync_database_url(os.environ["DATABASE_URL"]), pool_size=pool_size
+    )
+    SyncSessionLocal = sessionmaker(bind=sync_engine)
+
+    @app.get("/sync/users/me")
+    async def read_user_me_sync(authorization: str = Header(...)):
+        token = authorization.split(" ")[1]
+        payload = jwt.decode(token, settings.ACCESS_TOKEN_SECRET, algorithms=[settings.ALGORITHM])
+        # Blocking checkout and query on the event loop, as the sync dependency did
+        with SyncSessionLocal() as db:
+            user = db.execute(
+                select(User).where(User.id == UUID(payload["sub"]))
+            ).scalar_one_or_none()
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return {"id": str(user.id), "email": user.email}
+
+    return app
+
+async def main(total: int, concurrency: int) -> None:
+    user_cache.enabled = False
+    user = await ensure_bench_user()
+    token = create_access_token(data={"sub": str(user.id)})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    app = build_app(pool_size=concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        results = {}
+        for variant in ("sync", "async"):
+            path = f"/{variant}/users/me"
+
+            async def request() -> None:
+                response = await client.get(path, headers=headers)
+                response.raise_for_status()
+
+            await run_load(request, min(total, 100), concurrency)  # warm the pools
+            results[variant] = await run_load(request, total, concurrency)
+            print_report(f"{variant} session /users/me", results[variant])
+
+    gain = results["async"]["throughput"] / max(results["sync"]["throughput"], 1e-9)
+    print(f"async/sync throughput ratio at concurrency {concurrency}: {gain:.2f}x")
+    await dispose_engine()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
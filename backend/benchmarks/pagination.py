@@ -0,0 +1,98 @@
+"""
+Deep-page cost of OFFSET vs keyset pagination on the users table.
+
+Seeds the benchmark database with --rows users (once; later runs reuse
+them), then times fetching one page at increasing depths with
+``OFFSET n LIMIT k`` and with app.db.pagination starting from a cursor at
+the same position. OFFSET has to walk past every skipped row; the keyset
+query is an index seek on (created_at, id), so its time should stay flat.
+
+Usage:
+    python -m benchmarks.pagination
+    python -m benchmarks.pagination --rows 5000000 --page-size 50 --repeat 20
+"""
+from benchmarks.common import configure_environment
+
+configure_environment()
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+from sqlalchemy import func, select, text
+
+from app.db.pagination import created_at_keys, encode_cursor, paginate
+from app.db.session import AsyncSessionLocal, dispose_engine, get_engine
+from app.models.base import Base
+from app.models.user import User
+
+SEED_PREFIX = "bench-page-"
+
+SEED_SQL = text(
+    "INSERT INTO users (id, email, username, hashed_password, is_active, is_admin, created_at, updated_at) "
+    "SELECT gen_random_uuid(), :prefix || n || '@example.com', :prefix || n, 'x', true, false, "
+    "timestamp '2020-01-01' + n * interval '1 second', now() "
+    "FROM generate_series(:start, :stop) AS n"
+)
+
+async def seed(rows: int) -> None:
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal(bind=engine) as db:
+        existing = (await db.execute(
+            select(func.count()).select_from(User).where(User.email.like(f"{SEED_PREFIX}%"))
+        )).scalar()
+        batch = 100_000
+        for start in range(existing + 1, rows + 1, batch):
+            await db.execute(SEED_SQL, {"prefix": SEED_PREFIX, "start": start, "stop": min(start + batch - 1, rows)})
+            await db.commit()
+            print(f"seeded {min(start + batch - 1, rows):,} / {rows:,} users")
+        await db.execute(text("ANALYZE users"))
+        await db.commit()
+
+async def time_query(run: Callable[[], Awaitable[None]], repeat: int) -> float:
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await run()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+async def main(rows: int, page_size: int, repeat: int) -> None:
+    await seed(rows)
+    keys = created_at_keys(User)
+    depths = sorted({depth for depth in (0, 1_000, 10_000, 100_000, 1_000_000, rows - page_size) if 0 <= depth < rows})
+
+    print(f"\n{'depth':>12} {'offset ms':>12} {'keyset ms':>12}")
+    async with AsyncSessionLocal(bind=get_engine()) as db:
+        for depth in depths:
+            ordered = select(User).order_by(*keys)
+            cursor = None
+            if depth:
+                # Cursor for the row just before this depth (not timed)
+                before = (await db.execute(ordered.offset(depth - 1).limit(1))).scalar_one()
+                cursor = encode_cursor([before.created_at, before.id])
+
+            async def by_offset() -> None:
+                (await db.execute(ordered.offset(depth).limit(page_size))).scalars().all()
+                db.expunge_all()
+
+            async def by_keyset() -> None:
+                await paginate(db, select(User), keys, limit=page_size, cursor=cursor)
+                db.expunge_all()
+
+            offset_ms = await time_query(by_offset, repeat)
+            keyset_ms = await time_query(by_keyset, repeat)
+            print(f"{depth:>12,} {offset_ms:>12.2f} {keyset_ms:>12.2f}")
+    await dispose_engine()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.page_size, args.repeat))
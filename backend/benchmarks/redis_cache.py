@@ -0,0 +1,90 @@
+"""
+Cache read latency and event loop stalls: blocking Redis client vs the shared asyncio pool.
+
+"blocking" is how RedisCache used to work, a synchronous ``redis.Redis``
+call inside an ``async def``, so every round trip blocks the event loop and
+concurrent requests queue behind it. "async-pool" goes through the shared
+``redis.asyncio`` client from app.core.redis (REDIS_MAX_CONNECTIONS
+connections). Each scenario also reports the worst event loop lag seen by a
+1 ms ticker running alongside, which is what other requests on the worker
+would have waited.
+
+Usage:
+    python -m benchmarks.redis_cache --requests 20000 --concurrency 1,10,50
+    REDIS_MAX_CONNECTIONS=50 python -m benchmarks.redis_cache
+"""
+from benchmarks.common import configure_environment
+
+configure_environment()
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from redis import Redis
+
+from app.core.config import settings
+from app.core.redis import close_async_redis
+from app.utils.cache import RedisCache
+from benchmarks.common import print_report, run_load
+
+KEY = "paper:bench"
+VALUE = {"id": "bench", "title": "Benchmark paper", "authors": ["A", "B"], "abstract": "x" * 512}
+
+class BlockingRedisCache:
+    """The previous RedisCache.get: a blocking client call inside a coroutine."""
+
+    def __init__(self, prefix: str):
+        self.redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Any:
+        value = self.redis.get(self.prefix + key)
+        return json.loads(value) if value else None
+
+async def with_loop_lag(run: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Run ``run`` while a ticker measures how late the event loop wakes it up."""
+    lags: List[float] = []
+    stop = asyncio.Event()
+
+    async def ticker() -> None:
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    task = asyncio.create_task(ticker())
+    try:
+        result = await run()
+    finally:
+        stop.set()
+        await task
+    result["max_loop_lag_ms"] = max(lags, default=0.0) * 1000
+    return result
+
+async def main(requests: int, levels: List[int]) -> None:
+    cache = RedisCache("bench")
+    blocking = BlockingRedisCache(cache.prefix)
+    await cache.set(KEY, VALUE)
+    print(f"REDIS_MAX_CONNECTIONS={settings.REDIS_MAX_CONNECTIONS}")
+    try:
+        for concurrency in levels:
+            for name, reader in (("blocking", blocking), ("async-pool", cache)):
+                result = await with_loop_lag(
+                    lambda: run_load(lambda: reader.get(KEY), requests, concurrency)
+                )
+                print_report(f"{name} c={concurrency}", result)
+                print(f"{'':<28} max loop lag {result['max_loop_lag_ms']:.2f} ms")
+    finally:
+        await cache.delete(KEY)
+        blocking.redis.close()
+        await close_async_redis()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", default="1,10,50", help="Comma-separated in-flight request counts")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, [int(level) for level in args.concurrency.split(",")]))
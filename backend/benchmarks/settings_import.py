@@ -0,0 +1,59 @@
+"""
+Settings construction and access cost.
+
+Reports how long one Settings() parse of the environment and .env takes
+(main.py, auth endpoints, security and AuthService used to build four of
+them at import), the cost of reading a value through the settings proxy
+versus the snapshot directly, and the cold import time of app.main.
+
+Usage:
+    python -m benchmarks.settings_import
+"""
+from benchmarks.common import configure_environment
+
+configure_environment()
+
+import argparse
+import statistics
+import subprocess
+import sys
+import timeit
+
+from app.core.config import Settings, get_settings, settings
+
+def cold_import_seconds(module: str, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)",
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+def main(runs: int, import_runs: int) -> None:
+    construct = timeit.timeit(Settings, number=runs) / runs
+    print(f"Settings() construction            {construct * 1000:8.3f} ms")
+    print(f"  x4 (one per module, as before)   {construct * 4000:8.3f} ms")
+
+    snapshot = get_settings()
+    direct = timeit.timeit(lambda: snapshot.ACCESS_TOKEN_SECRET, number=runs * 100) / (runs * 100)
+    proxied = timeit.timeit(lambda: settings.ACCESS_TOKEN_SECRET, number=runs * 100) / (runs * 100)
+    print(f"attribute read, snapshot           {direct * 1e9:8.1f} ns")
+    print(f"attribute read, settings proxy     {proxied * 1e9:8.1f} ns")
+
+    if import_runs:
+        print(f"cold import app.main (median)      {cold_import_seconds('app.main', import_runs) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--import-runs", type=int, default=5)
+    args = parser.parse_args()
+    main(args.runs, args.import_runs)
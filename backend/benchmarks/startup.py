@@ -0,0 +1,64 @@
+"""
+Process startup cost.
+
+Measures, in fresh interpreters, the import time of app.db.session and
+app.main and the time until the app has run its startup hooks and answered
+GET /. Every uvicorn worker, Celery child and test process pays the import
+part before doing anything useful.
+
+Usage:
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import configure_environment
+
+PROBE = """
+import time
+start = time.perf_counter()
+from benchmarks.common import configure_environment
+configure_environment()
+import app.db.session
+session_import = time.perf_counter() - start
+import app.main
+main_import = time.perf_counter() - start
+if {serve}:
+    import asyncio, httpx
+    async def first_request():
+        await app.main.app.router.startup()
+        transport = httpx.ASGITransport(app=app.main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            (await client.get("/")).raise_for_status()
+        await app.main.app.router.shutdown()
+    asyncio.run(first_request())
+print(session_import, main_import, time.perf_counter() - start)
+"""
+
+def measure(serve: bool) -> list:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(serve=serve)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return [float(value) for value in output.strip().splitlines()[-1].split()]
+
+def main(runs: int, serve: bool) -> None:
+    samples = [measure(serve) for _ in range(runs)]
+    labels = ["import app.db.session", "import app.main"]
+    if serve:
+        labels.append("startup + first request")
+    for index, label in enumerate(labels):
+        values = [sample[index] for sample in samples]
+        print(f"{label:<26} median {statistics.median(values) * 1000:8.1f} ms  max {max(values) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-serve", action="store_true", help="Only measure imports")
+    args = parser.parse_args()
+    configure_environment()
+    main(args.runs, not args.no_serve)
@@ -0,0 +1,74 @@
+"""
+Python CPU per user lookup: statements built per call vs prebuilt.
+
+Runs get-by-id/email/username lookups against an in-memory SQLite copy of
+the users table, so the database work is tiny and nearly all of the
+measured time is SQLAlchemy constructing the statement, computing its cache
+key, and loading the row into a User. "dynamic" builds
+``select(User).where(...)`` per call as the code used to; "prebuilt" runs
+the statements from app.db.statements.
+
+Usage:
+    python -m benchmarks.statement_cache --lookups 20000
+"""
+from benchmarks.common import configure_environment
+
+configure_environment()
+
+import argparse
+import time
+import uuid
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.db.statements import USER_BY_EMAIL, USER_BY_ID, USER_BY_USERNAME
+from app.models.user import User
+
+def setup() -> Session:
+    engine = create_engine("sqlite://")
+    # SQLite cannot render the Postgres UUID type, so declare the columns by hand
+    columns = ", ".join(
+        f"{column.name} {'CHAR(32)' if column.name == 'id' else 'TEXT'}" for column in User.__table__.columns
+    )
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"CREATE TABLE users ({columns})")
+    session = Session(engine)
+    session.add(User(id=uuid.uuid4(), email="bench@example.com", username="bench", hashed_password="x"))
+    session.commit()
+    return session
+
+def dynamic(session: Session, user: User) -> None:
+    session.execute(select(User).where(User.id == user.id)).scalar_one()
+    session.execute(select(User).where(User.email == user.email)).scalar_one()
+    session.execute(select(User).where(User.username == user.username)).scalar_one()
+
+def prebuilt(session: Session, user: User) -> None:
+    session.execute(USER_BY_ID, {"id": user.id}).scalar_one()
+    session.execute(USER_BY_EMAIL, {"email": user.email}).scalar_one()
+    session.execute(USER_BY_USERNAME, {"username": user.username}).scalar_one()
+
+def measure(lookup, session: Session, user: User, rounds: int) -> float:
+    for _ in range(200):
+        lookup(session, user)  # warm the compiled cache
+    start = time.process_time()
+    for _ in range(rounds):
+        lookup(session, user)
+    return (time.process_time() - start) / (rounds * 3) * 1_000_000
+
+def main(lookups: int) -> None:
+    session = setup()
+    user = session.execute(select(User)).scalar_one()
+    rounds = max(1, lookups // 3)
+    results = {name: measure(lookup, session, user, rounds) for name, lookup in
+               (("dynamic", dynamic), ("prebuilt", prebuilt))}
+    for name, cpu_us in results.items():
+        print(f"{name:<10} {cpu_us:8.1f} us CPU per lookup")
+    print(f"saved      {results['dynamic'] - results['prebuilt']:8.1f} us "
+          f"({1 - results['prebuilt'] / results['dynamic']:.0%})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.lookups)
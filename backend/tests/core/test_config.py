@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.core import config
+from app.core.config import reload_settings, settings
+
+@pytest.fixture
+def env_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "_from_env_file", {})
+    for name in ("PROJECT_NAME", "CACHE_TTL"):
+        monkeypatch.delenv(name, raising=False)
+    path = tmp_path / ".env"
+    yield path
+    # Drop what the test copied into os.environ and restore the settings
+    for name in list(config._from_env_file):
+        os.environ.pop(name, None)
+    config._from_env_file.clear()
+    monkeypatch.undo()
+    reload_settings()
+
+def test_reload_picks_up_an_edited_env_file(env_file):
+    env_file.write_text("PROJECT_NAME=Before\nCACHE_TTL=11\n")
+    reload_settings()
+    assert (settings.PROJECT_NAME, settings.CACHE_TTL) == ("Before", 11)
+
+    env_file.write_text("PROJECT_NAME=After\nCACHE_TTL=22\n")
+    reload_settings()
+    assert (settings.PROJECT_NAME, settings.CACHE_TTL) == ("After", 22)
+
+    env_file.write_text("PROJECT_NAME=After\n")
+    reload_settings()
+    assert settings.CACHE_TTL == 3600
+    assert "CACHE_TTL" not in os.environ
+
+def test_real_environment_wins_over_the_env_file(env_file, monkeypatch):
+    monkeypatch.setenv("PROJECT_NAME", "FromEnvironment")
+    env_file.write_text("PROJECT_NAME=FromFile\n")
+
+    reload_settings()
+
+    assert settings.PROJECT_NAME == "FromEnvironment"
+
+def test_reload_before_first_access_does_not_deadlock(tmp_path):
+    # A fresh process: nothing has read the settings yet
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.core.config as c; print(c.reload_settings().PROJECT_NAME)"],
+        cwd=Path(__file__).resolve().parents[2],
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == settings.PROJECT_NAME
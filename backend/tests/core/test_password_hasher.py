@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from app.core.password_hasher import PasswordHasher
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_off_loop():
+    hasher = PasswordHasher(max_workers=0, max_concurrency=2)
+    hashed = await hasher.hash("testpass123")
+
+    assert await hasher.verify("testpass123", hashed) is True
+    assert await hasher.verify("wrongpass", hashed) is False
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_and_metrics():
+    hasher = PasswordHasher(max_workers=0, max_concurrency=1)
+    hashed = await hasher.hash("testpass123")
+
+    results = await asyncio.gather(
+        *[hasher.verify("testpass123", hashed) for _ in range(3)]
+    )
+    stats = hasher.stats()
+
+    assert all(results)
+    assert stats["operations"] == 4
+    assert stats["in_flight"] == 0
+    assert stats["hash_time_avg"] > 0
+    # With a single slot the later verifications had to queue behind the first
+    assert stats["queue_time_p95"] > 0
@@ -0,0 +1,69 @@
+import pytest
+from redis import asyncio as aioredis
+
+from app.core import redis as core_redis
+from app.core.config import settings
+from app.utils import cache
+
+@pytest.mark.asyncio
+async def test_one_pool_sized_by_settings_is_shared_until_closed():
+    await core_redis.close_async_redis()
+    client = core_redis.get_async_redis_client()
+    pool = client.connection_pool
+
+    assert core_redis.get_async_redis_client() is client
+    assert isinstance(pool, aioredis.BlockingConnectionPool)
+    assert pool.max_connections == settings.REDIS_MAX_CONNECTIONS
+    assert pool.timeout == settings.REDIS_TIMEOUT
+    assert pool.connection_kwargs["socket_timeout"] == settings.REDIS_TIMEOUT
+    assert core_redis.async_redis_stats()["in_use"] == 0
+
+    await core_redis.close_async_redis()
+    assert core_redis.get_async_redis_client() is not client
+    await core_redis.close_async_redis()
+
+@pytest.mark.asyncio
+async def test_pubsub_client_has_its_own_connection_without_read_timeout():
+    client = core_redis.create_pubsub_client()
+    try:
+        assert client.connection_pool is not core_redis.get_async_redis_client().connection_pool
+        assert client.connection_pool.connection_kwargs.get("socket_timeout") is None
+    finally:
+        await client.aclose()
+        await core_redis.close_async_redis()
+
+class InMemoryRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+        return True
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def scan_iter(self, match, count):
+        prefix = match.rstrip("*")
+        for key in list(self.data):
+            if key.startswith(prefix):
+                yield key
+
+@pytest.mark.asyncio
+async def test_redis_caches_are_namespaced_on_the_shared_client(monkeypatch):
+    redis = InMemoryRedis()
+    monkeypatch.setattr(cache, "get_async_redis_client", lambda: redis)
+
+    await cache.paper_cache.set("1", {"title": "A"})
+    await cache.user_cache.set("1", {"name": "B"})
+
+    assert await cache.paper_cache.get("1") == {"title": "A"}
+    assert await cache.user_cache.get("1") == {"name": "B"}
+    assert set(redis.data) == {f"{settings.CACHE_PREFIX}:paper:1", f"{settings.CACHE_PREFIX}:user:1"}
+
+    await cache.paper_cache.clear_pattern("*")
+    assert await cache.paper_cache.get("1") is None
+    assert await cache.user_cache.get("1") == {"name": "B"}
@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import MetaData, create_engine, event
+from sqlalchemy.orm import Session
+
+class AsyncAdapter:
+    """Just enough of AsyncSession for the app.db helpers on top of a sync sqlite session."""
+
+    def __init__(self, session: Session):
+        self.session = session
+        # SQL sent to the database, in order
+        self.statements = []
+        event.listen(session.bind, "before_cursor_execute", lambda *args: self.statements.append(args[2]))
+
+    def get_bind(self):
+        return self.session.get_bind()
+
+    async def execute(self, stmt):
+        return self.session.execute(stmt)
+
+    async def scalar(self, stmt):
+        return self.session.scalar(stmt)
+
+@pytest.fixture
+def sqlite_db():
+    """Build an AsyncAdapter over a fresh in-memory sqlite database holding ``metadata``'s tables and ``rows``."""
+    sessions = []
+
+    def make(metadata: MetaData, rows=(), **session_kw) -> AsyncAdapter:
+        engine = create_engine("sqlite://")
+        metadata.create_all(engine)
+        session = Session(engine, **session_kw)
+        sessions.append(session)
+        session.add_all(rows)
+        session.commit()
+        return AsyncAdapter(session)
+
+    yield make
+    for session in sessions:
+        engine = session.bind
+        session.close()
+        engine.dispose()
@@ -0,0 +1,94 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Column, Integer, String, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import declarative_base
+
+from app.db.counts import Count, CountService, Explain, planned_rows
+
+Base = declarative_base()
+
+class Item(Base):
+    __tablename__ = "count_items"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+
+@pytest.fixture
+def db(sqlite_db):
+    return sqlite_db(Base.metadata, [Item(id=i, kind="even" if i % 2 == 0 else "odd") for i in range(1, 8)])
+
+class PlannerSession:
+    """Pretends to be Postgres: EXPLAIN reports ``planned`` rows, COUNT(*) returns ``actual``."""
+
+    def __init__(self, planned, actual):
+        self.planned = planned
+        self.actual = actual
+        self.statements = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=postgresql.dialect())
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        plan = json.dumps([{"Plan": {"Node Type": "Seq Scan", "Plan Rows": self.planned}}])
+        return SimpleNamespace(scalar=lambda: plan)
+
+    async def scalar(self, stmt):
+        self.statements.append(stmt)
+        return self.actual
+
+@pytest.mark.asyncio
+async def test_small_results_are_counted_exactly_and_cached(db):
+    service = CountService(threshold=1000, ttl=60)
+
+    assert await service.count(db, select(Item)) == Count(value=7, exact=True)
+    assert await service.count(db, select(Item).where(Item.kind == "odd")) == Count(value=4, exact=True)
+
+    db.session.add(Item(id=100, kind="odd"))
+    db.session.commit()
+
+    assert (await service.count(db, select(Item).where(Item.kind == "odd"))).value == 4
+    assert (await service.count(db, select(Item).where(Item.kind == "even"))).value == 3
+    assert service.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_expired_counts_are_recomputed(db):
+    service = CountService(threshold=1000, ttl=0)
+
+    await service.count(db, select(Item))
+    db.session.add(Item(id=100, kind="odd"))
+    db.session.commit()
+
+    assert (await service.count(db, select(Item))).value == 8
+
+@pytest.mark.asyncio
+async def test_large_results_use_the_planner_estimate():
+    service = CountService(threshold=1000, ttl=60)
+    db = PlannerSession(planned=250000, actual=None)
+
+    assert await service.count(db, select(Item)) == Count(value=250000, exact=False)
+    assert isinstance(db.statements[0], Explain)
+    assert len(db.statements) == 1
+
+@pytest.mark.asyncio
+async def test_estimates_below_the_threshold_fall_back_to_count():
+    service = CountService(threshold=1000, ttl=60)
+    db = PlannerSession(planned=40, actual=37)
+
+    assert await service.count(db, select(Item)) == Count(value=37, exact=True)
+    assert len(db.statements) == 2
+
+def test_explain_keeps_bound_parameters():
+    sql = str(Explain(select(Item).where(Item.kind == "odd")).compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "count_items.kind = %(kind_1)s" in sql
+
+def test_plan_rows_and_headers():
+    plan = [{"Plan": {"Plan Rows": 1234}}]
+
+    assert planned_rows(plan) == planned_rows(json.dumps(plan)) == 1234
+    assert Count(value=1234, exact=False).headers() == {"X-Total-Count": "1234", "X-Total-Count-Exact": "false"}
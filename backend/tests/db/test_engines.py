@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.db.engines import EngineRegistry, InstrumentedQueuePool, PoolTelemetry, _pool_class, maintenance_checkout
+
+def make_engine(telemetry: PoolTelemetry, pool_size: int = 1, max_overflow: int = 1):
+    return create_engine(
+        "sqlite://",
+        poolclass=_pool_class(InstrumentedQueuePool, telemetry),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=0.05,
+    )
+
+def test_checkouts_and_overflow_are_recorded():
+    telemetry = PoolTelemetry("test")
+    engine = make_engine(telemetry)
+
+    first = engine.connect()
+    second = engine.connect()  # beyond pool_size: overflow
+    stats = telemetry.stats(engine.pool)
+    second.close()
+    first.close()
+
+    assert telemetry.checkouts == 2
+    assert telemetry.overflow_events == 1
+    assert stats["in_use"] == 2
+    assert stats["overflow"] == 1
+
+def test_checkout_timeouts_are_counted():
+    telemetry = PoolTelemetry("test")
+    engine = make_engine(telemetry, max_overflow=0)
+
+    held = engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    held.close()
+
+    assert telemetry.timeouts == 1
+
+def test_telemetry_survives_pool_recreation():
+    telemetry = PoolTelemetry("test")
+    engine = make_engine(telemetry)
+
+    engine.connect().close()
+    engine.dispose()
+    engine.connect().close()
+
+    assert telemetry.checkouts == 2
+
+def test_warm_and_cold_checkouts_are_counted():
+    telemetry = PoolTelemetry("test")
+    engine = make_engine(telemetry)
+    telemetry.attach(engine)
+
+    engine.connect().close()  # opens the connection
+    engine.connect().close()  # reuses it
+
+    assert telemetry.connects == 1
+    assert telemetry.cold_checkouts == 1
+    assert telemetry.warm_checkouts == 1
+
+def test_maintenance_checkouts_are_not_counted():
+    telemetry = PoolTelemetry("test")
+    engine = make_engine(telemetry)
+    telemetry.attach(engine)
+
+    token = maintenance_checkout.set(True)
+    try:
+        engine.connect().close()  # a prefill
+    finally:
+        maintenance_checkout.reset(token)
+    engine.connect().close()
+
+    assert telemetry.cold_checkouts == 0
+    assert telemetry.warm_checkouts == 1
+
+def test_sync_autocommit_engine_is_built_once(monkeypatch):
+    registry = EngineRegistry()
+    sync_engine = create_engine("sqlite://")
+    monkeypatch.setattr(registry, "_sync_engine", sync_engine)
+
+    autocommit = registry.get_sync_autocommit_engine()
+
+    assert registry.get_sync_autocommit_engine() is autocommit
+    assert autocommit.pool is sync_engine.pool
+    assert autocommit.get_execution_options()["isolation_level"] == "AUTOCOMMIT"
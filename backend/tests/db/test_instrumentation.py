@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db.instrumentation import collect_queries, instrument_engine, query_budget, statement_shape
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    return engine
+
+def test_statements_are_counted_and_repeats_flagged(engine):
+    with collect_queries() as stats:
+        with engine.connect() as conn:
+            for user_id in range(5):
+                conn.execute(text("SELECT :id"), {"id": user_id})
+            conn.execute(text("SELECT 1"))
+
+    assert stats.count == 6
+    assert stats.repeated == {"SELECT ?": 5}
+    assert len(stats.slowest) == 5
+    assert stats.header_value().startswith("count=6; time_ms=")
+
+def test_nested_collectors_both_record(engine):
+    with collect_queries() as outer:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            with collect_queries() as inner:
+                conn.execute(text("SELECT 2"))
+
+    assert outer.count == 2
+    assert inner.count == 1
+
+def test_query_budget(engine):
+    with query_budget(1):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    with pytest.raises(AssertionError, match="at most 1 queries, ran 2"):
+        with query_budget(1):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+
+def test_expanded_in_lists_share_a_shape():
+    assert statement_shape("SELECT * FROM users\n WHERE id IN ($1, $2)") == statement_shape(
+        "SELECT * FROM users WHERE id IN ($1, $2, $3)"
+    )
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, select
+from sqlalchemy.orm import declarative_base
+
+from app.db.pagination import InvalidCursor, created_at_keys, decode_cursor, encode_cursor, paginate
+
+Base = declarative_base()
+
+class Item(Base):
+    __tablename__ = "pagination_items"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+
+@pytest.fixture
+def db(sqlite_db):
+    start = datetime(2024, 1, 1)
+    # Pairs of rows share a timestamp so the id has to break ties
+    return sqlite_db(Base.metadata, [Item(id=i, created_at=start + timedelta(seconds=i // 2)) for i in range(1, 11)])
+
+async def collect(db, limit, descending=False):
+    ids, cursor = [], None
+    while True:
+        page = await paginate(
+            db, select(Item), created_at_keys(Item), limit=limit, cursor=cursor, descending=descending
+        )
+        ids.extend(item.id for item in page.items)
+        if page.next_cursor is None:
+            return ids
+        cursor = page.next_cursor
+
+@pytest.mark.asyncio
+async def test_pages_cover_every_row_once(db):
+    assert await collect(db, limit=3) == list(range(1, 11))
+    assert await collect(db, limit=4, descending=True) == list(range(10, 0, -1))
+
+@pytest.mark.asyncio
+async def test_rows_inserted_earlier_do_not_shift_later_pages(db):
+    first = await paginate(db, select(Item), created_at_keys(Item), limit=4)
+    db.session.add(Item(id=100, created_at=datetime(2000, 1, 1)))
+    db.session.commit()
+
+    second = await paginate(db, select(Item), created_at_keys(Item), limit=4, cursor=first.next_cursor)
+
+    assert [item.id for item in second.items] == [5, 6, 7, 8]
+
+def test_cursor_round_trip_and_rejection():
+    keys = created_at_keys(Item)
+    cursor = encode_cursor([datetime(2024, 1, 1, 12, 30, 0, 5), 7])
+
+    assert decode_cursor(cursor, keys) == (datetime(2024, 1, 1, 12, 30, 0, 5), 7)
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor", keys)
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor([1]), keys)
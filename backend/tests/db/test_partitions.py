@@ -0,0 +1,96 @@
+import os
+import uuid
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.schema import CreateTable
+
+from app.crud.reading_history import get_reading_history
+from app.db.pagination import encode_cursor
+from app.db.partitions import MonthlyPartitions, add_months
+from app.models.reading_history import ReadingHistory
+
+partitions = MonthlyPartitions("reading_history", "read_at")
+
+def test_month_arithmetic_wraps_years():
+    assert add_months(date(2026, 11, 1), 1) == date(2026, 12, 1)
+    assert add_months(date(2026, 12, 1), 1) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+def test_partition_names_round_trip():
+    assert partitions.name_for(date(2026, 3, 1)) == "reading_history_y2026m03"
+    assert partitions.month_of("reading_history_y2026m03") == date(2026, 3, 1)
+    with pytest.raises(ValueError):
+        partitions.month_of("reading_history_default")
+    assert partitions.create_sql(date(2026, 12, 1)).endswith(
+        "PARTITION OF reading_history FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+    )
+
+def test_only_partitions_entirely_before_the_cutoff_expire():
+    names = ["reading_history_y2025m10", "reading_history_y2025m09", "reading_history_y2025m11", "reading_history_old"]
+
+    assert partitions.expired(names, datetime(2025, 11, 15)) == ["reading_history_y2025m09", "reading_history_y2025m10"]
+    assert partitions.expired(names, datetime(2025, 10, 31)) == ["reading_history_y2025m09"]
+
+def test_table_is_range_partitioned_on_read_at():
+    ddl = str(CreateTable(ReadingHistory.__table__).compile(dialect=postgresql.dialect()))
+
+    assert "PARTITION BY RANGE (read_at)" in ddl
+    assert "PRIMARY KEY (id, read_at)" in ddl
+
+class CapturingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt, *args, **kw):
+        self.statements.append(stmt)
+        return self
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+@pytest.mark.asyncio
+async def test_history_queries_bound_read_at_for_pruning():
+    db = CapturingSession()
+    cursor = encode_cursor([datetime(2026, 5, 2, 10, 0), uuid.uuid4()])
+
+    await get_reading_history(db, uuid.uuid4(), since=datetime(2026, 1, 1), cursor=cursor)
+
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    assert "reading_history.read_at >= %(read_at_1)s" in sql
+    assert "reading_history.read_at <= %(read_at_2)s" in sql
+    assert "ORDER BY reading_history.read_at DESC, reading_history.id DESC" in sql
+
+# asyncpg URL of a local Postgres database the test may create tables in
+PARTITION_URL = os.getenv("PARTITION_TEST_DATABASE_URL")
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+@pytest.mark.skipif(not PARTITION_URL, reason="needs a local Postgres database")
+async def test_create_and_drop_partitions():
+    from app.models.base import Base
+    from app.models.user import User
+
+    engine = create_async_engine(PARTITION_URL)
+    tables = [User.__table__, ReadingHistory.__table__]
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all, tables=tables)
+            await conn.run_sync(Base.metadata.create_all, tables=tables)
+
+        created = await partitions.create(engine, ahead=2, today=date(2025, 11, 20))
+        assert created == ["reading_history_y2025m11", "reading_history_y2025m12", "reading_history_y2026m01"]
+        assert await partitions.create(engine, ahead=2, today=date(2025, 11, 20)) == []
+
+        dropped = await partitions.drop_before(engine, datetime(2026, 1, 5))
+        assert dropped == ["reading_history_y2025m11", "reading_history_y2025m12"]
+        assert await partitions.partitions(engine) == ["reading_history_y2026m01"]
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all, tables=tables)
+        await engine.dispose()
@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.db.pool_maintenance import PoolMaintainer
+
+class FakeAsyncConnection:
+    """Awaitable AsyncConnection stand-in over a sync sqlite engine."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.conn = None
+
+    async def start(self):
+        self.conn = self.engine.sync_engine.connect()
+        return self
+
+    def __await__(self):
+        return self.start().__await__()
+
+    async def exec_driver_sql(self, sql):
+        pool = self.engine.pool
+        self.engine.max_held = max(self.engine.max_held, pool.checkedout())
+        dbapi_connection = self.conn.connection.dbapi_connection
+        self.engine.pinged.append(id(dbapi_connection))
+        if id(dbapi_connection) in self.engine.dead:
+            raise ConnectionError("server closed the connection unexpectedly")
+        return self.conn.exec_driver_sql(sql)
+
+    async def invalidate(self):
+        self.conn.invalidate()
+
+    async def close(self):
+        self.conn.close()
+
+class FakeAsyncEngine:
+    def __init__(self, pool_size):
+        self.sync_engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=pool_size, max_overflow=0)
+        self.dead = set()
+        self.pinged = []
+        self.max_held = 0
+
+    @property
+    def pool(self):
+        return self.sync_engine.pool
+
+    def connect(self):
+        return FakeAsyncConnection(self)
+
+class FakeRegistry:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def async_engines(self):
+        return [self.engine]
+
+@pytest.mark.asyncio
+async def test_fill_opens_connections_up_to_min_idle():
+    engine = FakeAsyncEngine(pool_size=5)
+    maintainer = PoolMaintainer(FakeRegistry(engine), min_idle=3, interval=30)
+
+    assert await maintainer.fill(engine) == 3
+    assert await maintainer.fill(engine) == 0
+    assert engine.pool.checkedin() == 3
+
+@pytest.mark.asyncio
+async def test_validate_pings_each_idle_connection_once_holding_one_at_a_time():
+    engine = FakeAsyncEngine(pool_size=5)
+    maintainer = PoolMaintainer(FakeRegistry(engine), min_idle=4, interval=30)
+    await maintainer.fill(engine)
+
+    held = [engine.sync_engine.connect() for _ in range(4)]
+    dead = held[1].connection.dbapi_connection
+    engine.dead.add(id(dead))
+    for connection in held:
+        connection.close()
+
+    assert await maintainer.validate(engine) == 1
+    assert len(engine.pinged) == len(set(engine.pinged)) == 4
+    assert engine.max_held == 1
+
+    # The dead connection was replaced, so the next round finds none
+    await maintainer.run_once()
+    stats = maintainer.stats()
+
+    assert engine.pool.checkedin() == 4
+    assert stats["invalidated"] == 1
+    assert stats["validated"] == 8
@@ -0,0 +1,64 @@
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy import Column, Integer, create_engine, insert, select
+from sqlalchemy.orm import declarative_base
+
+from app.db.routing import ReadOnlySessionError, RoutingSession
+from app.db.session import is_read_only, read_only, read_write
+
+Base = declarative_base()
+
+class Note(Base):
+    __tablename__ = "read_only_notes"
+
+    id = Column(Integer, primary_key=True)
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return engine
+
+def test_read_only_sessions_read_but_refuse_writes(engine):
+    with RoutingSession(bind=engine, info={"read_only": True}) as session:
+        assert session.execute(select(Note)).all() == []
+
+        with pytest.raises(ReadOnlySessionError):
+            session.execute(insert(Note).values(id=1))
+
+        session.add(Note(id=2))
+        with pytest.raises(ReadOnlySessionError):
+            session.flush()
+
+def test_read_only_flag_is_per_session(engine):
+    with RoutingSession(bind=engine, info={"read_only": True}) as session:
+        session.info["use_primary"] = True
+    with RoutingSession(bind=engine) as session:
+        session.add(Note(id=1))
+        session.commit()
+        assert "use_primary" in session.info
+
+@pytest.mark.asyncio
+async def test_read_only_mode_follows_method_and_route_markers():
+    app = FastAPI()
+
+    @app.get("/read")
+    @app.post("/read")
+    async def by_method(read: bool = Depends(is_read_only)):
+        return read
+
+    @app.get("/write", dependencies=[Depends(read_write)])
+    async def forced_write(read: bool = Depends(is_read_only)):
+        return read
+
+    @app.post("/report", dependencies=[Depends(read_only)])
+    async def forced_read(read: bool = Depends(is_read_only)):
+        return read
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/read")).json() is True
+        assert (await client.post("/read")).json() is False
+        assert (await client.get("/write")).json() is False
+        assert (await client.post("/report")).json() is True
@@ -0,0 +1,85 @@
+import os
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.routing import ReplicaMonitor, RoutingSession
+
+metadata = MetaData()
+items = Table("routing_items", metadata, Column("id", Integer, primary_key=True))
+
+class FixedMonitor(ReplicaMonitor):
+    """Monitor that always offers the given replica engine."""
+
+    def __init__(self, replica):
+        super().__init__(max_lag=5, check_interval=5)
+        self._set_healthy([replica])
+
+@pytest.fixture
+def engines():
+    primary = create_engine("sqlite://")
+    replica = create_engine("sqlite://")
+    return primary, replica
+
+@pytest.fixture
+def session(engines, monkeypatch):
+    primary, replica = engines
+    monkeypatch.setattr(RoutingSession, "monitor", FixedMonitor(replica))
+    with RoutingSession(bind=primary) as session:
+        yield session
+
+def test_selects_go_to_the_replica(session, engines):
+    primary, replica = engines
+
+    assert session.get_bind(clause=select(items)) is replica
+    assert session.get_bind(clause=select(items).with_for_update()) is primary
+    assert session.get_bind(clause=text("SELECT 1")) is primary
+
+def test_reads_stick_to_the_primary_after_a_write(session, engines):
+    primary, replica = engines
+
+    assert session.get_bind(clause=insert(items)) is primary
+    assert session.get_bind(clause=select(items)) is primary
+
+def test_reads_use_the_primary_without_healthy_replicas(engines, monkeypatch):
+    primary, _ = engines
+    monkeypatch.setattr(RoutingSession, "monitor", ReplicaMonitor(max_lag=5, check_interval=5))
+
+    with RoutingSession(bind=primary) as session:
+        assert session.get_bind(clause=select(items)) is primary
+
+# Set both to asyncpg URLs of two local Postgres instances to run this test
+PRIMARY_URL = os.getenv("ROUTING_TEST_PRIMARY_URL")
+REPLICA_URL = os.getenv("ROUTING_TEST_REPLICA_URL")
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+@pytest.mark.skipif(not (PRIMARY_URL and REPLICA_URL), reason="needs two local Postgres instances")
+async def test_routing_against_two_postgres_instances(monkeypatch):
+    primary = create_async_engine(PRIMARY_URL)
+    replica = create_async_engine(REPLICA_URL)
+    monitor = ReplicaMonitor(max_lag=5, check_interval=5)
+    monitor.set_engines([replica])
+    await monitor.check()
+    monkeypatch.setattr(RoutingSession, "monitor", monitor)
+    try:
+        async with AsyncSession(bind=primary, sync_session_class=RoutingSession) as session:
+            replica_name = (await session.execute(select(text("inet_server_port()")))).scalar()
+            await session.execute(text("SELECT 1"))
+            session.info["use_primary"] = True
+            primary_name = (await session.execute(select(text("inet_server_port()")))).scalar()
+        assert replica_name != primary_name
+        assert monitor.stats()["replica_reads"] == 1
+    finally:
+        await primary.dispose()
+        await replica.dispose()
+
+def test_read_only_sessions_use_autocommit_replicas(engines):
+    primary, replica = engines
+    with RoutingSession(bind=primary, info={"read_only": True}) as session:
+        session.monitor = FixedMonitor(replica)
+        bind = session.get_bind(clause=select(items))
+
+    assert bind.pool is replica.pool
+    assert bind.get_execution_options()["isolation_level"] == "AUTOCOMMIT"
@@ -0,0 +1,121 @@
+import os
+import uuid
+from collections import Counter
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.sharding import HashRing, ShardRouter
+
+USER_IDS = [uuid.UUID(int=index * 7919 + 1) for index in range(4000)]
+
+def test_ring_spreads_users_evenly():
+    ring = HashRing(["shard0", "shard1", "shard2", "shard3"])
+
+    counts = Counter(ring.node_for(user_id) for user_id in USER_IDS)
+
+    assert set(counts) == {"shard0", "shard1", "shard2", "shard3"}
+    assert min(counts.values()) > len(USER_IDS) / 4 * 0.7
+
+def test_adding_a_shard_only_moves_users_to_it():
+    before = HashRing(["shard0", "shard1", "shard2"])
+    after = HashRing(["shard0", "shard1", "shard2", "shard3"])
+
+    moved = [user_id for user_id in USER_IDS if before.node_for(user_id) != after.node_for(user_id)]
+
+    assert all(after.node_for(user_id) == "shard3" for user_id in moved)
+    assert 0.15 < len(moved) / len(USER_IDS) < 0.35
+
+def test_removing_a_node_restores_the_previous_placement():
+    ring = HashRing(["shard0", "shard1"])
+    placement = [ring.node_for(user_id) for user_id in USER_IDS]
+
+    ring.add("shard2")
+    ring.remove("shard2")
+
+    assert [ring.node_for(user_id) for user_id in USER_IDS] == placement
+    with pytest.raises(LookupError):
+        HashRing().node_for(USER_IDS[0])
+
+def test_lookups_fall_back_to_the_previous_owner_while_resharding():
+    router = ShardRouter(registry=None)
+    router.configure({"shard0": None, "shard1": None, "shard2": None}, previous=["shard0", "shard1"])
+    previous = HashRing(["shard0", "shard1"])
+
+    moving = next(user_id for user_id in USER_IDS if router.shard_for(user_id) == "shard2")
+    staying = next(user_id for user_id in USER_IDS if router.shard_for(user_id) != "shard2")
+
+    assert router.candidates(moving) == ["shard2", previous.node_for(moving)]
+    assert router.candidates(staying) == [router.shard_for(staying)]
+
+@pytest.mark.asyncio
+async def test_shard_sessions_ignore_the_replica_monitor(monkeypatch):
+    from sqlalchemy import create_engine
+
+    from app.db.routing import ReplicaMonitor, RoutingSession
+    from app.models.user import User
+
+    monitor = ReplicaMonitor(max_lag=5, check_interval=5)
+    primary_replica = create_engine("sqlite://")
+    monitor._set_healthy([primary_replica])
+    monkeypatch.setattr(RoutingSession, "monitor", monitor)
+
+    shards = {
+        "shard0": create_async_engine("postgresql+asyncpg://localhost/shard0"),
+        "shard1": create_async_engine("postgresql+asyncpg://localhost/shard1"),
+    }
+    router = ShardRouter(registry=None)
+    router.configure(shards)
+
+    async with router.session_for(USER_IDS[0]) as session:
+        bind = session.sync_session.get_bind(clause=select(User))
+
+    assert bind is router.engine_for(USER_IDS[0]).sync_engine
+    assert bind is not primary_replica
+
+# Comma-separated asyncpg URLs of two or more local Postgres databases
+SHARD_URLS = [url for url in os.getenv("SHARD_TEST_DATABASE_URLS", "").split(",") if url]
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+@pytest.mark.skipif(len(SHARD_URLS) < 2, reason="needs several local Postgres databases")
+async def test_reshard_moves_users_to_a_new_shard():
+    from app.db.reshard import reshard
+    from app.models.base import Base
+    from app.models.user import User
+
+    shard_engines = {f"shard{index}": create_async_engine(url) for index, url in enumerate(SHARD_URLS)}
+    try:
+        for engine in shard_engines.values():
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all, tables=[User.__table__])
+                await conn.run_sync(Base.metadata.create_all, tables=[User.__table__])
+
+        old = ShardRouter(registry=None)
+        old.configure({"shard0": shard_engines["shard0"]})
+        async with old.session_for(USER_IDS[0]) as session:
+            session.add_all(
+                User(id=user_id, email=f"{user_id}@example.com", username=str(user_id), hashed_password="x")
+                for user_id in USER_IDS[:200]
+            )
+            await session.commit()
+
+        router = ShardRouter(registry=None)
+        router.configure(shard_engines, previous=["shard0"])
+        moved = await reshard(router, batch_size=50)
+
+        assert 0 < moved["shard0"] < 200
+        for user_id in USER_IDS[:200]:
+            found = await router.find(
+                user_id,
+                lambda session: session.scalar(select(User.id).where(User.id == user_id)),
+            )
+            assert found == user_id
+            async with router.session_for(user_id) as session:
+                assert await session.get(User, user_id) is not None
+        page = await router.paginate(select(User), (User.created_at, User.id), limit=500)
+        assert len(page.items) == 200
+    finally:
+        for engine in shard_engines.values():
+            await engine.dispose()
@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db.instrumentation import _listeners, instrument_engine
+from app.db.slow_queries import SlowQueryLog, parameter_types, summarize
+
+@pytest.fixture
+def slow_log(tmp_path):
+    log = SlowQueryLog(threshold_ms=0, ring_size=10, explain=True, log_path=str(tmp_path / "slow.log"))
+    yield log
+    if log.on_statement in _listeners:
+        _listeners.remove(log.on_statement)
+
+@pytest.mark.asyncio
+async def test_slow_statements_are_logged_with_a_plan(slow_log, tmp_path):
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    slow_log.start()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1 + :n"), {"n": 1})
+        for _ in range(100):
+            if slow_log.entries[0]["plan"]:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await slow_log.stop()
+
+    entry = slow_log.entries[0]
+    assert entry["shape"] == "SELECT 1 + ?"
+    assert entry["parameter_types"] == ["int"]
+    assert entry["plan"] and not entry["plan"].startswith("EXPLAIN failed")
+    logged = [json.loads(line) for line in (tmp_path / "slow.log").read_text().splitlines()]
+    assert logged[0]["shape"] == "SELECT 1 + ?"
+
+@pytest.mark.asyncio
+async def test_bulk_statements_are_explained_with_one_row(slow_log, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE items (id INTEGER, name TEXT)")
+    instrument_engine(engine)
+    slow_log.start()
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO items VALUES (:id, :name)"), [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}])
+        for _ in range(100):
+            if slow_log.entries[-1]["plan"]:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await slow_log.stop()
+
+    entry = next(entry for entry in slow_log.entries if entry["shape"].startswith("INSERT"))
+    assert entry["parameter_types"] == ["int", "str"]
+    assert entry["plan"] and not entry["plan"].startswith("EXPLAIN failed")
+
+def test_fast_statements_are_ignored(slow_log):
+    slow_log.threshold = 1.0
+    slow_log.on_statement("SELECT 1", (), 0.01, None)
+
+    assert not slow_log.entries
+
+def test_report_ranks_shapes_by_total_time():
+    entries = [
+        {"shape": "A", "duration_ms": 300.0},
+        {"shape": "B", "duration_ms": 250.0},
+        {"shape": "B", "duration_ms": 250.0},
+    ]
+
+    report = summarize(entries)
+
+    assert [summary["shape"] for summary in report] == ["B", "A"]
+    assert report[0]["count"] == 2 and report[0]["avg_ms"] == 250.0
+
+def test_parameter_types_hide_values():
+    assert parameter_types({"email": "a@example.com", "limit": 5}) == {"email": "str", "limit": "int"}
+    assert parameter_types([("x", 1), ("y", 2)]) == ["str", "int"]
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.orm import declarative_base
+
+from app.db.writes import insert_returning, update_returning
+
+Base = declarative_base()
+
+class Profile(Base):
+    __tablename__ = "write_profiles"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    image = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+@pytest.fixture
+def db(sqlite_db):
+    return sqlite_db(Base.metadata, expire_on_commit=False)
+
+@pytest.mark.asyncio
+async def test_insert_returns_a_persistent_object_with_defaults(db):
+    profile = await insert_returning(db, Profile, {"name": "ada"})
+    db.session.commit()
+
+    assert profile in db.session
+    assert profile.id is not None and profile.created_at is not None
+    assert len(db.statements) == 1
+
+@pytest.mark.asyncio
+async def test_update_refreshes_the_object_in_place(db):
+    profile = await insert_returning(db, Profile, {"name": "ada"})
+    db.session.commit()
+    created = profile.updated_at
+    db.statements.clear()
+
+    updated = await update_returning(db, profile, {"image": "https://img/ada.png"})
+    db.session.commit()
+
+    assert updated is profile
+    assert profile.image == "https://img/ada.png"
+    assert profile.updated_at >= created
+    assert len(db.statements) == 1
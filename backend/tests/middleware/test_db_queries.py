@@ -0,0 +1,52 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from app.db.instrumentation import instrument_engine, query_budget
+from app.middleware.db_queries import DBQueryMiddleware, db_query_metrics
+
+@pytest.fixture
+def client():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    app = FastAPI()
+    app.add_middleware(DBQueryMiddleware, n_plus_one_threshold=3, debug_header=True)
+
+    @app.get("/one")
+    async def one():
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT 1")).scalar()
+
+    @app.get("/loop")
+    async def loop():
+        with engine.connect() as conn:
+            return [conn.execute(text("SELECT :id"), {"id": i}).scalar() for i in range(3)]
+
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+@pytest.mark.asyncio
+async def test_debug_header_reports_the_request_queries(client):
+    async with client:
+        response = await client.get("/one")
+
+    assert response.headers["x-db-queries"].startswith("count=1; time_ms=")
+
+@pytest.mark.asyncio
+async def test_repeated_statements_are_flagged(client):
+    flagged = db_query_metrics["n_plus_one_requests"]
+    async with client:
+        response = await client.get("/loop")
+
+    assert response.headers["x-db-queries"].endswith("repeated=3")
+    assert db_query_metrics["n_plus_one_requests"] == flagged + 1
+
+@pytest.mark.asyncio
+async def test_endpoint_query_budget(client):
+    async with client:
+        with query_budget(1):
+            await client.get("/one")
+        with pytest.raises(AssertionError):
+            with query_budget(2):
+                await client.get("/loop")
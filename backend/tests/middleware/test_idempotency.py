@@ -0,0 +1,198 @@
+import asyncio
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.middleware import idempotency
+from app.middleware.idempotency import IdempotencyMiddleware
+
+class InMemoryRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+@pytest.fixture
+def client(monkeypatch):
+    redis = InMemoryRedis()
+    monkeypatch.setattr(idempotency, "get_async_redis_client", lambda: redis)
+    calls = []
+
+    async def register(request):
+        calls.append(await request.json())
+        await asyncio.sleep(0.05)
+        return JSONResponse({"call": len(calls)}, status_code=201)
+
+    app = Starlette(routes=[Route("/register", register, methods=["POST"])])
+    app.add_middleware(IdempotencyMiddleware, poll_interval=0.01)
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test"), calls
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_run_once_and_share_the_response(client):
+    http, calls = client
+    headers = {"Idempotency-Key": "abc", "Cookie": "session_id=s1"}
+
+    async with http:
+        first, second = await asyncio.gather(
+            http.post("/register", json={"email": "a@example.com"}, headers=headers),
+            http.post("/register", json={"email": "a@example.com"}, headers=headers),
+        )
+        later = await http.post("/register", json={"email": "a@example.com"}, headers=headers)
+
+    assert len(calls) == 1
+    assert first.status_code == second.status_code == later.status_code == 201
+    assert first.json() == second.json() == later.json() == {"call": 1}
+    assert later.headers["idempotent-replayed"] == "true"
+
+@pytest.mark.asyncio
+async def test_reusing_a_key_with_a_different_body_is_rejected(client):
+    http, calls = client
+    headers = {"Idempotency-Key": "abc", "Cookie": "session_id=s1"}
+
+    async with http:
+        await http.post("/register", json={"email": "a@example.com"}, headers=headers)
+        response = await http.post("/register", json={"email": "b@example.com"}, headers=headers)
+
+    assert response.status_code == 422
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_requests_without_a_key_are_not_deduplicated(client):
+    http, calls = client
+
+    async with http:
+        await http.post("/register", json={"email": "a@example.com"})
+        await http.post("/register", json={"email": "a@example.com"})
+
+    assert len(calls) == 2
+
+def make_app(monkeypatch, statuses):
+    """App answering with the given status codes in turn (then 201)."""
+    redis = InMemoryRedis()
+    monkeypatch.setattr(idempotency, "get_async_redis_client", lambda: redis)
+    calls = []
+
+    async def register(request):
+        calls.append(await request.json())
+        status = statuses[len(calls) - 1] if len(calls) <= len(statuses) else 201
+        return JSONResponse({"call": len(calls)}, status_code=status)
+
+    app = Starlette(routes=[Route("/register", register, methods=["POST"])])
+    app.add_middleware(IdempotencyMiddleware, poll_interval=0.01)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test"), calls
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", [401, 403, 409, 429, 503])
+async def test_retryable_failures_release_the_key(monkeypatch, status):
+    http, calls = make_app(monkeypatch, [status])
+    headers = {"Idempotency-Key": "abc", "Cookie": "session_id=s1"}
+
+    async with http:
+        first = await http.post("/register", json={"email": "a@example.com"}, headers=headers)
+        retry = await http.post("/register", json={"email": "a@example.com"}, headers=headers)
+
+    assert first.status_code == status
+    assert retry.status_code == 201
+    assert "idempotent-replayed" not in retry.headers
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_keys_are_scoped_to_the_user_not_the_raw_credentials(monkeypatch):
+    from app.core.security import create_access_token
+
+    http, calls = make_app(monkeypatch, [])
+    body = {"email": "a@example.com"}
+
+    def bearer(sub):
+        return {"Idempotency-Key": "abc", "Authorization": f"Bearer {create_access_token({'sub': sub})}"}
+
+    async with http:
+        await http.post("/register", json=body, headers=bearer("user-1"))
+        # A refreshed token and an unrelated cookie still identify the same user
+        same_user = await http.post(
+            "/register", json=body, headers={**bearer("user-1"), "Cookie": "theme=dark"}
+        )
+        other_user = await http.post("/register", json=body, headers=bearer("user-2"))
+        await http.post("/register", json=body, headers={"Idempotency-Key": "abc", "Cookie": "session_id=s1"})
+        same_session = await http.post(
+            "/register", json=body, headers={"Idempotency-Key": "abc", "Cookie": "session_id=s1; theme=dark"}
+        )
+
+    assert same_user.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in other_user.headers
+    assert same_session.headers["idempotent-replayed"] == "true"
+    assert len(calls) == 3
+
+@pytest.mark.asyncio
+async def test_cookie_authenticated_users_do_not_share_keys(monkeypatch):
+    from app.core.security import create_access_token
+
+    http, calls = make_app(monkeypatch, [])
+    body = {"email": "a@example.com"}
+
+    def cookie(sub):
+        return {"Idempotency-Key": "abc", "Cookie": f"access_token={create_access_token({'sub': sub})}"}
+
+    async with http:
+        first = await http.post("/register", json=body, headers=cookie("user-1"))
+        other_user = await http.post("/register", json=body, headers=cookie("user-2"))
+        same_user = await http.post("/register", json=body, headers=cookie("user-1"))
+
+    assert first.json() == {"call": 1}
+    assert other_user.json() == {"call": 2}
+    assert "idempotent-replayed" not in other_user.headers
+    assert same_user.headers["idempotent-replayed"] == "true"
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_anonymous_requests_are_not_stored(monkeypatch):
+    http, calls = make_app(monkeypatch, [])
+    headers = {"Idempotency-Key": "abc"}
+
+    async with http:
+        await http.post("/register", json={"email": "a@example.com"}, headers=headers)
+        second = await http.post("/register", json={"email": "a@example.com"}, headers=headers)
+
+    assert "idempotent-replayed" not in second.headers
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_bodies_over_the_limit_pass_through(monkeypatch):
+    redis = InMemoryRedis()
+    monkeypatch.setattr(idempotency, "get_async_redis_client", lambda: redis)
+    received = []
+
+    async def upload(request):
+        received.append(len(await request.body()))
+        return JSONResponse({"call": len(received)}, status_code=201)
+
+    app = Starlette(routes=[Route("/upload", upload, methods=["POST"])])
+    app.add_middleware(IdempotencyMiddleware, max_body_size=1024)
+    headers = {"Idempotency-Key": "abc", "Cookie": "session_id=s1"}
+
+    async def chunks():
+        for _ in range(4):
+            yield b"x" * 512
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        first = await http.post("/upload", content=chunks(), headers=headers)
+        second = await http.post("/upload", content=b"x" * 2048, headers=headers)
+
+    assert received == [2048, 2048]
+    assert first.json() == {"call": 1} and second.json() == {"call": 2}
+    assert redis.data == {}
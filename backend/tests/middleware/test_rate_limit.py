@@ -0,0 +1,68 @@
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.middleware import security
+from app.middleware.security import RateLimitMiddleware
+
+class CountingRedis:
+    def __init__(self, fail=False):
+        self.counts = {}
+        self.fail = fail
+
+    def pipeline(self, transaction=True):
+        return CountingPipeline(self)
+
+class CountingPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.key = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def incr(self, key):
+        self.key = key
+
+    def expire(self, key, seconds):
+        pass
+
+    async def execute(self):
+        if self.redis.fail:
+            raise ConnectionError("Redis is down")
+        self.redis.counts[self.key] = self.redis.counts.get(self.key, 0) + 1
+        return [self.redis.counts[self.key], True]
+
+def make_client(monkeypatch, redis):
+    monkeypatch.setattr(security, "get_async_redis_client", lambda: redis)
+
+    async def homepage(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/", homepage)])
+    app.add_middleware(RateLimitMiddleware, requests_per_minute=3)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+@pytest.mark.asyncio
+async def test_requests_over_the_limit_get_429(monkeypatch):
+    redis = CountingRedis()
+
+    async with make_client(monkeypatch, redis) as client:
+        statuses = [(await client.get("/")).status_code for _ in range(4)]
+        rejected = await client.get("/")
+
+    assert statuses == [200, 200, 200, 429]
+    assert int(rejected.headers["retry-after"]) <= 60
+    assert list(redis.counts.values()) == [5]
+
+@pytest.mark.asyncio
+async def test_counts_locally_when_redis_is_down(monkeypatch):
+    async with make_client(monkeypatch, CountingRedis(fail=True)) as client:
+        statuses = [(await client.get("/")).status_code for _ in range(4)]
+
+    assert statuses == [200, 200, 200, 429]
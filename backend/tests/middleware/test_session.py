@@ -0,0 +1,86 @@
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.middleware.session import RedisSession, RedisSessionMiddleware
+
+def test_new_session_tracks_modifications():
+    session = RedisSession(None, "test:session:")
+
+    assert session.loaded
+    assert not session.modified
+    session["user_id"] = "abc"
+    assert session.modified
+
+def test_existing_session_must_be_loaded_before_writing():
+    session = RedisSession("some-id", "test:session:")
+
+    assert not session.loaded
+    with pytest.raises(RuntimeError):
+        session["user_id"] = "abc"
+
+@pytest.mark.asyncio
+async def test_untouched_session_is_neither_loaded_nor_written():
+    seen = {}
+
+    async def homepage(request):
+        seen["session"] = request.session
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/", homepage)])
+    app.add_middleware(RedisSessionMiddleware, cookie_name="sid")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/", cookies={"sid": "existing-id"})
+
+    assert response.status_code == 200
+    assert "set-cookie" not in response.headers
+    assert not seen["session"].loaded
+    assert not seen["session"].modified
+
+def test_existing_session_must_be_loaded_before_reading():
+    session = RedisSession("some-id", "test:session:")
+
+    with pytest.raises(RuntimeError):
+        session["user_id"]
+    with pytest.raises(RuntimeError):
+        session.get("user_id")
+    with pytest.raises(RuntimeError):
+        "user_id" in session
+    with pytest.raises(RuntimeError):
+        list(session)
+
+class InMemoryRedis:
+    def __init__(self, data=None):
+        self.data = dict(data or {})
+        self.expiry = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiry[key] = ex
+
+@pytest.mark.asyncio
+async def test_saving_an_existing_session_renews_the_cookie(monkeypatch):
+    from app.middleware import session as session_module
+
+    redis = InMemoryRedis({"session:existing-id": '{"user_id": "abc"}'})
+    monkeypatch.setattr(session_module, "get_async_redis_client", lambda: redis)
+
+    async def homepage(request):
+        await request.session.load()
+        request.session["seen"] = request.session.get("user_id")
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/", homepage)])
+    app.add_middleware(RedisSessionMiddleware, cookie_name="sid", max_age=600)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/", cookies={"sid": "existing-id"})
+
+    assert redis.expiry["session:existing-id"] == 600
+    assert response.headers["set-cookie"].startswith("sid=existing-id; path=/; Max-Age=600")
@@ -0,0 +1,37 @@
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.login_throttle import LoginThrottle
+
+def make_throttle(**overrides) -> LoginThrottle:
+    options = dict(prefix="test", max_attempts=5, window=300, lockout=60, max_lockout=3600)
+    options.update(overrides)
+    return LoginThrottle(**options)
+
+def test_key_combines_normalised_identifier_and_ip():
+    throttle = make_throttle()
+
+    assert throttle.key(" Alice@Example.com ", "10.0.0.1") == "test:login:alice@example.com:10.0.0.1"
+    assert throttle.key("alice@example.com", "10.0.0.2") != throttle.key("alice@example.com", "10.0.0.1")
+
+@pytest.mark.asyncio
+async def test_locally_locked_key_is_rejected_without_redis():
+    throttle = make_throttle()
+    key = throttle.key("alice@example.com", "10.0.0.1")
+    throttle._lock_locally(key, time.time() + 30)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await throttle.check("alice@example.com", "10.0.0.1")
+
+    assert exc_info.value.status_code == 429
+    assert 29 <= int(exc_info.value.headers["Retry-After"]) <= 30
+    assert throttle.stats()["rejected_local"] == 1
+
+@pytest.mark.asyncio
+async def test_disabled_throttle_never_rejects():
+    throttle = make_throttle(enabled=False)
+    throttle._lock_locally(throttle.key("alice@example.com", "10.0.0.1"), time.time() + 30)
+
+    await throttle.check("alice@example.com", "10.0.0.1")
@@ -0,0 +1,127 @@
+import time
+import uuid
+from collections import defaultdict
+
+import pytest
+
+from app.services.token_revocation import BloomFilter, TokenRevocationService
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [uuid.uuid4().hex for _ in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+
+def test_bloom_filter_false_positive_rate_near_target():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for _ in range(1000):
+        bloom.add(uuid.uuid4().hex)
+
+    probes = 20000
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(probes))
+
+    assert false_positives / probes < 0.03
+    assert bloom.estimated_false_positive_rate() == pytest.approx(0.01, rel=0.5)
+
+@pytest.mark.asyncio
+async def test_unknown_token_is_not_revoked_without_redis():
+    service = TokenRevocationService(
+        prefix="test",
+        capacity=100,
+        error_rate=0.001,
+        sync_interval=5,
+        rebuild_interval=300,
+        max_token_lifetime=3600,
+    )
+
+    # A Bloom filter miss must be answered locally, before any Redis call
+    assert await service.is_revoked({"sub": "1", "jti": uuid.uuid4().hex}) is False
+    assert service.stats()["bloom_hits"] == 0
+
+@pytest.mark.asyncio
+async def test_user_wide_revocation_applies_to_older_tokens():
+    service = TokenRevocationService(
+        prefix="test",
+        capacity=100,
+        error_rate=0.001,
+        sync_interval=5,
+        rebuild_interval=300,
+        max_token_lifetime=3600,
+    )
+    now = time.time()
+    service._users_revoked_before["42"] = now
+
+    assert await service.is_revoked({"sub": "42", "iat": now - 60}) is True
+    assert await service.is_revoked({"sub": "42", "iat": now + 60}) is False
+
+class SortedSetRedis:
+    """The sorted set commands sync() and revoke_user() use, in memory."""
+
+    def __init__(self):
+        self.sets = defaultdict(dict)
+
+    async def zadd(self, key, mapping):
+        self.sets[key].update(mapping)
+
+    async def zrangebyscore(self, key, low, high, withscores=False):
+        return sorted(
+            ((member, score) for member, score in self.sets[key].items() if score >= float(low)),
+            key=lambda entry: entry[1],
+        )
+
+    async def zrange(self, key, start, end, withscores=False):
+        return await self.zrangebyscore(key, "-inf", "+inf")
+
+    async def zremrangebyscore(self, key, low, high):
+        for member, score in await self.zrangebyscore(key, low, high):
+            if score <= float(high):
+                del self.sets[key][member]
+
+def make_service(monkeypatch, redis, **kw):
+    monkeypatch.setattr("app.services.token_revocation.get_async_redis_client", lambda: redis)
+    service = TokenRevocationService(
+        prefix="test",
+        capacity=100,
+        error_rate=0.001,
+        sync_interval=5,
+        rebuild_interval=300,
+        max_token_lifetime=3600,
+        **kw,
+    )
+    # Only incremental syncs
+    service._last_rebuild = time.time()
+    return service
+
+@pytest.mark.asyncio
+async def test_incremental_sync_picks_up_late_and_tied_scores(monkeypatch):
+    redis = SortedSetRedis()
+    service = make_service(monkeypatch, redis, sync_overlap=10)
+    jtis = redis.sets[service._jti_index_key]
+
+    jtis["first"] = 1000.0
+    await service.sync()
+    # Same score as the last one seen, and one from a worker whose clock is behind
+    jtis["tied"] = 1000.0
+    jtis["late"] = 995.0
+    await service.sync()
+    await service.sync()
+
+    assert {"first", "tied", "late"} <= service._known_jtis
+    assert "late" in service._bloom and "tied" in service._bloom
+    assert service.stats()["revoked_tokens"] == 3
+
+@pytest.mark.asyncio
+async def test_user_revocations_are_dropped_once_every_token_has_expired(monkeypatch):
+    redis = SortedSetRedis()
+    service = make_service(monkeypatch, redis)
+    now = time.time()
+
+    await service.revoke_user("old", before=now - 3700)
+    await service.revoke_user("recent", before=now - 60)
+    await service.sync()
+
+    assert list(redis.sets[service._users_key]) == ["recent"]
+    assert service.stats()["revoked_users"] == 1
+    assert await service.is_revoked({"sub": "recent", "iat": now - 120}) is True
@@ -0,0 +1,125 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.services import user_cache as user_cache_module
+from app.services.user_cache import UserSnapshot, UserSnapshotCache
+
+def snapshot(user_id=None):
+    return UserSnapshot(
+        id=user_id or uuid.uuid4(),
+        email="a@example.com",
+        username="a",
+        full_name=None,
+        profile_image=None,
+        is_active=True,
+        is_admin=False,
+        reading_time=0,
+        articles_read=0,
+        reading_streak=0,
+        last_read_date=None,
+        created_at=None,
+        updated_at=None,
+    )
+
+def make_cache(**kw):
+    return UserSnapshotCache(**{"max_size": 100, "ttl": 60, "channel": "test:invalidate", **kw})
+
+def test_least_recently_used_entries_are_evicted():
+    cache = make_cache(max_size=2)
+    first, second, third = snapshot(), snapshot(), snapshot()
+
+    cache.put(first)
+    cache.put(second)
+    assert cache.get(first.id) == first  # now the most recently used
+    cache.put(third)
+
+    assert cache.get(second.id) is None
+    assert cache.get(first.id) == first
+    assert cache.get(third.id) == third
+    assert cache.stats()["evictions"] == 1
+
+def test_entries_expire_after_the_ttl_or_the_token_whichever_is_first(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(user_cache_module.time, "time", lambda: now[0])
+    cache = make_cache(ttl=60)
+    long_token, short_token = snapshot(), snapshot()
+
+    cache.put(long_token, token_exp=now[0] + 3600)
+    cache.put(short_token, token_exp=now[0] + 10)
+
+    now[0] += 11
+    assert cache.get(short_token.id) is None
+    assert cache.get(long_token.id) == long_token
+    now[0] += 50
+    assert cache.get(long_token.id) is None
+
+class Broker:
+    """In-memory Redis pub/sub shared by several clients."""
+
+    def __init__(self):
+        self.subscribers = []
+
+    def client(self):
+        return BrokerClient(self)
+
+class BrokerClient:
+    def __init__(self, broker):
+        self.broker = broker
+
+    async def publish(self, channel, message):
+        for pubsub in self.broker.subscribers:
+            if channel in pubsub.channels:
+                pubsub.queue.put_nowait({"type": "message", "channel": channel, "data": message})
+
+    def pubsub(self):
+        return BrokerPubSub(self.broker)
+
+    async def aclose(self):
+        pass
+
+class BrokerPubSub:
+    def __init__(self, broker):
+        self.broker = broker
+        self.channels = set()
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.channels.add(channel)
+        self.broker.subscribers.append(self)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def close(self):
+        self.broker.subscribers.remove(self)
+
+@pytest.mark.asyncio
+async def test_invalidation_reaches_other_workers(monkeypatch):
+    broker = Broker()
+    monkeypatch.setattr(user_cache_module, "get_async_redis_client", broker.client)
+    monkeypatch.setattr(user_cache_module, "create_pubsub_client", broker.client)
+    worker_a, worker_b = make_cache(), make_cache()
+    user = snapshot()
+    worker_a.put(user)
+    worker_b.put(user)
+
+    worker_a.start()
+    worker_b.start()
+    try:
+        while len(broker.subscribers) < 2:
+            await asyncio.sleep(0.01)
+        await worker_a.invalidate(user.id)
+        for _ in range(100):
+            if worker_b.get(user.id) is None:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await worker_a.stop()
+        await worker_b.stop()
+
+    assert worker_a.get(user.id) is None
+    assert worker_b.get(user.id) is None
+    assert not broker.subscribers
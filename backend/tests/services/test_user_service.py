@@ -0,0 +1,88 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.services.token_revocation import token_revocation
+from app.services.user_cache import user_cache
+from app.services.user_service import UNIQUE_VIOLATION_DETAILS, UserService, unique_violation_detail
+
+class UniqueViolationError(Exception):
+    """Stands in for asyncpg's exception, which carries the violated constraint."""
+
+    def __init__(self, message, constraint_name=None):
+        super().__init__(message)
+        self.constraint_name = constraint_name
+
+class AdaptedError(Exception):
+    """The DBAPI-level error SQLAlchemy wraps; asyncpg's exception is its __cause__."""
+
+def integrity_error(orig):
+    return IntegrityError("INSERT INTO users ...", {}, orig)
+
+def wrapped(cause):
+    orig = AdaptedError(str(cause))
+    orig.__cause__ = cause
+    return orig
+
+def test_constraint_name_picks_the_column():
+    email = UniqueViolationError("duplicate key", constraint_name="ix_users_email")
+    username = UniqueViolationError("duplicate key", constraint_name="users_username_key")
+
+    assert unique_violation_detail(integrity_error(wrapped(email))) == UNIQUE_VIOLATION_DETAILS["email"]
+    assert unique_violation_detail(integrity_error(username)) == UNIQUE_VIOLATION_DETAILS["username"]
+
+def test_constraint_name_wins_over_the_duplicate_value():
+    cause = UniqueViolationError(
+        'duplicate key value violates unique constraint "ix_users_username"\n'
+        "DETAIL:  Key (username)=(jane_email) already exists.",
+        constraint_name="ix_users_username",
+    )
+
+    assert unique_violation_detail(integrity_error(wrapped(cause))) == UNIQUE_VIOLATION_DETAILS["username"]
+
+def test_key_detail_is_used_without_a_known_constraint():
+    username = Exception(
+        'duplicate key value violates unique constraint "uq_handle"\n'
+        "DETAIL:  Key (username)=(mail_(email)) already exists."
+    )
+    email = Exception("DETAIL:  Key (email)=(jane_username@example.com) already exists.")
+
+    assert unique_violation_detail(integrity_error(username)) == UNIQUE_VIOLATION_DETAILS["username"]
+    assert unique_violation_detail(integrity_error(email)) == UNIQUE_VIOLATION_DETAILS["email"]
+
+def test_other_violations_are_not_mapped():
+    assert unique_violation_detail(integrity_error(UniqueViolationError("x", constraint_name="papers_doi_key"))) is None
+    assert unique_violation_detail(integrity_error(Exception("users_email_check (email) failed"))) is None
+
+class DeletingSession:
+    def __init__(self):
+        self.deleted = []
+
+    async def delete(self, obj):
+        self.deleted.append(obj)
+
+    async def commit(self):
+        pass
+
+@pytest.mark.asyncio
+async def test_deleting_a_user_revokes_their_tokens(monkeypatch):
+    user_id = uuid.uuid4()
+    revoked, invalidated = [], []
+
+    async def revoke_user(revoked_id):
+        revoked.append(revoked_id)
+
+    async def invalidate(invalidated_id):
+        invalidated.append(invalidated_id)
+
+    async def get_user_by_id(self, requested_id):
+        return SimpleNamespace(id=requested_id)
+
+    monkeypatch.setattr(token_revocation, "revoke_user", revoke_user)
+    monkeypatch.setattr(user_cache, "invalidate", invalidate)
+    monkeypatch.setattr(UserService, "get_user_by_id", get_user_by_id)
+
+    assert await UserService(DeletingSession()).delete_user(user_id) is True
+    assert revoked == invalidated == [user_id]